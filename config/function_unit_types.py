@@ -39,14 +39,14 @@ function_unit_types = {
     "SRA": "ALU",
     "OR": "ALU",
     "AND": "ALU",
-    "MUL": "ALU",
-    "MULH": "ALU",
-    "MULHSU": "ALU",
-    "MULHU": "ALU",
-    "DIV": "ALU",
-    "DIVU": "ALU",
-    "REM": "ALU",
-    "REMU": "ALU",
+    "MUL": "MUL",
+    "MULH": "MUL",
+    "MULHSU": "MUL",
+    "MULHU": "MUL",
+    "DIV": "DIV",
+    "DIVU": "DIV",
+    "REM": "DIV",
+    "REMU": "DIV",
     "FENCE": "ALU",
     "FENCEI": "ALU",
     "ECALL": "CSR",
@@ -71,10 +71,10 @@ function_unit_types = {
     "SLLW": "ALU",
     "SRLW": "ALU",
     "SRAW": "ALU",
-    "MULW": "ALU",
-    "DIVW": "ALU",
-    "DIVUW": "ALU",
-    "REMW": "ALU",
-    "REMUW": "ALU",
+    "MULW": "MUL",
+    "DIVW": "DIV",
+    "DIVUW": "DIV",
+    "REMW": "DIV",
+    "REMUW": "DIV",
     "ILLEGAL": None,
 }
@@ -0,0 +1,92 @@
+from config.function_unit_types import function_unit_types
+
+# -------------------
+# Opcode table
+#
+# Opcode id is the index of the instruction in `function_unit_types`.
+# Per-id columns are plain lists so hot paths index them
+# instead of hashing instruction names.
+# -------------------
+opcode_names = list(function_unit_types)
+opcode_ids = {name: index for index, name in enumerate(opcode_names)}
+
+ILLEGAL = opcode_ids["ILLEGAL"]
+
+# Instruction class bitflags
+LOAD = 0x1
+STORE = 0x2
+BRANCH = 0x4
+JUMP = 0x8
+CSR = 0x10
+TRAP_RETURN = 0x20
+TRAP = 0x40
+FENCE_I = 0x80
+# Loads sign-extending their result
+LOAD_SIGNED = 0x100
+
+opcode_classes = {
+    "LB": LOAD | LOAD_SIGNED,
+    "LH": LOAD | LOAD_SIGNED,
+    "LW": LOAD | LOAD_SIGNED,
+    "LBU": LOAD,
+    "LHU": LOAD,
+    "LWU": LOAD,
+    "LD": LOAD,
+    "SB": STORE,
+    "SH": STORE,
+    "SW": STORE,
+    "SD": STORE,
+    "BEQ": BRANCH,
+    "BNE": BRANCH,
+    "BLT": BRANCH,
+    "BGE": BRANCH,
+    "BLTU": BRANCH,
+    "BGEU": BRANCH,
+    "JAL": JUMP,
+    "JALR": JUMP,
+    "ECALL": TRAP,
+    # EBREAK is deliberately unflagged, it is not trapped on
+    "URET": TRAP_RETURN,
+    "SRET": TRAP_RETURN,
+    "MRET": TRAP_RETURN,
+    "CSRRW": CSR,
+    "CSRRS": CSR,
+    "CSRRC": CSR,
+    "CSRRWI": CSR,
+    "CSRRSI": CSR,
+    "CSRRCI": CSR,
+    "FENCEI": FENCE_I,
+}
+
+# opcode id -> class bitflags
+opcode_flags = [opcode_classes.get(name, 0) for name in opcode_names]
+
+# opcode id -> function unit type
+opcode_function_unit_types = [function_unit_types[name] for name in opcode_names]
+
+# Execution timing, (latency, issue interval) in cycles
+# Issue interval is the number of cycles before the function unit
+# accepts another operation: 1 if pipelined, the latency if not
+opcode_timings = {
+    # Pipelined multiplier
+    "MUL": (3, 1),
+    "MULH": (3, 1),
+    "MULHSU": (3, 1),
+    "MULHU": (3, 1),
+    "MULW": (3, 1),
+    # Iterative divider
+    "DIV": (20, 20),
+    "DIVU": (20, 20),
+    "REM": (20, 20),
+    "REMU": (20, 20),
+    "DIVW": (12, 12),
+    "DIVUW": (12, 12),
+    "REMW": (12, 12),
+    "REMUW": (12, 12),
+}
+
+# opcode id -> execution latency in cycles
+opcode_latencies = [opcode_timings.get(name, (1, 1))[0] for name in opcode_names]
+
+# opcode id -> issue interval in cycles
+opcode_issue_intervals = [opcode_timings.get(name, (1, 1))[1] for name in opcode_names]
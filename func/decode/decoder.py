@@ -7,7 +7,29 @@ import sys
 
 sys.path.append("../..")
 
-from utils.decoder_wrapper import decode
+import numpy as np
+
+from utils.decoder_wrapper import decode, decode_many
+from func.micro_op import MicroOp
+from config.opcodes import ILLEGAL
+
+# Batch decoding output, one record per word
+# Absent registers are -1
+decoded_dtype = np.dtype(
+    [
+        ("word", np.uint32),
+        ("opcode", np.int16),
+        ("rd", np.int8),
+        ("rs1", np.int8),
+        ("rs2", np.int8),
+        ("rcsr", np.int16),
+        ("wcsr", np.int16),
+        ("imm", np.int64),
+        ("has_imm", np.bool_),
+        ("insn_len", np.uint8),
+        ("decode_error", np.bool_),
+    ]
+)
 
 
 # -------------------
@@ -15,3 +37,121 @@ from utils.decoder_wrapper import decode
 # -------------------
 def decode_word(word):
     return decode(word)
+
+
+# -------------------
+# Decode words to a `decoded_dtype` array
+#
+# Each distinct word is decoded once, in a single decoder call.
+# -------------------
+def decode_words(words):
+    words = np.asarray(words, dtype=np.uint32)
+    unique_words, inverse = np.unique(words, return_inverse=True)
+
+    table = np.zeros(len(unique_words), dtype=decoded_dtype)
+    table["word"] = unique_words
+    table["rd"] = table["rs1"] = table["rs2"] = -1
+    table["rcsr"] = table["wcsr"] = -1
+    table["insn_len"] = np.where((unique_words & 0x3) != 0x3, 2, 4)
+
+    for index, data in enumerate(decode_many(unique_words)):
+        uop = MicroOp.from_decoded(data)
+        if uop.decode_error is not None:
+            table["decode_error"][index] = True
+            table["opcode"][index] = ILLEGAL
+            continue
+        table["opcode"][index] = uop.opcode
+        for field in ["rd", "rs1", "rs2", "rcsr", "wcsr"]:
+            if getattr(uop, field) is not None:
+                table[field][index] = getattr(uop, field)
+        if uop.imm is not None:
+            table["imm"][index] = uop.imm
+            table["has_imm"][index] = True
+
+    return table[inverse]
+
+
+# -------------------
+# Decode the 32-bit aligned words of [start, end) in `memory`
+# -------------------
+def decode_range(memory, start, end):
+    start, end = int(start) & ~0x3, (int(end) + 3) & ~0x3
+    return decode_words(memory.read_range(start, end).view("<u4"))
+
+
+# -------------------
+# Predecoded instruction cache
+#
+# Entries are keyed by PC and validated by the fetched word.
+# Each entry holds a decoded MicroOp template, which is never
+# handed out, callers get copies of its decoded fields.
+#
+# Entries are invalidated per line on stores (`invalidate`)
+# and all at once on FENCE.I (`flush`).
+#
+# Misses are first looked up in predecoded tables of static code
+# (`predecode`), and only sent to the decoder if the table word
+# doesn't match the fetched word.
+# -------------------
+class DecodeCache:
+    def __init__(self, line_shift=6) -> None:
+        self.line_shift = line_shift
+        # pc -> template
+        self.entries = {}
+        # line -> [pc]
+        self.lines = {}
+        # [(base, end, decoded_dtype table)]
+        self.tables = []
+
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, pc, word):
+        pc, word = int(pc), int(word)
+        template = self.entries.get(pc)
+        if template is not None and template.word == word:
+            self.hits += 1
+            return template.copy()
+
+        self.misses += 1
+        template = self.lookup_table(pc, word)
+        if template is None:
+            template = MicroOp.from_decoded(decode_word(word), pc, word)
+        self.entries[pc] = template
+        # A fetched word may span two lines
+        for line in {pc >> self.line_shift, (pc + 3) >> self.line_shift}:
+            self.lines.setdefault(line, []).append(pc)
+        return template.copy()
+
+    # Batch decode static code in [start, end) of `memory`
+    def predecode(self, memory, start, end):
+        self.add_table(start, decode_range(memory, start, end))
+
+    # Register a `decode_range` table of the words from `start`
+    def add_table(self, start, table):
+        base = int(start) & ~0x3
+        self.tables.append((base, base + 4 * len(table), table))
+
+    def lookup_table(self, pc, word):
+        if pc & 0x3:
+            return None
+        for base, end, table in self.tables:
+            if base <= pc < end:
+                record = table[(pc - base) >> 2]
+                if (record["word"] == word) and not record["decode_error"]:
+                    return MicroOp.from_record(record, pc)
+        return None
+
+    def invalidate(self, address, width):
+        address = int(address)
+        for line in range(
+            address >> self.line_shift, ((address + width - 1) >> self.line_shift) + 1
+        ):
+            pcs = self.lines.pop(line, None)
+            if pcs is not None:
+                for pc in pcs:
+                    self.entries.pop(pc, None)
+
+    def flush(self):
+        self.entries = {}
+        self.lines = {}
@@ -0,0 +1,21 @@
+# ====================================================
+# file:       backends.py
+# notes:      selectable instruction execution backends
+# ====================================================
+import func.execution.rv64i as rv64i
+import func.execution.rv64i_int as rv64i_int
+from config.opcodes import opcode_names
+
+# name -> module of per-instruction functions on MicroOp
+# numpy: numpy scalars
+# int:   masked Python ints
+backends = {
+    "numpy": rv64i,
+    "int": rv64i_int,
+}
+
+# name -> opcode id -> execute function (None for ILLEGAL)
+execute_tables = {
+    backend: [getattr(module, name, None) for name in opcode_names]
+    for backend, module in backends.items()
+}
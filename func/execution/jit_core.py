@@ -0,0 +1,548 @@
+# ====================================================
+# file:       jit_core.py
+# notes:      numba-compiled functional RV64IM core
+# ====================================================
+import sys
+
+sys.path.append("../..")
+
+import numpy as np
+from numba import njit
+
+from config.data_types import *
+
+DRAM_BASE = 0x80000000
+
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
+
+# Exit reasons
+EXIT_BUDGET = 0
+EXIT_TOHOST = 1
+EXIT_ECALL = 2
+EXIT_PAGE_FAULT = 3
+EXIT_ILLEGAL = 4
+EXIT_BAD_ADDRESS = 5
+
+# Load/store status
+ACCESS_OK = 0
+ACCESS_PAGE_FAULT = 1
+ACCESS_BAD_ADDRESS = 2
+
+CSR_MCYCLE = 0xB00
+CSR_UEPC = 0x041
+CSR_SEPC = 0x141
+CSR_MEPC = 0x341
+
+
+# -------------------
+# Helpers
+#
+# Registers are handled as int64, which wraps like the hardware.
+# Unsigned compare, divide and logical shift go through uint64.
+# -------------------
+@njit(cache=True)
+def _sext(value, bits):
+    sign = np.int64(1) << (bits - 1)
+    mask = (np.int64(1) << bits) - 1
+    return ((value & mask) ^ sign) - sign
+
+
+@njit(cache=True)
+def _sext_word(value):
+    return ((value & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+
+
+@njit(cache=True)
+def _srl(value, shamt):
+    return np.int64(np.uint64(value) >> np.uint64(shamt))
+
+
+@njit(cache=True)
+def _ltu(a, b):
+    return np.uint64(a) < np.uint64(b)
+
+
+@njit(cache=True)
+def _mulhu(a, b):
+    mask = np.uint64(0xFFFFFFFF)
+    shift = np.uint64(32)
+    a, b = np.uint64(a), np.uint64(b)
+    a_lo, a_hi = a & mask, a >> shift
+    b_lo, b_hi = b & mask, b >> shift
+    lo_lo = a_lo * b_lo
+    hi_lo = a_hi * b_lo
+    lo_hi = a_lo * b_hi
+    cross = (lo_lo >> shift) + (hi_lo & mask) + lo_hi
+    return np.int64(a_hi * b_hi + (hi_lo >> shift) + (cross >> shift))
+
+
+@njit(cache=True)
+def _mulh(a, b):
+    result = _mulhu(a, b)
+    if a < 0:
+        result -= b
+    if b < 0:
+        result -= a
+    return result
+
+
+@njit(cache=True)
+def _mulhsu(a, b):
+    result = _mulhu(a, b)
+    if a < 0:
+        result -= b
+    return result
+
+
+# Magnitude as uint64, exact for INT64_MIN
+@njit(cache=True)
+def _magnitude(value):
+    return np.uint64(-value) if value < 0 else np.uint64(value)
+
+
+@njit(cache=True)
+def _div(a, b):
+    if b == 0:
+        return np.int64(-1)
+    if b == -1:
+        # INT64_MIN / -1 overflows to INT64_MIN
+        return -a
+    quotient = np.int64(_magnitude(a) // _magnitude(b))
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+@njit(cache=True)
+def _rem(a, b):
+    if b == 0:
+        return a
+    if b == -1:
+        return np.int64(0)
+    remainder = np.int64(_magnitude(a) % _magnitude(b))
+    return -remainder if a < 0 else remainder
+
+
+@njit(cache=True)
+def _divu(a, b):
+    if b == 0:
+        return np.int64(-1)
+    return np.int64(np.uint64(a) // np.uint64(b))
+
+
+@njit(cache=True)
+def _remu(a, b):
+    if b == 0:
+        return a
+    return np.int64(np.uint64(a) % np.uint64(b))
+
+
+# -------------------
+# Memory
+#
+# `page_table[page_number - base page]` holds a row of `pool`,
+# or -1 for pages never written (read as zero).
+# -------------------
+@njit(cache=True)
+def _load(page_table, pool, address, width, dram_base):
+    offset = address - dram_base
+    if (offset < 0) or (offset + width > (page_table.shape[0] << PAGE_SHIFT)):
+        return np.int64(0), ACCESS_BAD_ADDRESS
+    value = np.int64(0)
+    for i in range(width):
+        byte_offset = offset + i
+        row = page_table[byte_offset >> PAGE_SHIFT]
+        if row >= 0:
+            value |= np.int64(pool[row, byte_offset & PAGE_MASK]) << (8 * i)
+    return value, ACCESS_OK
+
+
+@njit(cache=True)
+def _store(page_table, pool, written, address, width, value, dram_base):
+    offset = address - dram_base
+    if (offset < 0) or (offset + width > (page_table.shape[0] << PAGE_SHIFT)):
+        return ACCESS_BAD_ADDRESS, address
+    # Both ends must be mapped before anything is written
+    if page_table[offset >> PAGE_SHIFT] < 0:
+        return ACCESS_PAGE_FAULT, address
+    if page_table[(offset + width - 1) >> PAGE_SHIFT] < 0:
+        return ACCESS_PAGE_FAULT, address + width - 1
+    for i in range(width):
+        byte_offset = offset + i
+        row = page_table[byte_offset >> PAGE_SHIFT]
+        pool[row, byte_offset & PAGE_MASK] = (value >> (8 * i)) & 0xFF
+        written[row] = 1
+    return ACCESS_OK, address
+
+
+# -------------------
+# Fetch/decode/execute loop
+#
+# Runs up to `budget` instructions from `pc`, returns
+# (exit reason, pc, cycle, retired, fault address).
+#
+# Exits after a store touching tohost, and before an ECALL,
+# an instruction it can not execute, or a store to an unmapped page.
+# -------------------
+@njit(cache=True)
+def run(gpr, csr, page_table, pool, written, pc, cycle, budget, tohost_addr, dram_base):
+    retired = 0
+    while retired < budget:
+        word, status = _load(page_table, pool, pc, 4, dram_base)
+        if status != ACCESS_OK:
+            return EXIT_BAD_ADDRESS, pc, cycle, retired, pc
+        # C-ext not supported
+        if (word & 0x3) != 0x3:
+            return EXIT_ILLEGAL, pc, cycle, retired, pc
+
+        opcode = word & 0x7F
+        rd = (word >> 7) & 0x1F
+        funct3 = (word >> 12) & 0x7
+        rs1 = (word >> 15) & 0x1F
+        rs2 = (word >> 20) & 0x1F
+        funct7 = (word >> 25) & 0x7F
+
+        a = np.int64(gpr[rs1])
+        b = np.int64(gpr[rs2])
+        imm_i = _sext(word >> 20, 12)
+
+        next_pc = pc + 4
+        write_rd = True
+        value = np.int64(0)
+        tohost_written = False
+
+        # OP-IMM
+        if opcode == 0x13:
+            shamt = (word >> 20) & 0x3F
+            if funct3 == 0:
+                value = a + imm_i
+            elif funct3 == 1:
+                value = a << shamt
+            elif funct3 == 2:
+                value = 1 if a < imm_i else 0
+            elif funct3 == 3:
+                value = 1 if _ltu(a, imm_i) else 0
+            elif funct3 == 4:
+                value = a ^ imm_i
+            elif funct3 == 5:
+                value = (a >> shamt) if (word >> 30) & 1 else _srl(a, shamt)
+            elif funct3 == 6:
+                value = a | imm_i
+            else:
+                value = a & imm_i
+
+        # OP
+        elif opcode == 0x33:
+            shamt = b & 0x3F
+            if funct7 == 0x01:
+                if funct3 == 0:
+                    value = a * b
+                elif funct3 == 1:
+                    value = _mulh(a, b)
+                elif funct3 == 2:
+                    value = _mulhsu(a, b)
+                elif funct3 == 3:
+                    value = _mulhu(a, b)
+                elif funct3 == 4:
+                    value = _div(a, b)
+                elif funct3 == 5:
+                    value = _divu(a, b)
+                elif funct3 == 6:
+                    value = _rem(a, b)
+                else:
+                    value = _remu(a, b)
+            elif funct3 == 0:
+                value = (a - b) if funct7 == 0x20 else (a + b)
+            elif funct3 == 1:
+                value = a << shamt
+            elif funct3 == 2:
+                value = 1 if a < b else 0
+            elif funct3 == 3:
+                value = 1 if _ltu(a, b) else 0
+            elif funct3 == 4:
+                value = a ^ b
+            elif funct3 == 5:
+                value = (a >> shamt) if funct7 == 0x20 else _srl(a, shamt)
+            elif funct3 == 6:
+                value = a | b
+            else:
+                value = a & b
+
+        # OP-IMM-32
+        elif opcode == 0x1B:
+            shamt = (word >> 20) & 0x1F
+            if funct3 == 0:
+                value = _sext_word(a + imm_i)
+            elif funct3 == 1:
+                value = _sext_word(a << shamt)
+            elif funct3 == 5:
+                if (word >> 30) & 1:
+                    value = _sext_word(_sext_word(a) >> shamt)
+                else:
+                    value = _sext_word((a & 0xFFFFFFFF) >> shamt)
+            else:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+
+        # OP-32
+        elif opcode == 0x3B:
+            shamt = b & 0x1F
+            if funct7 == 0x01:
+                if funct3 == 0:
+                    value = _sext_word(a * b)
+                elif funct3 == 4:
+                    value = _sext_word(_div(_sext_word(a), _sext_word(b)))
+                elif funct3 == 5:
+                    value = _sext_word(_divu(a & 0xFFFFFFFF, b & 0xFFFFFFFF))
+                elif funct3 == 6:
+                    value = _sext_word(_rem(_sext_word(a), _sext_word(b)))
+                elif funct3 == 7:
+                    value = _sext_word(_remu(a & 0xFFFFFFFF, b & 0xFFFFFFFF))
+                else:
+                    return EXIT_ILLEGAL, pc, cycle, retired, pc
+            elif funct3 == 0:
+                value = _sext_word((a - b) if funct7 == 0x20 else (a + b))
+            elif funct3 == 1:
+                value = _sext_word(a << shamt)
+            elif funct3 == 5:
+                if funct7 == 0x20:
+                    value = _sext_word(_sext_word(a) >> shamt)
+                else:
+                    value = _sext_word((a & 0xFFFFFFFF) >> shamt)
+            else:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+
+        # LUI
+        elif opcode == 0x37:
+            value = _sext_word(word & 0xFFFFF000)
+
+        # AUIPC
+        elif opcode == 0x17:
+            value = pc + _sext_word(word & 0xFFFFF000)
+
+        # JAL
+        elif opcode == 0x6F:
+            imm_j = (
+                (((word >> 31) & 0x1) << 20)
+                | (((word >> 12) & 0xFF) << 12)
+                | (((word >> 20) & 0x1) << 11)
+                | (((word >> 21) & 0x3FF) << 1)
+            )
+            value = pc + 4
+            next_pc = pc + _sext(imm_j, 21)
+
+        # JALR
+        elif opcode == 0x67:
+            value = pc + 4
+            next_pc = (a + imm_i) & ~np.int64(1)
+
+        # BRANCH
+        elif opcode == 0x63:
+            write_rd = False
+            imm_b = (
+                (((word >> 31) & 0x1) << 12)
+                | (((word >> 7) & 0x1) << 11)
+                | (((word >> 25) & 0x3F) << 5)
+                | (((word >> 8) & 0xF) << 1)
+            )
+            if funct3 == 0:
+                taken = a == b
+            elif funct3 == 1:
+                taken = a != b
+            elif funct3 == 4:
+                taken = a < b
+            elif funct3 == 5:
+                taken = a >= b
+            elif funct3 == 6:
+                taken = _ltu(a, b)
+            elif funct3 == 7:
+                taken = not _ltu(a, b)
+            else:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+            if taken:
+                next_pc = pc + _sext(imm_b, 13)
+
+        # LOAD
+        elif opcode == 0x03:
+            if funct3 == 7:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+            width = 1 << (funct3 & 0x3)
+            value, status = _load(page_table, pool, a + imm_i, width, dram_base)
+            if status != ACCESS_OK:
+                return EXIT_BAD_ADDRESS, pc, cycle, retired, a + imm_i
+            # LB/LH/LW sign extension
+            if funct3 < 3:
+                value = _sext(value, 8 * width)
+
+        # STORE
+        elif opcode == 0x23:
+            write_rd = False
+            if funct3 > 3:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+            width = 1 << funct3
+            address = a + _sext(((word >> 25) << 5) | ((word >> 7) & 0x1F), 12)
+            status, fault_address = _store(
+                page_table, pool, written, address, width, b, dram_base
+            )
+            if status == ACCESS_PAGE_FAULT:
+                return EXIT_PAGE_FAULT, pc, cycle, retired, fault_address
+            if status == ACCESS_BAD_ADDRESS:
+                return EXIT_BAD_ADDRESS, pc, cycle, retired, fault_address
+            tohost_written = (address < tohost_addr + 8) and (
+                address + width > tohost_addr
+            )
+
+        # MISC-MEM: FENCE, FENCE.I
+        elif opcode == 0x0F:
+            write_rd = False
+
+        # SYSTEM
+        elif opcode == 0x73:
+            csr_index = (word >> 20) & 0xFFF
+            if funct3 == 0:
+                write_rd = False
+                if word == 0x00000073:
+                    return EXIT_ECALL, pc, cycle, retired, pc
+                elif word == 0x30200073:
+                    next_pc = np.int64(csr[CSR_MEPC])
+                elif word == 0x10200073:
+                    next_pc = np.int64(csr[CSR_SEPC])
+                elif word == 0x00200073:
+                    next_pc = np.int64(csr[CSR_UEPC])
+                elif (word == 0x00100073) or (word == 0x10500073):
+                    # EBREAK, WFI
+                    pass
+                elif (word & 0xFE007FFF) == 0x12000073:
+                    # SFENCE.VMA
+                    pass
+                else:
+                    return EXIT_ILLEGAL, pc, cycle, retired, pc
+            elif funct3 == 4:
+                return EXIT_ILLEGAL, pc, cycle, retired, pc
+            else:
+                value = np.int64(csr[csr_index])
+                operand = a if funct3 < 4 else np.int64(rs1)
+                if (funct3 & 0x3) == 1:
+                    csr[csr_index] = np.uint64(operand)
+                elif (funct3 & 0x3) == 2:
+                    csr[csr_index] = np.uint64(value | operand)
+                else:
+                    csr[csr_index] = np.uint64(value & ~operand)
+
+        else:
+            return EXIT_ILLEGAL, pc, cycle, retired, pc
+
+        if write_rd and (rd != 0):
+            gpr[rd] = np.uint64(value)
+
+        pc = next_pc
+        cycle += 1
+        csr[CSR_MCYCLE] = np.uint64(cycle)
+        retired += 1
+
+        if tohost_written:
+            return EXIT_TOHOST, pc, cycle, retired, pc
+
+    return EXIT_BUDGET, pc, cycle, retired, pc
+
+
+# -------------------
+# Numba core
+#
+# Shares GPR and CSR arrays with the caller. Memory pages are moved
+# into a 2-D pool, and `memory.pages` entries become views of pool
+# rows, so both sides see every write.
+#
+# Pages allocated on the Python side are adopted on the next `run`.
+# Pages written by the core are reported by `dirty_pages` for
+# decoded-instruction invalidation.
+# -------------------
+class JitCore:
+    def __init__(
+        self, memory, gpr, csr, dram_base=DRAM_BASE, capacity=2 * 1024 * 1024 * 1024
+    ) -> None:
+        self.memory = memory
+        self.gpr = gpr
+        self.csr = csr
+        self.dram_base = dram_base
+        self.base_page = dram_base >> PAGE_SHIFT
+
+        self.page_table = np.full(capacity >> PAGE_SHIFT, -1, dtype=np.int32)
+        self.pool = np.zeros((0, PAGE_SIZE), dtype=byte_type)
+        self.written = np.zeros(0, dtype=byte_type)
+        # row -> page number
+        self.row_pages = []
+        # Size of `memory.pages` once all in-range pages are mapped,
+        # out-of-range pages included
+        self.page_count = 0
+
+        self.adopt_pages()
+
+    def in_range(self, page_number):
+        return 0 <= page_number - self.base_page < self.page_table.shape[0]
+
+    def grow_pool(self):
+        rows = max(16, 2 * self.pool.shape[0])
+        pool = np.zeros((rows, PAGE_SIZE), dtype=byte_type)
+        pool[: self.pool.shape[0]] = self.pool
+        written = np.zeros(rows, dtype=byte_type)
+        written[: self.written.shape[0]] = self.written
+        self.pool, self.written = pool, written
+        for row, page_number in enumerate(self.row_pages):
+            self.memory.pages[page_number] = self.pool[row]
+
+    def map_page(self, page_number):
+        if self.page_table[page_number - self.base_page] >= 0:
+            return
+        if len(self.row_pages) == self.pool.shape[0]:
+            self.grow_pool()
+        if page_number not in self.memory.pages:
+            self.page_count += 1
+        row = len(self.row_pages)
+        self.row_pages.append(page_number)
+        self.pool[row] = self.memory.get_page(page_number)
+        self.memory.pages[page_number] = self.pool[row]
+        self.page_table[page_number - self.base_page] = row
+
+    def adopt_pages(self):
+        for page_number in list(self.memory.pages.keys()):
+            if self.in_range(page_number):
+                self.map_page(page_number)
+        self.page_count = len(self.memory.pages)
+
+    def dirty_pages(self):
+        rows = np.flatnonzero(self.written)
+        self.written[rows] = 0
+        return [self.row_pages[row] << PAGE_SHIFT for row in rows]
+
+    # Returns (exit reason, pc, cycle, retired, fault address)
+    def run(self, pc, cycle, budget, tohost_addr):
+        # Pages allocated outside the core since the last run
+        if len(self.memory.pages) != self.page_count:
+            self.adopt_pages()
+
+        reason, pc, cycle, retired, fault_address = run(
+            self.gpr,
+            self.csr,
+            self.page_table,
+            self.pool,
+            self.written,
+            np.int64(np.uint64(pc)),
+            np.int64(cycle),
+            np.int64(budget),
+            np.int64(tohost_addr),
+            np.int64(self.dram_base),
+        )
+
+        # Store to an unmapped page, map it and let the caller retry
+        if reason == EXIT_PAGE_FAULT:
+            page_number = (int(fault_address) & ((1 << 64) - 1)) >> PAGE_SHIFT
+            if self.in_range(page_number):
+                self.map_page(page_number)
+
+        return (
+            reason,
+            reg_type(np.uint64(pc)),
+            int(cycle),
+            int(retired),
+            reg_type(np.uint64(fault_address)),
+        )
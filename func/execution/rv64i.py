@@ -1,3 +1,4 @@
+import os
 import numpy as np
 from config.data_types import *
 
@@ -5,300 +6,214 @@ import warnings
 
 
 def LUI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(data["imm"][0])
+    data.rd_value = reg_type(data.imm)
     return data
 
 
 def AUIPC(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["pc"] + reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.pc + reg_type(data.imm))
     return data
 
 
 def JAL(data):
-    data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-    data["write_regs"]["int"][0]["value"] = reg_type(data["pc"] + data["insn_len"])
+    data.next_pc = reg_type(data.pc + reg_type(data.imm))
+    data.rd_value = reg_type(data.pc + data.insn_len)
     return data
 
 
 def JALR(data):
-    data["next_pc"] = reg_type(
-        (data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0]))
-        & reg_type(np.invert(reg_type(1)))
+    data.next_pc = reg_type(
+        (data.rs1_value + reg_type(data.imm)) & reg_type(np.invert(reg_type(1)))
     )
-    data["write_regs"]["int"][0]["value"] = reg_type(data["pc"] + data["insn_len"])
+    data.rd_value = reg_type(data.pc + data.insn_len)
     return data
 
 
 def BEQ(data):
-    if data["read_regs"]["int"][0]["value"] == data["read_regs"]["int"][1]["value"]:
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if data.rs1_value == data.rs2_value:
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 # TODO: fix binary complement
 def BNE(data):
-    if data["read_regs"]["int"][0]["value"] != data["read_regs"]["int"][1]["value"]:
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if data.rs1_value != data.rs2_value:
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 def BLT(data):
-    if __binary_complement(data["read_regs"]["int"][0]["value"]) < __binary_complement(
-        data["read_regs"]["int"][1]["value"]
-    ):
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if __binary_complement(data.rs1_value) < __binary_complement(data.rs2_value):
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 def BGE(data):
-    if __binary_complement(data["read_regs"]["int"][0]["value"]) >= __binary_complement(
-        data["read_regs"]["int"][1]["value"]
-    ):
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if __binary_complement(data.rs1_value) >= __binary_complement(data.rs2_value):
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 def BLTU(data):
-    if data["read_regs"]["int"][0]["value"] < data["read_regs"]["int"][1]["value"]:
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if data.rs1_value < data.rs2_value:
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 def BGEU(data):
-    if data["read_regs"]["int"][0]["value"] >= data["read_regs"]["int"][1]["value"]:
-        data["next_pc"] = reg_type(data["pc"] + reg_type(data["imm"][0]))
-        data["taken"] = True
+    if data.rs1_value >= data.rs2_value:
+        data.next_pc = reg_type(data.pc + reg_type(data.imm))
+        data.taken = True
     else:
-        data["next_pc"] = reg_type(data["pc"] + data["insn_len"])
-        data["taken"] = False
+        data.next_pc = reg_type(data.pc + data.insn_len)
+        data.taken = False
     return data
 
 
 def LB(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 1,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 1
     return data
 
 
 def LH(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 2,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 2
     return data
 
 
 def LW(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 4,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 4
     return data
 
 
 # TODO: add 0-ext
 def LBU(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 1,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 1
     return data
 
 
 def LHU(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 2,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 2
     return data
 
 
 def LWU(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 4,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 4
     return data
 
 
 def LD(data):
-    data["load_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 8,
-        }
-    ]
+    data.is_load = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 8
     return data
 
 
 def SB(data):
-    data["store_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 1,
-            "value": data["read_regs"]["int"][1]["value"],
-        }
-    ]
+    data.is_store = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 1
     return data
 
 
 def SH(data):
-    data["store_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 2,
-            "value": data["read_regs"]["int"][1]["value"],
-        }
-    ]
+    data.is_store = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 2
     return data
 
 
 def SW(data):
-    data["store_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 4,
-            "value": data["read_regs"]["int"][1]["value"],
-        }
-    ]
+    data.is_store = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 4
     return data
 
 
 def SD(data):
-    data["store_mem"] = [
-        {
-            "addr": reg_type(
-                data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-            ),
-            "len": 8,
-            "value": data["read_regs"]["int"][1]["value"],
-        }
-    ]
+    data.is_store = True
+    data.mem_addr = reg_type(data.rs1_value + reg_type(data.imm))
+    data.mem_len = 8
     return data
 
 
 def ADDI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value + reg_type(data.imm))
     return data
 
 
 def SLTI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        1
-        if __binary_complement(data["read_regs"]["int"][0]["value"]) < data["imm"][0]
-        else 0
-    )
+    data.rd_value = reg_type(1 if __binary_complement(data.rs1_value) < data.imm else 0)
     return data
 
 
 def SLTIU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        1 if data["read_regs"]["int"][0]["value"] < reg_type(data["imm"][0]) else 0
-    )
+    data.rd_value = reg_type(1 if data.rs1_value < reg_type(data.imm) else 0)
     return data
 
 
 def XORI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] ^ reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value ^ reg_type(data.imm))
     return data
 
 
 def ORI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] | reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value | reg_type(data.imm))
     return data
 
 
 def ANDI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] & reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value & reg_type(data.imm))
     return data
 
 
 def SLLI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] << reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value << reg_type(data.imm))
     return data
 
 
 # todo: comliment highest bit
 def SRLI(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] >> reg_type(data["imm"][0])
-    )
+    data.rd_value = reg_type(data.rs1_value >> reg_type(data.imm))
     return data
 
 
 def SRAI(data):
-    sign = reg_type(data["read_regs"]["int"][0]["value"]) >> reg_type(
-        reg_type(0).itemsize * 8 - 1
-    )
-    shamt = reg_type(data["imm"][0])
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        (reg_type(data["read_regs"]["int"][0]["value"]) >> shamt)
+    sign = reg_type(data.rs1_value) >> reg_type(reg_type(0).itemsize * 8 - 1)
+    shamt = reg_type(data.imm)
+    data.rd_value = reg_type(
+        (reg_type(data.rs1_value) >> shamt)
         | reg_type(
             int(str(sign) * shamt + "0" * int(reg_type(0).itemsize * 8 - shamt), 2)
         )
@@ -307,69 +222,54 @@ def SRAI(data):
 
 
 def ADD(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] + data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value + data.rs2_value)
     return data
 
 
 def SUB(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] - data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value - data.rs2_value)
     return data
 
 
 def SLL(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"]
-        << (reg_type(data["read_regs"]["int"][1]["value"]) & reg_type(0x3F))
+    data.rd_value = reg_type(
+        data.rs1_value << (reg_type(data.rs2_value) & reg_type(0x3F))
     )
     return data
 
 
 def SLT(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    data.rd_value = reg_type(
         1
-        if __binary_complement(data["read_regs"]["int"][0]["value"])
-        < __binary_complement(data["read_regs"]["int"][1]["value"])
+        if __binary_complement(data.rs1_value) < __binary_complement(data.rs2_value)
         else 0
     )
     return data
 
 
 def SLTU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        1
-        if data["read_regs"]["int"][0]["value"] < data["read_regs"]["int"][1]["value"]
-        else 0
-    )
+    data.rd_value = reg_type(1 if data.rs1_value < data.rs2_value else 0)
     return data
 
 
 def XOR(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] ^ data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value ^ data.rs2_value)
     return data
 
 
 # shift right logic
 def SRL(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"]
-        >> (reg_type(data["read_regs"]["int"][1]["value"]) & reg_type(0x3F))
+    data.rd_value = reg_type(
+        data.rs1_value >> (reg_type(data.rs2_value) & reg_type(0x3F))
     )
     return data
 
 
 def SRA(data):
-    sign = reg_type(data["read_regs"]["int"][0]["value"]) >> reg_type(
-        reg_type(0).itemsize * 8 - 1
-    )
-    shamt = reg_type(data["read_regs"]["int"][1]["value"]) & reg_type(0x3F)
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        (reg_type(data["read_regs"]["int"][0]["value"]) >> shamt)
+    sign = reg_type(data.rs1_value) >> reg_type(reg_type(0).itemsize * 8 - 1)
+    shamt = reg_type(data.rs2_value) & reg_type(0x3F)
+    data.rd_value = reg_type(
+        (reg_type(data.rs1_value) >> shamt)
         | reg_type(
             int(str(sign) * shamt + "0" * int(reg_type(0).itemsize * 8 - shamt), 2)
         )
@@ -378,75 +278,58 @@ def SRA(data):
 
 
 def OR(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] | data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value | data.rs2_value)
     return data
 
 
 def AND(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] & data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value & data.rs2_value)
     return data
 
 
 def MUL(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] * data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value * data.rs2_value)
     return data
 
 
 def MULH(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        (data["read_regs"]["int"][0]["value"] * data["read_regs"]["int"][1]["value"])
-        >> word_type(0).itemsize * 8
+    data.rd_value = reg_type(
+        (data.rs1_value * data.rs2_value) >> word_type(0).itemsize * 8
     )
     return data
 
 
 def MULHSU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        (data["read_regs"]["int"][0]["value"] * data["read_regs"]["int"][1]["value"])
-        >> word_type(0).itemsize * 8
+    data.rd_value = reg_type(
+        (data.rs1_value * data.rs2_value) >> word_type(0).itemsize * 8
     )
     return data
 
 
 def MULHU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        (data["read_regs"]["int"][0]["value"] * data["read_regs"]["int"][1]["value"])
-        >> word_type(0).itemsize * 8
+    data.rd_value = reg_type(
+        (data.rs1_value * data.rs2_value) >> word_type(0).itemsize * 8
     )
     return data
 
 
 def DIV(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] / data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value / data.rs2_value)
     return data
 
 
 def DIVU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] / data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value / data.rs2_value)
     return data
 
 
 def REM(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] % data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value % data.rs2_value)
     return data
 
 
 def REMU(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        data["read_regs"]["int"][0]["value"] % data["read_regs"]["int"][1]["value"]
-    )
+    data.rd_value = reg_type(data.rs1_value % data.rs2_value)
     return data
 
 
@@ -461,10 +344,10 @@ def FENCEI(data):
 
 
 def ECALL(data):
-    data["next_pc"] = data["read_regs"]["csr"][0]["value"]
+    data.next_pc = data.csr_value
     # TODO: implement ECALL causes
     # Currently use 11: Environment call from M-mode
-    data["write_regs"]["csr"][0]["value"] = reg_type(11)
+    data.csr_result = reg_type(11)
     warnings.warn("not supported", UserWarning)
     return data
 
@@ -475,13 +358,13 @@ def EBREAK(data):
 
 
 def URET(data):
-    data["next_pc"] = data["read_regs"]["csr"][0]["value"]
+    data.next_pc = data.csr_value
     warnings.warn("not supported", UserWarning)
     return data
 
 
 def SRET(data):
-    data["next_pc"] = data["read_regs"]["csr"][0]["value"]
+    data.next_pc = data.csr_value
     warnings.warn("not supported", UserWarning)
     return data
 
@@ -493,16 +376,16 @@ def SRET(data):
 # CSRs[mstatus].MPIE =1
 def MRET(data):
     # pc = CSRs[mepc]
-    data["next_pc"] = data["read_regs"]["csr"][0]["value"]
+    data.next_pc = data.csr_value
     # previllage = CSRs[mstatus].MPP
     warnings.warn("not supported: no previllage definition yet", UserWarning)
     # TODO: temp
-    del data["write_regs"]
+    # no register is written back
 
     # CSRs[mstatus].MIE = CSRs[mstatus].MPIE,
-    # data["write_regs"]["csr"][0]["value"] = data["read_regs"]["csr"][1]["value"]
+    # data.csr_result = data.csr_value
     # CSRs[mstatus].MPIE =1
-    # data["write_regs"]["csr"][0]["value"] = reg_type(1)
+    # data.csr_result = reg_type(1)
     return data
 
 
@@ -520,93 +403,77 @@ def SFENCEVMA(data):
 # csr/int/fp/other
 def CSRRW(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
+    data.rd_value = data.csr_value
     # csr = rs1
-    data["write_regs"]["csr"][0]["value"] = data["read_regs"]["int"][0]["value"]
+    data.csr_result = data.rs1_value
     return data
 
 
 def CSRRS(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
+    data.rd_value = data.csr_value
     # csr = (rs1 | csr)
-    data["write_regs"]["csr"][0]["value"] = (
-        data["read_regs"]["int"][0]["value"] | data["read_regs"]["csr"][0]["value"]
-    )
+    data.csr_result = data.rs1_value | data.csr_value
     return data
 
 
 def CSRRC(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
-    # csr = (rs1 & csr)
-    data["write_regs"][0]["value"] = (
-        data["read_regs"]["int"][0]["value"] & data["read_regs"]["csr"][0]["value"]
-    )
+    data.rd_value = data.csr_value
+    # csr = (~rs1 & csr)
+    data.csr_result = reg_type(np.invert(reg_type(data.rs1_value))) & data.csr_value
     return data
 
 
 def CSRRWI(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
+    data.rd_value = data.csr_value
     # csr = imm
-    data["write_regs"]["csr"][0]["value"] = reg_type(data["imm"][0])
+    data.csr_result = reg_type(data.imm)
     return data
 
 
 def CSRRSI(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
+    data.rd_value = data.csr_value
     # csr = (imm | csr)
-    data["write_regs"]["csr"][0]["value"] = data["read_regs"]["csr"][0][
-        "value"
-    ] | reg_type(data["imm"][0])
+    data.csr_result = data.csr_value | reg_type(data.imm)
     return data
 
 
 def CSRRCI(data):
     # rd = csr
-    data["write_regs"]["int"][0]["value"] = data["read_regs"]["csr"][0]["value"]
-    # csr = (imm & csr)
-    data["write_regs"][0]["value"] = (
-        reg_type(data["imm"][0]) & data["read_regs"]["csr"][0]["value"]
-    )
+    data.rd_value = data.csr_value
+    # csr = (~imm & csr)
+    data.csr_result = reg_type(np.invert(reg_type(data.imm))) & data.csr_value
     return data
 
 
 def ADDIW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(data["read_regs"]["int"][0]["value"] + reg_type(data["imm"][0]))
-    )
+    data.rd_value = reg_type(sext_word_type(data.rs1_value + reg_type(data.imm)))
     return data
 
 
 def SLLIW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"]) << reg_type(data["imm"][0])
-        )
+    data.rd_value = reg_type(
+        sext_word_type(word_type(data.rs1_value) << reg_type(data.imm))
     )
     return data
 
 
 def SRLIW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"]) >> reg_type(data["imm"][0])
-        )
+    data.rd_value = reg_type(
+        sext_word_type(word_type(data.rs1_value) >> reg_type(data.imm))
     )
     return data
 
 
 def SRAIW(data):
-    sign = word_type(data["read_regs"]["int"][0]["value"]) >> word_type(
-        word_type(0).itemsize * 8 - 1
-    )
-    shamt = word_type(data["imm"][0])
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    sign = word_type(data.rs1_value) >> word_type(word_type(0).itemsize * 8 - 1)
+    shamt = word_type(data.imm)
+    data.rd_value = reg_type(
         sext_word_type(
-            (word_type(data["read_regs"]["int"][0]["value"]) >> shamt)
+            (word_type(data.rs1_value) >> shamt)
             | word_type(
                 int(str(sign) * shamt + "0" * int(word_type(0).itemsize * 8 - shamt), 2)
             )
@@ -616,51 +483,39 @@ def SRAIW(data):
 
 
 def ADDW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            data["read_regs"]["int"][0]["value"] + data["read_regs"]["int"][1]["value"]
-        )
-    )
+    data.rd_value = reg_type(sext_word_type(data.rs1_value + data.rs2_value))
     return data
 
 
 def SUBW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            data["read_regs"]["int"][0]["value"] - data["read_regs"]["int"][1]["value"]
-        )
-    )
+    data.rd_value = reg_type(sext_word_type(data.rs1_value - data.rs2_value))
     return data
 
 
 def SLLW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    data.rd_value = reg_type(
         sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"])
-            << (word_type(data["read_regs"]["int"][1]["value"]) & word_type(0x1F))
+            word_type(data.rs1_value) << (word_type(data.rs2_value) & word_type(0x1F))
         )
     )
     return data
 
 
 def SRLW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    data.rd_value = reg_type(
         sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"])
-            >> (word_type(data["read_regs"]["int"][1]["value"]) & word_type(0x1F))
+            word_type(data.rs1_value) >> (word_type(data.rs2_value) & word_type(0x1F))
         )
     )
     return data
 
 
 def SRAW(data):
-    sign = word_type(data["read_regs"]["int"][0]["value"]) >> word_type(
-        word_type(0).itemsize * 8 - 1
-    )
-    shamt = word_type(data["read_regs"]["int"][1]["value"]) & word_type(0x1F)
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    sign = word_type(data.rs1_value) >> word_type(word_type(0).itemsize * 8 - 1)
+    shamt = word_type(data.rs2_value) & word_type(0x1F)
+    data.rd_value = reg_type(
         sext_word_type(
-            (word_type(data["read_regs"]["int"][0]["value"]) >> shamt)
+            (word_type(data.rs1_value) >> shamt)
             | word_type(
                 int(str(sign) * shamt + "0" * int(word_type(0).itemsize * 8 - shamt), 2)
             )
@@ -670,51 +525,39 @@ def SRAW(data):
 
 
 def MULW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            data["read_regs"]["int"][0]["value"] * data["read_regs"]["int"][1]["value"]
-        )
-    )
+    data.rd_value = reg_type(sext_word_type(data.rs1_value * data.rs2_value))
     return data
 
 
 def DIVW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    data.rd_value = reg_type(
         sext_word_type(
-            __binary_complement_w(word_type(data["read_regs"]["int"][0]["value"]))
-            / __binary_complement_w(word_type(data["read_regs"]["int"][1]["value"]))
+            __binary_complement_w(word_type(data.rs1_value))
+            / __binary_complement_w(word_type(data.rs2_value))
         )
     )
     return data
 
 
 def DIVUW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"])
-            / word_type(data["read_regs"]["int"][1]["value"])
-        )
+    data.rd_value = reg_type(
+        sext_word_type(word_type(data.rs1_value) / word_type(data.rs2_value))
     )
     return data
 
 
 def REMW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
+    data.rd_value = reg_type(
         sext_word_type(
-            __binary_complement_w(word_type(data["read_regs"]["int"][0]["value"]))
-            % __binary_complement_w(word_type(data["read_regs"]["int"][1]["value"]))
+            __binary_complement_w(word_type(data.rs1_value))
+            % __binary_complement_w(word_type(data.rs2_value))
         )
     )
     return data
 
 
 def REMUW(data):
-    data["write_regs"]["int"][0]["value"] = reg_type(
-        sext_word_type(
-            word_type(data["read_regs"]["int"][0]["value"])
-            % data["read_regs"]["int"][1]["value"]
-        )
-    )
+    data.rd_value = reg_type(sext_word_type(word_type(data.rs1_value) % data.rs2_value))
     return data
 
 
@@ -741,7 +584,9 @@ def __binary_complement_w(value):
 
 insn_dict = {}
 
-with open("../config/insn_list_rv64i.txt") as insn_file:
+with open(
+    os.path.join(os.path.dirname(__file__), "../../config/insn_list_rv64i.txt")
+) as insn_file:
     for line in insn_file:
         insn_name = line.split()[0]
         insn_dict[insn_name] = eval(insn_name)
@@ -0,0 +1,483 @@
+import os
+from config.data_types import *
+
+import warnings
+
+# Same instruction set as rv64i.py, on masked Python ints
+# Results are ints in [0, 2**64)
+
+XLEN = reg_type(0).itemsize * 8
+MASK = (1 << XLEN) - 1
+SIGN = 1 << (XLEN - 1)
+
+WORD_MASK = 0xFFFF_FFFF
+WORD_SIGN = 0x8000_0000
+
+
+# Unsigned to signed
+def _signed(value):
+    return (value ^ SIGN) - SIGN
+
+
+def _signed_word(value):
+    return ((value & WORD_MASK) ^ WORD_SIGN) - WORD_SIGN
+
+
+# Sign-extend low 32 bits to XLEN
+def _sext_word(value):
+    return _signed_word(value) & MASK
+
+
+# Divide/remainder rounding towards zero
+def _div(a, b):
+    quotient = abs(a) // abs(b)
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+def _rem(a, b):
+    remainder = abs(a) % abs(b)
+    return -remainder if a < 0 else remainder
+
+
+def LUI(data):
+    data.rd_value = int(data.imm) & MASK
+    return data
+
+
+def AUIPC(data):
+    data.rd_value = (int(data.pc) + int(data.imm)) & MASK
+    return data
+
+
+def JAL(data):
+    data.next_pc = (int(data.pc) + int(data.imm)) & MASK
+    data.rd_value = (int(data.pc) + data.insn_len) & MASK
+    return data
+
+
+def JALR(data):
+    data.next_pc = (int(data.rs1_value) + int(data.imm)) & MASK & ~1
+    data.rd_value = (int(data.pc) + data.insn_len) & MASK
+    return data
+
+
+def __branch(data, taken):
+    if taken:
+        data.next_pc = (int(data.pc) + int(data.imm)) & MASK
+        data.taken = True
+    else:
+        data.next_pc = (int(data.pc) + data.insn_len) & MASK
+        data.taken = False
+    return data
+
+
+def BEQ(data):
+    return __branch(data, int(data.rs1_value) == int(data.rs2_value))
+
+
+def BNE(data):
+    return __branch(data, int(data.rs1_value) != int(data.rs2_value))
+
+
+def BLT(data):
+    return __branch(data, _signed(int(data.rs1_value)) < _signed(int(data.rs2_value)))
+
+
+def BGE(data):
+    return __branch(data, _signed(int(data.rs1_value)) >= _signed(int(data.rs2_value)))
+
+
+def BLTU(data):
+    return __branch(data, int(data.rs1_value) < int(data.rs2_value))
+
+
+def BGEU(data):
+    return __branch(data, int(data.rs1_value) >= int(data.rs2_value))
+
+
+def __load(data, length):
+    data.is_load = True
+    data.mem_addr = (int(data.rs1_value) + int(data.imm)) & MASK
+    data.mem_len = length
+    return data
+
+
+def LB(data):
+    return __load(data, 1)
+
+
+def LH(data):
+    return __load(data, 2)
+
+
+def LW(data):
+    return __load(data, 4)
+
+
+def LBU(data):
+    return __load(data, 1)
+
+
+def LHU(data):
+    return __load(data, 2)
+
+
+def LWU(data):
+    return __load(data, 4)
+
+
+def LD(data):
+    return __load(data, 8)
+
+
+def __store(data, length):
+    data.is_store = True
+    data.mem_addr = (int(data.rs1_value) + int(data.imm)) & MASK
+    data.mem_len = length
+    return data
+
+
+def SB(data):
+    return __store(data, 1)
+
+
+def SH(data):
+    return __store(data, 2)
+
+
+def SW(data):
+    return __store(data, 4)
+
+
+def SD(data):
+    return __store(data, 8)
+
+
+def ADDI(data):
+    data.rd_value = (int(data.rs1_value) + int(data.imm)) & MASK
+    return data
+
+
+def SLTI(data):
+    data.rd_value = 1 if _signed(int(data.rs1_value)) < int(data.imm) else 0
+    return data
+
+
+def SLTIU(data):
+    data.rd_value = 1 if int(data.rs1_value) < (int(data.imm) & MASK) else 0
+    return data
+
+
+def XORI(data):
+    data.rd_value = int(data.rs1_value) ^ (int(data.imm) & MASK)
+    return data
+
+
+def ORI(data):
+    data.rd_value = int(data.rs1_value) | (int(data.imm) & MASK)
+    return data
+
+
+def ANDI(data):
+    data.rd_value = int(data.rs1_value) & (int(data.imm) & MASK)
+    return data
+
+
+def SLLI(data):
+    data.rd_value = (int(data.rs1_value) << int(data.imm)) & MASK
+    return data
+
+
+def SRLI(data):
+    data.rd_value = int(data.rs1_value) >> int(data.imm)
+    return data
+
+
+def SRAI(data):
+    data.rd_value = (_signed(int(data.rs1_value)) >> int(data.imm)) & MASK
+    return data
+
+
+def ADD(data):
+    data.rd_value = (int(data.rs1_value) + int(data.rs2_value)) & MASK
+    return data
+
+
+def SUB(data):
+    data.rd_value = (int(data.rs1_value) - int(data.rs2_value)) & MASK
+    return data
+
+
+def SLL(data):
+    data.rd_value = (int(data.rs1_value) << (int(data.rs2_value) & 0x3F)) & MASK
+    return data
+
+
+def SLT(data):
+    data.rd_value = (
+        1 if _signed(int(data.rs1_value)) < _signed(int(data.rs2_value)) else 0
+    )
+    return data
+
+
+def SLTU(data):
+    data.rd_value = 1 if int(data.rs1_value) < int(data.rs2_value) else 0
+    return data
+
+
+def XOR(data):
+    data.rd_value = int(data.rs1_value) ^ int(data.rs2_value)
+    return data
+
+
+def SRL(data):
+    data.rd_value = int(data.rs1_value) >> (int(data.rs2_value) & 0x3F)
+    return data
+
+
+def SRA(data):
+    data.rd_value = (
+        _signed(int(data.rs1_value)) >> (int(data.rs2_value) & 0x3F)
+    ) & MASK
+    return data
+
+
+def OR(data):
+    data.rd_value = int(data.rs1_value) | int(data.rs2_value)
+    return data
+
+
+def AND(data):
+    data.rd_value = int(data.rs1_value) & int(data.rs2_value)
+    return data
+
+
+def MUL(data):
+    data.rd_value = (int(data.rs1_value) * int(data.rs2_value)) & MASK
+    return data
+
+
+def MULH(data):
+    data.rd_value = (
+        (_signed(int(data.rs1_value)) * _signed(int(data.rs2_value))) >> XLEN
+    ) & MASK
+    return data
+
+
+def MULHSU(data):
+    data.rd_value = (
+        (_signed(int(data.rs1_value)) * int(data.rs2_value)) >> XLEN
+    ) & MASK
+    return data
+
+
+def MULHU(data):
+    data.rd_value = (int(data.rs1_value) * int(data.rs2_value)) >> XLEN
+    return data
+
+
+def DIV(data):
+    a, b = _signed(int(data.rs1_value)), _signed(int(data.rs2_value))
+    # Overflow (-2**63 / -1) wraps to -2**63
+    data.rd_value = MASK if b == 0 else _div(a, b) & MASK
+    return data
+
+
+def DIVU(data):
+    a, b = int(data.rs1_value), int(data.rs2_value)
+    data.rd_value = MASK if b == 0 else a // b
+    return data
+
+
+def REM(data):
+    a, b = _signed(int(data.rs1_value)), _signed(int(data.rs2_value))
+    data.rd_value = (a if b == 0 else _rem(a, b)) & MASK
+    return data
+
+
+def REMU(data):
+    a, b = int(data.rs1_value), int(data.rs2_value)
+    data.rd_value = a if b == 0 else a % b
+    return data
+
+
+def FENCE(data):
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def FENCEI(data):
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def ECALL(data):
+    data.next_pc = int(data.csr_value)
+    # TODO: implement ECALL causes
+    # Currently use 11: Environment call from M-mode
+    data.csr_result = 11
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def EBREAK(data):
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def URET(data):
+    data.next_pc = int(data.csr_value)
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def SRET(data):
+    data.next_pc = int(data.csr_value)
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def MRET(data):
+    # pc = CSRs[mepc]
+    data.next_pc = int(data.csr_value)
+    warnings.warn("not supported: no previllage definition yet", UserWarning)
+    # no register is written back
+    return data
+
+
+def WFI(data):
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+def SFENCEVMA(data):
+    warnings.warn("not supported", UserWarning)
+    return data
+
+
+# register sequence:
+# csr/int/fp/other
+def CSRRW(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = int(data.rs1_value)
+    return data
+
+
+def CSRRS(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = int(data.rs1_value) | int(data.csr_value)
+    return data
+
+
+def CSRRC(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = ~int(data.rs1_value) & int(data.csr_value)
+    return data
+
+
+def CSRRWI(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = int(data.imm) & MASK
+    return data
+
+
+def CSRRSI(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = int(data.csr_value) | (int(data.imm) & MASK)
+    return data
+
+
+def CSRRCI(data):
+    data.rd_value = int(data.csr_value)
+    data.csr_result = ~int(data.imm) & int(data.csr_value)
+    return data
+
+
+def ADDIW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) + int(data.imm))
+    return data
+
+
+def SLLIW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) << int(data.imm))
+    return data
+
+
+def SRLIW(data):
+    data.rd_value = _sext_word((int(data.rs1_value) & WORD_MASK) >> int(data.imm))
+    return data
+
+
+def SRAIW(data):
+    data.rd_value = _sext_word(_signed_word(int(data.rs1_value)) >> int(data.imm))
+    return data
+
+
+def ADDW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) + int(data.rs2_value))
+    return data
+
+
+def SUBW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) - int(data.rs2_value))
+    return data
+
+
+def SLLW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) << (int(data.rs2_value) & 0x1F))
+    return data
+
+
+def SRLW(data):
+    data.rd_value = _sext_word(
+        (int(data.rs1_value) & WORD_MASK) >> (int(data.rs2_value) & 0x1F)
+    )
+    return data
+
+
+def SRAW(data):
+    data.rd_value = _sext_word(
+        _signed_word(int(data.rs1_value)) >> (int(data.rs2_value) & 0x1F)
+    )
+    return data
+
+
+def MULW(data):
+    data.rd_value = _sext_word(int(data.rs1_value) * int(data.rs2_value))
+    return data
+
+
+def DIVW(data):
+    a, b = _signed_word(int(data.rs1_value)), _signed_word(int(data.rs2_value))
+    data.rd_value = MASK if b == 0 else _sext_word(_div(a, b))
+    return data
+
+
+def DIVUW(data):
+    a, b = int(data.rs1_value) & WORD_MASK, int(data.rs2_value) & WORD_MASK
+    data.rd_value = MASK if b == 0 else _sext_word(a // b)
+    return data
+
+
+def REMW(data):
+    a, b = _signed_word(int(data.rs1_value)), _signed_word(int(data.rs2_value))
+    data.rd_value = _sext_word(a if b == 0 else _rem(a, b))
+    return data
+
+
+def REMUW(data):
+    a, b = int(data.rs1_value) & WORD_MASK, int(data.rs2_value) & WORD_MASK
+    data.rd_value = _sext_word(a if b == 0 else a % b)
+    return data
+
+
+# =============================================================
+
+insn_dict = {}
+
+with open(
+    os.path.join(os.path.dirname(__file__), "../../config/insn_list_rv64i.txt")
+) as insn_file:
+    for line in insn_file:
+        insn_name = line.split()[0]
+        insn_dict[insn_name] = eval(insn_name)
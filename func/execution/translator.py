@@ -0,0 +1,309 @@
+# ====================================================
+# file:       translator.py
+# notes:      basic-block translation for the functional simulator
+# ====================================================
+import sys
+
+sys.path.append("../..")
+
+from config.data_types import *
+
+REG_MASK = (1 << (reg_type(0).itemsize * 8)) - 1
+SIGN_BIT = 1 << (reg_type(0).itemsize * 8 - 1)
+
+
+# -------------------
+# Expression templates
+#
+# Operands are Python ints in [0, 2**64), `{a}`/`{b}` are rs1/rs2,
+# `{imm}` is the masked immediate, `{simm}` the signed one and
+# `{shamt}` the shift amount.
+# -------------------
+def _signed(operand):
+    return "(({} ^ {}) - {})".format(operand, SIGN_BIT, SIGN_BIT)
+
+
+def _sext_word(expression):
+    return "(((({}) & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000) & {}".format(
+        expression, REG_MASK
+    )
+
+
+alu_templates = {
+    "ADDI": "({a} + {imm}) & " + str(REG_MASK),
+    "SLTI": "int(" + _signed("{a}") + " < {simm})",
+    "SLTIU": "int({a} < {imm})",
+    "XORI": "{a} ^ {imm}",
+    "ORI": "{a} | {imm}",
+    "ANDI": "{a} & {imm}",
+    "SLLI": "({a} << {shamt}) & " + str(REG_MASK),
+    "SRLI": "{a} >> {shamt}",
+    "SRAI": "(" + _signed("{a}") + " >> {shamt}) & " + str(REG_MASK),
+    "ADD": "({a} + {b}) & " + str(REG_MASK),
+    "SUB": "({a} - {b}) & " + str(REG_MASK),
+    "SLL": "({a} << ({b} & 0x3F)) & " + str(REG_MASK),
+    "SLT": "int(" + _signed("{a}") + " < " + _signed("{b}") + ")",
+    "SLTU": "int({a} < {b})",
+    "XOR": "{a} ^ {b}",
+    "SRL": "{a} >> ({b} & 0x3F)",
+    "SRA": "(" + _signed("{a}") + " >> ({b} & 0x3F)) & " + str(REG_MASK),
+    "OR": "{a} | {b}",
+    "AND": "{a} & {b}",
+    "ADDIW": _sext_word("{a} + {imm}"),
+    "SLLIW": _sext_word("{a} << {shamt}"),
+    "SRLIW": _sext_word("({a} & 0xFFFFFFFF) >> {shamt}"),
+    "SRAIW": _sext_word("((({a} & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000) >> {shamt}"),
+    "ADDW": _sext_word("{a} + {b}"),
+    "SUBW": _sext_word("{a} - {b}"),
+    "SLLW": _sext_word("{a} << ({b} & 0x1F)"),
+    "SRLW": _sext_word("({a} & 0xFFFFFFFF) >> ({b} & 0x1F)"),
+    "SRAW": _sext_word(
+        "((({a} & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000) >> ({b} & 0x1F)"
+    ),
+}
+
+branch_templates = {
+    "BEQ": "{a} == {b}",
+    "BNE": "{a} != {b}",
+    "BLT": _signed("{a}") + " < " + _signed("{b}"),
+    "BGE": _signed("{a}") + " >= " + _signed("{b}"),
+    "BLTU": "{a} < {b}",
+    "BGEU": "{a} >= {b}",
+}
+
+# name: (width, sign_extend)
+load_widths = {
+    "LB": (1, True),
+    "LH": (2, True),
+    "LW": (4, True),
+    "LBU": (1, False),
+    "LHU": (2, False),
+    "LWU": (4, False),
+    "LD": (8, False),
+}
+
+store_widths = {
+    "SB": 1,
+    "SH": 2,
+    "SW": 4,
+    "SD": 8,
+}
+
+
+def is_translatable(uop):
+    return (
+        (uop.decode_error is None)
+        and (uop.insn_len == 4)
+        and (
+            uop.name in alu_templates
+            or uop.name in branch_templates
+            or uop.name in load_widths
+            or uop.name in store_widths
+            or uop.name in ["LUI", "AUIPC", "JAL", "JALR"]
+        )
+    )
+
+
+# -------------------
+# Block translator
+#
+# A block starts at any PC reached at run time and runs up to the
+# first branch or jump (included) or the first instruction that is
+# not translatable (excluded, left to the interpreter).
+#
+# Each block is compiled once into a Python function
+#     block(gpr, load, store) -> (next_pc, instruction_count)
+# which keeps registers in local ints and writes them back to `gpr`
+# on exit. `load(address, width, sign_extend)` returns an int,
+# `store(address, width, value)` returns True if the block must exit
+# right after the store (e.g. it hit translated code or tohost).
+#
+# Blocks branching back to their own entry loop inside the function
+# for up to `loop_limit` instructions.
+#
+# Blocks are invalidated per line on stores (`invalidate`)
+# and all at once on FENCE.I (`flush`).
+# -------------------
+class BlockTranslator:
+    def __init__(
+        self, memory, decode_cache, line_shift=6, max_block_size=64, loop_limit=4096
+    ) -> None:
+        self.memory = memory
+        self.decode_cache = decode_cache
+        self.line_shift = line_shift
+        self.max_block_size = max_block_size
+        self.loop_limit = loop_limit
+        # pc -> compiled block, None if the first instruction is not translatable
+        self.blocks = {}
+        # line -> [pc]
+        self.lines = {}
+
+        self.translations = 0
+
+    def lookup(self, pc):
+        pc = int(pc)
+        if pc in self.blocks:
+            return self.blocks[pc]
+
+        uops = []
+        fetch_pc = pc
+        while len(uops) < self.max_block_size:
+            uop = self.decode_cache.decode(
+                fetch_pc, word_type(self.memory.read_bytes(fetch_pc, 4))
+            )
+            if not is_translatable(uop):
+                break
+            uops.append(uop)
+            fetch_pc += uop.insn_len
+            if (uop.name in branch_templates) or (uop.name in ["JAL", "JALR"]):
+                break
+
+        block = self.compile(pc, uops) if len(uops) > 0 else None
+        self.blocks[pc] = block
+        # Lines of the translated words, or of the rejected one
+        for line in range(
+            pc >> self.line_shift, ((max(fetch_pc, pc + 4) - 1) >> self.line_shift) + 1
+        ):
+            self.lines.setdefault(line, []).append(pc)
+        return block
+
+    def invalidate(self, address, width):
+        address = int(address)
+        invalidated = False
+        for line in range(
+            address >> self.line_shift, ((address + width - 1) >> self.line_shift) + 1
+        ):
+            pcs = self.lines.pop(line, None)
+            if pcs is not None:
+                for pc in pcs:
+                    self.blocks.pop(pc, None)
+                invalidated = True
+        return invalidated
+
+    def flush(self):
+        self.blocks = {}
+        self.lines = {}
+
+    def compile(self, entry_pc, uops):
+        self.translations += 1
+
+        registers = sorted(
+            {
+                index
+                for uop in uops
+                for index in (uop.rs1, uop.rs2, uop.rd)
+                if (index is not None) and (index != 0)
+            }
+        )
+        written = sorted(
+            {uop.rd for uop in uops if (uop.rd is not None) and (uop.rd != 0)}
+        )
+
+        last = uops[-1]
+        loop = ((last.name in branch_templates) or (last.name == "JAL")) and (
+            (int(last.pc) + int(last.imm)) & REG_MASK == entry_pc
+        )
+
+        body = []
+
+        def emit(line, depth=0):
+            body.append("    " * (depth + (2 if loop else 1)) + line)
+
+        def emit_exit(next_pc, count, depth=0):
+            for index in written:
+                emit("gpr[{}] = x{}".format(index, index), depth)
+            emit(
+                "return {}, {}{}".format(next_pc, "count + " if loop else "", count),
+                depth,
+            )
+
+        for i, uop in enumerate(uops):
+            pc = int(uop.pc)
+            imm = int(uop.imm) if uop.imm is not None else 0
+            fields = {
+                "a": "x{}".format(uop.rs1) if uop.rs1 else "0",
+                "b": "x{}".format(uop.rs2) if uop.rs2 else "0",
+                "imm": imm & REG_MASK,
+                "simm": imm,
+                "shamt": imm & 0x3F,
+            }
+            rd = "x{}".format(uop.rd) if uop.rd else None
+            fall_through = (pc + uop.insn_len) & REG_MASK
+            target = (pc + imm) & REG_MASK
+            count = i + 1
+
+            if uop.name in alu_templates:
+                if rd is not None:
+                    emit("{} = {}".format(rd, alu_templates[uop.name].format(**fields)))
+            elif uop.name == "LUI":
+                if rd is not None:
+                    emit("{} = {}".format(rd, imm & REG_MASK))
+            elif uop.name == "AUIPC":
+                if rd is not None:
+                    emit("{} = {}".format(rd, target))
+            elif uop.name in load_widths:
+                width, sign_extend = load_widths[uop.name]
+                emit(
+                    "{} = load(({a} + {imm}) & {mask}, {width}, {sign_extend})".format(
+                        rd if rd is not None else "_",
+                        mask=REG_MASK,
+                        width=width,
+                        sign_extend=sign_extend,
+                        **fields
+                    )
+                )
+            elif uop.name in store_widths:
+                emit(
+                    "if store(({a} + {imm}) & {mask}, {width}, {b}):".format(
+                        mask=REG_MASK, width=store_widths[uop.name], **fields
+                    )
+                )
+                emit_exit(fall_through, count, 1)
+            elif uop.name in branch_templates:
+                emit("if {}:".format(branch_templates[uop.name].format(**fields)))
+                if loop:
+                    emit("count += {}".format(count), 1)
+                    emit("if count < {}:".format(self.loop_limit), 1)
+                    emit("continue", 2)
+                    emit_exit(target, 0, 1)
+                else:
+                    emit_exit(target, count, 1)
+                emit_exit(fall_through, count)
+            elif uop.name == "JAL":
+                if rd is not None:
+                    emit("{} = {}".format(rd, fall_through))
+                if loop:
+                    emit("count += {}".format(count))
+                    emit("if count < {}:".format(self.loop_limit))
+                    emit("continue", 1)
+                    emit_exit(target, 0)
+                else:
+                    emit_exit(target, count)
+            elif uop.name == "JALR":
+                # rs1 may be overwritten by rd
+                emit(
+                    "next_pc = ({a} + {imm}) & {mask}".format(
+                        mask=REG_MASK ^ 1, **fields
+                    )
+                )
+                if rd is not None:
+                    emit("{} = {}".format(rd, fall_through))
+                emit_exit("next_pc", count)
+
+        if not ((last.name in branch_templates) or (last.name in ["JAL", "JALR"])):
+            emit_exit((int(last.pc) + last.insn_len) & REG_MASK, len(uops))
+
+        name = "block_{:x}".format(entry_pc)
+        source = ["def {}(gpr, load, store):".format(name)]
+        for index in registers:
+            source.append("    x{} = int(gpr[{}])".format(index, index))
+        if loop:
+            source.append("    count = 0")
+            source.append("    while True:")
+        source += body
+
+        namespace = {}
+        exec(compile("\n".join(source), "<{}>".format(name), "exec"), namespace)
+        block = namespace[name]
+        block.source = "\n".join(source)
+        return block
@@ -0,0 +1,187 @@
+# ====================================================
+# file:       micro_op.py
+# notes:      instruction record passed between stages
+# ====================================================
+import sys
+
+sys.path.append("..")
+
+from config.data_types import *
+from config.opcodes import opcode_ids, opcode_names, opcode_flags, ILLEGAL
+
+
+# -------------------
+# Micro-op
+#
+# Fixed-field record of one dynamic instruction.
+# Fields not used by an instruction stay None.
+# -------------------
+class MicroOp:
+    __slots__ = (
+        # Decoded fields
+        "opcode",
+        "flags",
+        "name",
+        "pc",
+        "word",
+        "insn_len",
+        "imm",
+        "rs1",
+        "rs2",
+        "rd",
+        "rcsr",
+        "wcsr",
+        "decode_error",
+        # Renaming
+        "prs1",
+        "prs2",
+        "prd",
+        "lprd",
+        "p1",
+        "p2",
+        # Operands and results
+        "rs1_value",
+        "rs2_value",
+        "csr_value",
+        "rd_value",
+        "csr_result",
+        # Memory access
+        "is_load",
+        "is_store",
+        "mem_addr",
+        "mem_len",
+        # Control flow
+        "next_pc",
+        "taken",
+        # Scheduling
+        "function_unit_type",
+        "function_unit_index",
+        "rob_index",
+        # Squash epoch on entering the ROB
+        "epoch",
+    )
+
+    def __init__(self) -> None:
+        self.opcode = None
+        self.flags = 0
+        self.name = None
+        self.pc = None
+        self.word = None
+        self.insn_len = None
+        self.imm = None
+        self.rs1 = None
+        self.rs2 = None
+        self.rd = None
+        self.rcsr = None
+        self.wcsr = None
+        self.decode_error = None
+
+        self.prs1 = None
+        self.prs2 = None
+        self.prd = None
+        self.lprd = None
+        self.p1 = None
+        self.p2 = None
+
+        self.rs1_value = None
+        self.rs2_value = None
+        self.csr_value = None
+        self.rd_value = None
+        self.csr_result = None
+
+        self.is_load = False
+        self.is_store = False
+        self.mem_addr = None
+        self.mem_len = None
+
+        self.next_pc = None
+        self.taken = None
+
+        self.function_unit_type = None
+        self.function_unit_index = None
+        self.rob_index = None
+        self.epoch = None
+
+    # Build from `utils.decoder_wrapper.decode` output
+    @classmethod
+    def from_decoded(cls, data, pc=None, word=None):
+        uop = cls()
+        if pc is not None:
+            # Keep PC arithmetic in `reg_type`
+            uop.pc = reg_type(pc)
+        uop.word = word
+        if word is not None:
+            uop.insn_len = 2 if (word & 0x3) != 0x3 else 4
+
+        if "decode_error" in data:
+            uop.decode_error = data["decode_error"]
+            return uop
+
+        uop.name = data["name"]
+        uop.opcode = opcode_ids.get(data["name"], ILLEGAL)
+        uop.flags = opcode_flags[uop.opcode]
+        if "imm" in data:
+            uop.imm = data["imm"][0]
+
+        if "read_regs" in data:
+            int_regs = data["read_regs"].get("int", [])
+            if len(int_regs) >= 1:
+                uop.rs1 = int_regs[0]["index"]
+            if len(int_regs) >= 2:
+                uop.rs2 = int_regs[1]["index"]
+            if "csr" in data["read_regs"]:
+                uop.rcsr = data["read_regs"]["csr"][0]["index"]
+
+        if "write_regs" in data:
+            if "int" in data["write_regs"]:
+                uop.rd = data["write_regs"]["int"][0]["index"]
+            if "csr" in data["write_regs"]:
+                uop.wcsr = data["write_regs"]["csr"][0]["index"]
+
+        return uop
+
+    # Build from a `func.decode.decoder.decoded_dtype` record
+    @classmethod
+    def from_record(cls, record, pc):
+        uop = cls()
+        uop.pc = reg_type(pc)
+        uop.word = int(record["word"])
+        uop.insn_len = int(record["insn_len"])
+        uop.opcode = int(record["opcode"])
+        uop.flags = opcode_flags[uop.opcode]
+        uop.name = opcode_names[uop.opcode]
+        if record["has_imm"]:
+            uop.imm = record["imm"]
+        for field in ["rd", "rs1", "rs2", "rcsr", "wcsr"]:
+            if record[field] >= 0:
+                setattr(uop, field, int(record[field]))
+        return uop
+
+    # Copy decoded fields only, leaving dynamic state empty
+    def copy(self):
+        uop = MicroOp()
+        uop.opcode = self.opcode
+        uop.flags = self.flags
+        uop.name = self.name
+        uop.pc = self.pc
+        uop.word = self.word
+        uop.insn_len = self.insn_len
+        uop.imm = self.imm
+        uop.rs1 = self.rs1
+        uop.rs2 = self.rs2
+        uop.rd = self.rd
+        uop.rcsr = self.rcsr
+        uop.wcsr = self.wcsr
+        uop.decode_error = self.decode_error
+        return uop
+
+    # (field, value) pairs of assigned fields, for debug printing
+    def items(self):
+        return [
+            (slot, getattr(self, slot))
+            for slot in self.__slots__
+            if getattr(self, slot) is not None
+        ]
+
+    def __str__(self) -> str:
+        return str(dict(self.items()))
@@ -9,9 +9,11 @@ sys.path.append("..")
 
 from config.data_types import *
 from config.register_name import register_name
-from utils.elf_parser import load_elf
+from utils.elf_cache import load_program
+from func.decode.decoder import DecodeCache
 
 from modules import *
+from module_base import Channel
 
 np.set_printoptions(formatter={"int": hex})
 
@@ -37,13 +39,16 @@ class Simulator:
         self.cycle = 1
 
         self.reg = REG.PhysicalRegisterFile(100)
-        self.memory = MEM.Memory(data.memory.data)
+        self.memory = MEM.Memory(data.memory.pages())
+        self.decode_cache = DecodeCache()
+        for start, table in data.text_tables:
+            self.decode_cache.add_table(start, table)
 
         self.IF = IFU.IFU(self.memory, reg_type(data.entry_pc))
-        self.ID = IDU.IDU()
+        self.ID = IDU.IDU(self.decode_cache)
         self.ROB = ROB.reorder_buffer(32, self.reg, 2)
         self.EX = EX.EX()
-        self.load_store_unit = LSU.LSU(self.memory)
+        self.load_store_unit = LSU.LSU(self.memory, self.decode_cache)
 
         self.linkages = [
             "IF->ID",
@@ -52,6 +57,14 @@ class Simulator:
             "EX->ROB",
             "ROB->IF",
         ]
+        handlers = {
+            "EX->ROB": lambda data: self.load_store_unit.tick(data).step(),
+            "ROB->IF": self.signal_flush,
+        }
+        self.channels = [
+            Channel.link(self, linkage, handler=handlers.get(linkage))
+            for linkage in self.linkages
+        ]
 
         self.flush_signal = False
 
@@ -62,20 +75,12 @@ class Simulator:
         # debug logging
         print("-" * 10, "tick @ cycle:", self.cycle, "-" * 10)
 
-        for linkage in self.linkages:
-            src, dst = linkage.split("->")
-            src, dst = (
-                getattr(self, src).ports["output"][dst],
-                getattr(self, dst).ports["input"][src],
-            )
-            if src.valid and dst.ready:
-                src.data, dst.data = None, src.data
-                if dst.name == "EX->[ROB]":
-                    dst.data = self.load_store_unit.tick(dst.data).step()
-                if dst.name == "ROB->[IF]":
-                    self.flush_signal = True
-                src.update_status()
-                dst.update_status()
+        for channel in self.channels:
+            channel.propagate()
+
+    def signal_flush(self, data):
+        self.flush_signal = True
+        return data
 
     # Updata internal status
     def step(self):
@@ -107,10 +112,12 @@ class Simulator:
         self.ROB.flush()
         self.EX.flush()
         self.load_store_unit.flush()
+        for channel in self.channels:
+            channel.clear()
 
 
 for test in rv64ui_p_tests:
-    cpu = Simulator(load_elf(riscv_tests_path + test, 2049 * 1024 * 1024))
+    cpu = Simulator(load_program(riscv_tests_path + test, 2049 * 1024 * 1024))
 
     while cpu.exit is not True:
         cpu.tick()
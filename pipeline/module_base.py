@@ -2,6 +2,8 @@
 
 import sys
 import os
+import heapq
+from collections import deque
 
 from numpy.lib.arraysetops import isin
 
@@ -9,6 +11,7 @@ sys.path.append("..")
 
 from config.data_types import *
 from config.register_name import register_name
+from func.micro_op import MicroOp
 
 
 class ModuleBase:
@@ -19,6 +22,11 @@ class ModuleBase:
             "input": {},
             "output": {},
         }
+        # Squash epoch, bumped on flush
+        # Micro-ops of older epochs are dropped where they are found
+        self.epoch = 0
+        # Scheduler stepping this module, see `Scheduler`
+        self.scheduler = None
 
 
 # StateMachine
@@ -46,13 +54,18 @@ class Module(ModuleBase):
     def op(self, data):
         pass
 
+    # Register wake-up conditions of an event-driven module,
+    # called by `Scheduler.add`
+    def attach(self, scheduler):
+        pass
+
     def flush(self):
+        self.epoch += 1
         self.input_port = None
         self.output_port = None
         for port_type in self.ports:
-            for port in self.ports[port_type]:
-                self.ports[port_type][port].data = None
-                self.ports[port_type][port].update_status()
+            for port in self.ports[port_type].values():
+                port.clear()
 
 
 class Port:
@@ -61,14 +74,27 @@ class Port:
         self.data = None
         self.valid = self.data is not None
         self.ready = self.data is None
+        # Read once, checked on every update
+        self.debug = os.environ.get("DEBUG_PRINT") is not None
+        # Called on data arrival
+        self.listeners = []
 
     def update_status(self):
         self.valid = self.data is not None
         self.ready = self.data is None
 
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.valid:
+            for listener in self.listeners:
+                listener()
+
+        if self.debug:
             self.print()
 
+    def clear(self):
+        self.data = None
+        self.valid = False
+        self.ready = True
+
     def print(self):
         print("{}: [valid:{} ready:{}]".format(self.name, self.valid, self.ready))
         self.print_data(self.data)
@@ -100,7 +126,7 @@ class Port:
                 print("  ]")
 
         elif isinstance(data, list):
-            if isinstance(data[0], dict):
+            if isinstance(data[0], (dict, MicroOp)):
                 for item in data:
                     print("  [")
                     for k, v in item.items():
@@ -120,3 +146,173 @@ class Port:
                             else:
                                 print("    {}: {}".format(k, str(v)))
                         print("  ]")
+
+
+# -------------------
+# Channel between an output port and an input port
+#
+# Built once from a linkage like "IF->ID", propagated on every tick.
+#
+# Args:
+#   `latency`: extra cycles spent in the channel, 0 moves data
+#       directly when the input port is ready
+#   `depth`: max payloads in flight, defaults to `latency`
+#   `bandwidth`: max payloads accepted and delivered per tick
+#   `handler`: applied to each payload on delivery
+# -------------------
+class Channel:
+    def __init__(
+        self, src, dst, latency=0, depth=None, bandwidth=1, handler=None
+    ) -> None:
+        self.src = src
+        self.dst = dst
+        self.latency = latency
+        self.depth = latency if depth is None else depth
+        self.bandwidth = bandwidth
+        self.handler = handler
+
+        self.cycle = 0
+        # (delivery cycle, payload)
+        self.fifo = deque()
+
+    @classmethod
+    def link(cls, owner, linkage, **kwargs):
+        src, dst = linkage.split("->")
+        return cls(
+            getattr(owner, src).ports["output"][dst],
+            getattr(owner, dst).ports["input"][src],
+            **kwargs,
+        )
+
+    def propagate(self):
+        src, dst = self.src, self.dst
+        if self.latency == 0:
+            if src.valid and dst.ready:
+                self.deliver(src.data)
+                src.data = None
+                src.update_status()
+            return
+
+        self.cycle += 1
+        delivered = 0
+        while (
+            (delivered < self.bandwidth)
+            and (len(self.fifo) > 0)
+            and (self.fifo[0][0] <= self.cycle)
+            and dst.ready
+        ):
+            self.deliver(self.fifo.popleft()[1])
+            delivered += 1
+
+        accepted = 0
+        while (
+            (accepted < self.bandwidth) and src.valid and (len(self.fifo) < self.depth)
+        ):
+            self.fifo.append((self.cycle + self.latency, src.data))
+            src.data = None
+            src.update_status()
+            accepted += 1
+
+    # Idle-cycle skipping
+
+    # Whether propagate() would change nothing
+    def idle(self):
+        if self.latency == 0:
+            return not (self.src.valid and self.dst.ready)
+        if self.src.valid and (len(self.fifo) < self.depth):
+            return False
+        return not (
+            self.dst.ready
+            and (len(self.fifo) > 0)
+            and (self.fifo[0][0] <= self.cycle + 1)
+        )
+
+    # Ticks until the next delivery, None if empty or held by destination
+    def cycles_to_event(self):
+        if (len(self.fifo) == 0) or not self.dst.ready:
+            return None
+        return max(self.fifo[0][0] - self.cycle, 1)
+
+    def skip(self, cycles):
+        if self.latency > 0:
+            self.cycle += cycles
+
+    def deliver(self, data):
+        self.dst.data = data if self.handler is None else self.handler(data)
+        self.dst.update_status()
+
+    def clear(self):
+        self.fifo.clear()
+
+
+# -------------------
+# Discrete-event scheduler
+#
+# Steps modules in the order they are added. Modules added with
+# `event_driven=False` are stepped every cycle, as with direct
+# `step` calls. Event-driven modules are stepped only in cycles
+# they are woken up in, by
+#   `subscribe`: data arriving at one of their ports
+#   `wake_at`: a timer, e.g. a function unit completion
+#   `wake`: the next `step` of the scheduler
+# They register their conditions in `Module.attach`.
+# -------------------
+class Scheduler:
+    def __init__(self) -> None:
+        self.cycle = 0
+        self.modules = []
+        # Stepped every cycle
+        self.always = []
+        # Woken for the next step
+        self.pending = set()
+        # Min-heap of (cycle, sequence, module)
+        self.timers = []
+        self.sequence = 0
+        self.order = {}
+
+    def add(self, module, event_driven=False):
+        self.order[module] = len(self.modules)
+        self.modules.append(module)
+        module.scheduler = self
+        if event_driven:
+            module.attach(self)
+        else:
+            self.always.append(module)
+
+    def subscribe(self, port, module):
+        port.listeners.append(lambda: self.wake(module))
+
+    def wake(self, module):
+        self.pending.add(module)
+
+    def wake_at(self, cycle, module):
+        heapq.heappush(self.timers, (cycle, self.sequence, module))
+        self.sequence += 1
+
+    # Cycles until the next timer, None if none
+    def cycles_to_event(self):
+        if len(self.timers) == 0:
+            return None
+        return max(self.timers[0][0] - self.cycle, 1)
+
+    # Step modules due at `cycle`
+    # Returns True if a module requested a flush, as `step` does
+    def step(self, cycle):
+        self.cycle = cycle
+        while (len(self.timers) > 0) and (self.timers[0][0] <= cycle):
+            self.pending.add(heapq.heappop(self.timers)[2])
+
+        if len(self.pending) == 0:
+            active = self.always
+        else:
+            active = sorted(
+                self.pending.union(self.always), key=lambda module: self.order[module]
+            )
+        self.pending = set()
+
+        for module in active:
+            if module.step() is True:
+                # Wake-ups of the flushed cycle are dropped
+                self.pending.clear()
+                return True
+        return False
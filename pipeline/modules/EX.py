@@ -1,77 +1,109 @@
 from collections import deque
+import heapq
 import numpy as np
 
 from config.data_types import *
 from config.register_name import register_name
+from config.opcodes import opcode_latencies
 from module_base import Module, Port
-import func.execution.rv64i as instructions
+from func.execution.backends import execute_tables
 from . import FU
 
 
 class EX(Module):
-    def __init__(self) -> None:
+    def __init__(self, backend="numpy") -> None:
         super().__init__()
+        # opcode id -> execute function
+        self.execute = execute_tables[backend]
         self.ports = {
             "input": {"ROB": Port("ROB->[EX]")},
             "output": {"ROB": Port("[EX]->ROB")},
         }
-        self.function_unit_status = FU.new_function_units(with_data=True)
+        self.cycle = 0
+        # Operations in function units, min-heap of
+        # (completion cycle, issue sequence, issue queue index, data)
+        self.completions = []
+        self.sequence = 0
+
+    # Stepped on input arrival and completions when event-driven
+    def attach(self, scheduler):
+        scheduler.subscribe(self.ports["input"]["ROB"], self)
 
     # Execute internal logic
     def step(self):
+        if self.scheduler is None:
+            self.cycle += 1
+        else:
+            self.cycle = self.scheduler.cycle
+
         # Allocate function units
         if self.ports["input"]["ROB"].valid is True:
             self.handle_ROB_input(self.ports["input"]["ROB"].data)
             self.ports["input"]["ROB"].data = None
             self.ports["input"]["ROB"].update_status()
 
-        # Step clock
-        for issue_queue_index, issue_queue_function_unit_status in enumerate(
-            self.function_unit_status
-        ):
-            for function_unit_type in issue_queue_function_unit_status:
-                for function_unit in issue_queue_function_unit_status[
-                    function_unit_type
-                ]:
-                    if function_unit["data"] is not None:
-                        function_unit["latency"] = max(function_unit["latency"] - 1, 0)
-
         # Operate if countdown ends
-        if self.ports["output"]["ROB"].ready:
-            results = [[], [], [], []]
-
-            for issue_queue_index, issue_queue_function_unit_status in enumerate(
-                self.function_unit_status
+        # Skip cycles where nothing completes
+        if (
+            self.ports["output"]["ROB"].ready
+            and (len(self.completions) > 0)
+            and (self.completions[0][0] <= self.cycle)
+        ):
+            results = [[] for i in range(len(FU.function_unit_numbers))]
+            while (len(self.completions) > 0) and (
+                self.completions[0][0] <= self.cycle
             ):
-                for function_unit_type in issue_queue_function_unit_status:
-                    for function_unit in issue_queue_function_unit_status[
-                        function_unit_type
-                    ]:
-                        if (function_unit["data"] is not None) and (
-                            function_unit["latency"] == 0
-                        ):
-                            results[issue_queue_index].append(
-                                self.op(function_unit["data"])
-                            )
-                            function_unit["data"] = None
-
-            if results == [[], [], [], []]:
-                self.ports["output"]["ROB"].data = None
-            else:
+                _, _, issue_queue_index, data = heapq.heappop(self.completions)
+                # Squashed
+                if data.epoch == self.epoch:
+                    results[issue_queue_index].append(self.op(data))
+
+            if any(results):
                 self.ports["output"]["ROB"].data = {"results": results}
                 self.ports["output"]["ROB"].update_status()
 
+        # Retry completions held by output port
+        if (
+            (self.scheduler is not None)
+            and (len(self.completions) > 0)
+            and (self.completions[0][0] <= self.cycle)
+        ):
+            self.scheduler.wake_at(self.cycle + 1, self)
+
     def handle_ROB_input(self, port_data):
         for issue_queue_index, queue_data in enumerate(port_data):
             for data in queue_data:
-                self.function_unit_status[issue_queue_index][
-                    data["function_unit_type"]
-                ][data["function_unit_index"]] = {"data": data, "latency": 1}
+                # Completes in the issuing cycle with 1-cycle latency
+                completion = self.cycle + opcode_latencies[data.opcode] - 1
+                heapq.heappush(
+                    self.completions,
+                    (completion, self.sequence, issue_queue_index, data),
+                )
+                self.sequence += 1
+                if (self.scheduler is not None) and (completion > self.cycle):
+                    self.scheduler.wake_at(completion, self)
+
+    # Idle-cycle skipping
+
+    def idle(self):
+        return not self.ports["input"]["ROB"].valid
+
+    # Cycles until the next completion, None if nothing in flight
+    # Event-driven, `self.cycle` is that of the last step only
+    def cycles_to_event(self):
+        if len(self.completions) == 0:
+            return None
+        now = self.cycle if self.scheduler is None else self.scheduler.cycle
+        return max(self.completions[0][0] - now, 1)
+
+    def skip(self, cycles):
+        self.cycle += cycles
 
     def op(self, data):
         # data = self.reg.tick(data).step()
-        return getattr(instructions, data["name"])(data)
+        return self.execute[data.opcode](data)
 
+    # Operations in function units are left in place,
+    # dropped on completion by epoch
     def flush(self):
-        self.function_unit_status = FU.new_function_units(with_data=True)
         return super().flush()
@@ -1,10 +1,11 @@
+import numpy as np
+
 function_unit_numbers = [
     {
-        # Pipelined ALU
-        # Use multiple multi-cycle MUL/DIV to simulate 1 pipelined ALU
         "ALU": 1,
-        "MUL": 4,
-        "DIV": 4,
+        # Pipelining of MUL/DIV is given by `opcode_issue_intervals`
+        "MUL": 1,
+        "DIV": 1,
         # Other function units in cluster
         "CSR": 1,
         "AGU": 1,
@@ -12,36 +13,80 @@ function_unit_numbers = [
     },
     {
         "ALU": 1,
-        "MUL": 4,
-        "DIV": 4,
+        "MUL": 1,
+        "DIV": 1,
         "AGU": 1,
     },
     {
         "ALU": 1,
-        "MUL": 4,
-        "DIV": 4,
+        "MUL": 1,
+        "DIV": 1,
         "AGU": 1,
     },
     {
         "ALU": 1,
-        "MUL": 4,
-        "DIV": 4,
+        "MUL": 1,
+        "DIV": 1,
         "BR": 1,
     },
 ]
 
 
-def new_function_units(with_data=False):
-    total_function_units = []
-    for i in range(len(function_unit_numbers)):
-        function_units = {}
-        for function_unit_type, function_unit_number in function_unit_numbers[
-            i
-        ].items():
-            function_units[function_unit_type] = (
-                [{"latency": 0, "data": None} for i in range(function_unit_number)]
-                if (with_data is True)
-                else [{"latency": 0} for i in range(function_unit_number)]
-            )
-        total_function_units.append(function_units)
-    return total_function_units
+# -------------------
+# Function unit scoreboard
+#
+# Countdown of cycles before each unit accepts a new operation,
+# 0 if free. All units are in one array, `units[cluster][type]`
+# are views of it.
+#
+# Args:
+#   `held_types`: function unit types not counted down by `tick`,
+#       released explicitly
+# -------------------
+class Scoreboard:
+    def __init__(self, held_types=()) -> None:
+        total = sum(sum(numbers.values()) for numbers in function_unit_numbers)
+        self.busy = np.zeros(total, dtype=np.int32)
+        self.ticking = np.ones(total, dtype=bool)
+
+        self.units = []
+        offset = 0
+        for numbers in function_unit_numbers:
+            units = {}
+            for function_unit_type, function_unit_number in numbers.items():
+                end = offset + function_unit_number
+                units[function_unit_type] = self.busy[offset:end]
+                if function_unit_type in held_types:
+                    self.ticking[offset:end] = False
+                offset = end
+            self.units.append(units)
+
+    # Occupy a free unit for `interval` cycles
+    # Returns index of the unit in its type, None if all busy
+    def allocate(self, cluster, function_unit_type, interval):
+        units = self.units[cluster][function_unit_type]
+        index = int(units.argmin())
+        if units[index] != 0:
+            return None
+        units[index] = interval
+        return index
+
+    def is_free(self, cluster, function_unit_type):
+        return self.units[cluster][function_unit_type].min() == 0
+
+    def release(self, cluster, function_unit_type, index):
+        self.units[cluster][function_unit_type][index] = 0
+
+    def tick(self, cycles=1):
+        if cycles == 1:
+            self.busy -= self.ticking & (self.busy > 0)
+        else:
+            self.busy -= np.minimum(self.busy, cycles) * self.ticking
+
+    # Ticks until the first busy unit is free, None if none is busy
+    def cycles_to_release(self):
+        busy = self.busy[self.ticking & (self.busy > 0)]
+        return int(busy.min()) if len(busy) > 0 else None
+
+    def reset(self):
+        self.busy[:] = 0
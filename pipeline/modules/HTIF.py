@@ -0,0 +1,227 @@
+import os
+import stat
+import struct
+import sys
+import warnings
+
+# fromhost follows tohost in riscv-tests environments
+FROMHOST_OFFSET = 0x40
+
+# Syscall numbers of the magic memory block, as riscv-pk/newlib
+SYS_OPENAT = 56
+SYS_CLOSE = 57
+SYS_READ = 63
+SYS_WRITE = 64
+SYS_FSTAT = 80
+SYS_EXIT = 93
+SYS_OPEN = 1024
+
+AT_FDCWD = -100
+ENOSYS = 38
+EBADF = 9
+
+# Target (Linux generic) open flags -> host open flags
+open_flags = {
+    0o1: os.O_WRONLY,
+    0o2: os.O_RDWR,
+    0o100: os.O_CREAT,
+    0o200: os.O_EXCL,
+    0o1000: os.O_TRUNC,
+    0o2000: os.O_APPEND,
+}
+
+# struct stat of riscv64 Linux
+STAT_FORMAT = "<QQIIIIQQqiiqqqqqqqii"
+
+# Console output is written out in chunks of this many bytes
+CONSOLE_BUFFER_SIZE = 1 << 13
+
+
+# -------------------
+# Host-target interface
+#
+# Handles commands the target writes to tohost, on a memory
+# watchpoint instead of polling tohost every cycle:
+#   odd value: exit, with code `value >> 1`
+#   address of magic memory: syscall, as below
+#
+# Magic memory holds the syscall number and up to 7 arguments,
+# 64 bits each. The return value is written back to its first word and
+# acknowledged in fromhost.
+#
+# Writes to fd 1 and 2 go to a console buffer, written to
+# `console` in chunks and on exit. Files opened by the target are
+# host files, relative to the working directory.
+# -------------------
+class HTIF:
+    def __init__(self, memory, tohost_addr, console=None) -> None:
+        self.memory = memory
+        self.tohost_addr = int(tohost_addr)
+        self.fromhost_addr = self.tohost_addr + FROMHOST_OFFSET
+        self.console = sys.stdout if console is None else console
+        self.console_buffer = bytearray()
+
+        # target fd -> host fd
+        self.files = {0: 0}
+
+        self.exit = False
+        # tohost value of the exit command
+        self.exit_data = None
+
+        # syscall number -> (handler, number of arguments)
+        self.syscalls = {
+            SYS_OPENAT: (self.sys_openat, 4),
+            SYS_CLOSE: (self.sys_close, 1),
+            SYS_READ: (self.sys_read, 3),
+            SYS_WRITE: (self.sys_write, 3),
+            SYS_FSTAT: (self.sys_fstat, 2),
+            SYS_EXIT: (self.sys_exit, 1),
+            SYS_OPEN: (self.sys_open, 3),
+        }
+
+        memory.add_watchpoint(self.tohost_addr, self.tohost_addr + 8, self.handle)
+
+    @property
+    def exit_code(self):
+        return self.exit_data >> 1
+
+    def handle(self, address, width):
+        tohost_data = self.memory.load64(self.tohost_addr)
+        if tohost_data == 0:
+            return
+
+        if tohost_data & 0x1:
+            self.set_exit(tohost_data)
+        else:
+            which, *args = struct.unpack(
+                "<8Q", self.memory.read_range(tohost_data, tohost_data + 64).tobytes()
+            )
+            syscall = self.syscalls.get(which)
+            if syscall is None:
+                warnings.warn("not supported syscall {}".format(which), UserWarning)
+                result = -ENOSYS
+            else:
+                handler, arg_number = syscall
+                try:
+                    result = handler(*args[:arg_number])
+                except OSError as error:
+                    result = -error.errno
+
+            self.memory.store64(tohost_data, result)
+            self.memory.store64(self.fromhost_addr, 1)
+            self.memory.store64(self.tohost_addr, 0)
+
+    def set_exit(self, exit_data):
+        self.exit = True
+        self.exit_data = exit_data
+        self.flush()
+
+    # Write out buffered console output
+    def flush(self):
+        if len(self.console_buffer) > 0:
+            # Bytes as characters, as the target wrote them
+            self.console.write(self.console_buffer.decode("latin-1"))
+            self.console.flush()
+            self.console_buffer.clear()
+
+    # -------------------
+    # Syscalls
+    #
+    # Arguments are unsigned 64-bit words, results are ints,
+    # negative errno on failure
+    # -------------------
+    def sys_write(self, fd, buffer, length):
+        data = self.memory.read_range(buffer, buffer + length).tobytes()
+        if fd in [1, 2]:
+            self.console_buffer += data
+            if len(self.console_buffer) >= CONSOLE_BUFFER_SIZE:
+                self.flush()
+            return length
+        if fd not in self.files:
+            return -EBADF
+        return os.write(self.files[fd], data)
+
+    def sys_read(self, fd, buffer, length):
+        if fd not in self.files:
+            return -EBADF
+        # Prompts are shown before blocking on the console
+        self.flush()
+        data = os.read(self.files[fd], length)
+        self.memory.write_range(buffer, data)
+        return len(data)
+
+    def sys_open(self, path, flags, mode):
+        return self.sys_openat(AT_FDCWD & ((1 << 64) - 1), path, flags, mode)
+
+    def sys_openat(self, dirfd, path, flags, mode):
+        # Relative to the working directory only
+        host_flags = os.O_RDONLY
+        for flag, host_flag in open_flags.items():
+            if flags & flag:
+                host_flags |= host_flag
+        host_fd = os.open(self.read_string(path), host_flags, mode)
+
+        fd = 3
+        while fd in self.files:
+            fd += 1
+        self.files[fd] = host_fd
+        return fd
+
+    def sys_close(self, fd):
+        # Console stays open
+        if fd in [0, 1, 2]:
+            return 0
+        if fd not in self.files:
+            return -EBADF
+        os.close(self.files.pop(fd))
+        return 0
+
+    def sys_fstat(self, fd, buffer):
+        if fd in [1, 2]:
+            # Console is a character device, as a terminal
+            fields = [0] * len(STAT_FORMAT[1:])
+            fields[2] = stat.S_IFCHR | 0o620
+            fields[9] = CONSOLE_BUFFER_SIZE
+        elif fd in self.files:
+            host_stat = os.fstat(self.files[fd])
+            fields = [
+                host_stat.st_dev,
+                host_stat.st_ino,
+                host_stat.st_mode,
+                host_stat.st_nlink,
+                host_stat.st_uid,
+                host_stat.st_gid,
+                host_stat.st_rdev,
+                0,
+                host_stat.st_size,
+                host_stat.st_blksize,
+                0,
+                host_stat.st_blocks,
+                int(host_stat.st_atime),
+                host_stat.st_atime_ns % 1000000000,
+                int(host_stat.st_mtime),
+                host_stat.st_mtime_ns % 1000000000,
+                int(host_stat.st_ctime),
+                host_stat.st_ctime_ns % 1000000000,
+                0,
+                0,
+            ]
+        else:
+            return -EBADF
+        self.memory.write_range(buffer, struct.pack(STAT_FORMAT, *fields))
+        return 0
+
+    def sys_exit(self, code):
+        self.set_exit((code << 1) | 0x1)
+        return 0
+
+    # NUL-terminated string at `address`
+    def read_string(self, address, chunk_size=64):
+        data = b""
+        while True:
+            chunk = self.memory.read_range(address, address + chunk_size).tobytes()
+            end = chunk.find(b"\0")
+            if end >= 0:
+                return os.fsdecode(data + chunk[:end])
+            data += chunk
+            address += chunk_size
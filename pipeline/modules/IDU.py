@@ -4,12 +4,12 @@ import numpy as np
 from config.data_types import *
 from config.register_name import register_name
 from module_base import Module, Port
-from func.decode.decoder import decode_word
 
 
 class IDU(Module):
-    def __init__(self) -> None:
+    def __init__(self, decode_cache) -> None:
         super().__init__()
+        self.decode_cache = decode_cache
         self.ports = {
             "input": {"IF": Port("IF->[ID]")},
             "output": {
@@ -27,20 +27,23 @@ class IDU(Module):
 
         return
 
+    # Whether step() would change nothing
+    def idle(self):
+        return not (
+            self.ports["input"]["IF"].valid and self.ports["output"]["ROB"].ready
+        )
+
     def op(self, port_data):
         results = []
         for data in port_data:
-            inst = decode_word(data["word"])
+            inst = self.decode_cache.decode(data["pc"], data["word"])
             # TODO: Handle decoding error
-            if "decode_error" in inst:
+            if inst.decode_error is not None:
                 break
-            inst["pc"] = data["pc"]
-            inst["insn_code"] = hex(data["word"])
-            inst["insn_len"] = 2 if data["is_compressed"] else 4
             results.append(inst)
-            if inst["name"] == ["JAL"]:
+            if inst.name == ["JAL"]:
                 self.ports["output"]["IF"].data = inst
-                self.ports["output"]["IF"].data["next_pc"] = inst["pc"] + inst["imm"][0]
+                self.ports["output"]["IF"].data.next_pc = inst.pc + inst.imm
                 self.ports["output"]["IF"].update_status()
                 break
 
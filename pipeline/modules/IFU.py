@@ -6,13 +6,33 @@ from config.register_name import register_name
 from module_base import Module, Port
 
 
+# -------------------
+# Instruction fetch unit
+#
+# Fetches one aligned block of `fetch_block_size` bytes per cycle
+# into a buffer of 16-bit parcels. Up to `issue_number` instructions
+# are split off the buffer per cycle, a 32-bit instruction crossing
+# the block boundary waits in the buffer for the next block.
+#
+# Args:
+#   `fetch_block_size`: bytes per fetch, power of 2
+#   `fetch_buffer_size`: buffer capacity in parcels, two blocks
+#       if not given
+# -------------------
 class IFU(Module):
-    def __init__(self, memory, pc, issue_number=2) -> None:
+    def __init__(
+        self, memory, pc, issue_number=2, fetch_block_size=16, fetch_buffer_size=None
+    ) -> None:
         super().__init__()
         self.pc = pc
-        self.fetch_pc = pc
+        self.fetch_pc = int(pc)
         self.memory = memory
         self.issue_number = issue_number
+        self.fetch_block_size = fetch_block_size
+        self.fetch_buffer_size = fetch_buffer_size or fetch_block_size
+
+        # (pc, parcel) of fetched, not yet issued parcels
+        self.fetch_buffer = deque()
 
         self.miss = 0
 
@@ -23,36 +43,77 @@ class IFU(Module):
 
     def step(self):
         if self.ports["input"]["ROB"].valid:
-            self.fetch_pc = self.ports["input"]["ROB"].data["next_pc"]
+            self.redirect(self.ports["input"]["ROB"].data.next_pc)
             self.ports["input"]["ROB"].data = None
             self.ports["input"]["ROB"].update_status()
             self.miss += 1
 
         elif self.ports["input"]["ID"].valid:
-            self.fetch_pc = self.ports["input"]["ID"].data["next_pc"]
+            self.redirect(self.ports["input"]["ID"].data.next_pc)
             self.ports["input"]["ID"].data = None
             self.ports["input"]["ID"].update_status()
 
+        if self.has_buffer_space():
+            self.fetch_block()
+
         if self.ports["output"]["ID"].ready:
-            self.ports["output"]["ID"].data = []
-            for i in range(self.issue_number):
-                self.pc = self.fetch_pc
-                data = self.op()
-                self.fetch_pc += reg_type(2) if data["is_compressed"] else reg_type(4)
-                self.ports["output"]["ID"].data.append(data)
-            self.ports["output"]["ID"].update_status()
+            data = self.op()
+            if len(data) > 0:
+                self.ports["output"]["ID"].data = data
+                self.ports["output"]["ID"].update_status()
+
+    def redirect(self, pc):
+        self.fetch_pc = int(pc)
+        self.fetch_buffer.clear()
+
+    def has_buffer_space(self):
+        return (
+            len(self.fetch_buffer) + (self.fetch_block_size >> 1)
+            <= self.fetch_buffer_size
+        )
 
+    # Buffer parcels of the block from `fetch_pc` on
+    def fetch_block(self):
+        block_address = self.fetch_pc & ~(self.fetch_block_size - 1)
+        parcels = self.memory.load_parcels(block_address, self.fetch_block_size)
+        for index in range((self.fetch_pc - block_address) >> 1, len(parcels)):
+            self.fetch_buffer.append((block_address + 2 * index, parcels[index]))
+        self.fetch_pc = block_address + self.fetch_block_size
+
+    # Whether step() would change nothing
+    def idle(self):
+        return not (
+            self.ports["input"]["ROB"].valid
+            or self.ports["input"]["ID"].valid
+            or self.ports["output"]["ID"].ready
+            or self.has_buffer_space()
+        )
+
+    # Split up to `issue_number` instructions off the fetch buffer
     def op(self):
-        inst_word = word_type(self.memory.read_bytes(self.fetch_pc, 4, False))
-        is_compressed = inst_word & word_type(0x3) != word_type(0x3)
-        if is_compressed:
-            # Compressed
-            inst_word = word_type(half_type(inst_word))
-        return {
-            "pc": self.pc,
-            "is_compressed": is_compressed,
-            "word": inst_word,
-        }
+        results = []
+        fetch_buffer = self.fetch_buffer
+        while (len(results) < self.issue_number) and (len(fetch_buffer) > 0):
+            pc, parcel = fetch_buffer[0]
+            is_compressed = parcel & 0x3 != 0x3
+            if is_compressed:
+                fetch_buffer.popleft()
+                word = parcel
+            elif len(fetch_buffer) > 1:
+                fetch_buffer.popleft()
+                word = parcel | (fetch_buffer.popleft()[1] << 16)
+            else:
+                # Upper parcel in the next block
+                break
+            self.pc = reg_type(pc)
+            results.append(
+                {
+                    "pc": self.pc,
+                    "is_compressed": is_compressed,
+                    "word": word_type(word),
+                }
+            )
+        return results
 
     def flush(self, data):
         self.ports["output"]["ID"].data = None
@@ -0,0 +1,89 @@
+from config.opcodes import opcode_function_unit_types
+
+# Function unit types issued in program order within a queue
+in_order_function_unit_types = ["CSR", "AGU"]
+
+# opcode id -> index in `in_order_function_unit_types`, -1 if out-of-order
+opcode_in_order_types = [
+    (
+        in_order_function_unit_types.index(function_unit_type)
+        if function_unit_type in in_order_function_unit_types
+        else -1
+    )
+    for function_unit_type in opcode_function_unit_types
+]
+
+
+# -------------------
+# Issue queue
+#
+# Slots are kept in age order, oldest first. Slot status is held
+# in bitmasks, bit i for slot i:
+#   `ready`: source registers ready
+#   `in_order[t]`: slot holds an entry of in-order type t
+# so that select is a few bit operations.
+#
+# Args:
+#   `size`: number of slots
+#   `issue_window`: number of oldest slots considered on select
+#   `max_issue_number`: max entries issued per cycle
+# -------------------
+class IssueQueue:
+    def __init__(self, size, issue_window=8, max_issue_number=2) -> None:
+        self.size = size
+        self.issue_window = issue_window
+        self.max_issue_number = max_issue_number
+        self.window_mask = (1 << issue_window) - 1
+
+        # ROB entry index of each slot
+        self.entries = []
+        self.ready = 0
+        self.in_order = [0 for function_unit_type in in_order_function_unit_types]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def has_free_slot(self):
+        return len(self.entries) < self.size
+
+    def push(self, entry_index, opcode, ready):
+        slot_bit = 1 << len(self.entries)
+        self.entries.append(entry_index)
+        if ready:
+            self.ready |= slot_bit
+        in_order_type = opcode_in_order_types[opcode]
+        if in_order_type >= 0:
+            self.in_order[in_order_type] |= slot_bit
+
+    def set_ready(self, entry_index):
+        self.ready |= 1 << self.entries.index(entry_index)
+
+    # Slots selected for issue, oldest first
+    def select(self):
+        candidates = self.ready & self.window_mask
+        # Only the oldest entry of an in-order type may issue
+        for mask in self.in_order:
+            # Clear all but the lowest bit
+            candidates &= ~(mask & (mask - 1))
+
+        slots = []
+        while candidates:
+            lowest = candidates & -candidates
+            slots.append(lowest.bit_length() - 1)
+            candidates ^= lowest
+        return slots
+
+    # Remove issued slots, keeping age order
+    def remove(self, slots):
+        for slot in sorted(slots, reverse=True):
+            del self.entries[slot]
+            low = (1 << slot) - 1
+            self.ready = (self.ready & low) | ((self.ready >> 1) & ~low)
+            self.in_order = [
+                (mask & low) | ((mask >> 1) & ~low) for mask in self.in_order
+            ]
+
+    def clear(self):
+        self.entries.clear()
+        self.ready = 0
+        self.in_order = [0 for mask in self.in_order]
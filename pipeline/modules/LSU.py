@@ -3,13 +3,15 @@ import numpy as np
 
 from config.data_types import *
 from config.register_name import register_name
+from config.opcodes import LOAD_SIGNED, FENCE_I
 from module_base import Module
 
 
 class LSU(Module):
-    def __init__(self, memory) -> None:
+    def __init__(self, memory, decode_cache) -> None:
         super().__init__()
         self.memory = memory
+        self.decode_cache = decode_cache
 
     def tick(self, data):
         self.input_port = data
@@ -30,21 +32,19 @@ class LSU(Module):
     #         for data in issue_queue_data:
     def op(self, data):
         # load store
-        if "load_mem" in data:
-            for load_request in data["load_mem"]:
-                data["write_regs"]["int"][0]["value"] = self.memory.read_bytes(
-                    load_request["addr"],
-                    load_request["len"],
-                    data["name"] in ["LB", "LH", "LW"],
-                )
-
-        if "store_mem" in data:
-            for store_request in data["store_mem"]:
-                self.memory.write_bytes(
-                    store_request["addr"],
-                    store_request["len"],
-                    store_request["value"],
-                )
+        if data.is_load:
+            data.rd_value = self.memory.load(
+                data.mem_addr,
+                data.mem_len,
+                (data.flags & LOAD_SIGNED) != 0,
+            )
+
+        if data.is_store:
+            self.memory.store(data.mem_addr, data.mem_len, data.rs2_value)
+            self.decode_cache.invalidate(data.mem_addr, data.mem_len)
+
+        if data.flags & FENCE_I:
+            self.decode_cache.flush()
 
         return data
         # return port_data
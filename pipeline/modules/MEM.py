@@ -1,58 +1,273 @@
-from collections import deque
-import os
 import numpy as np
 
 from config.data_types import *
-from config.register_name import register_name
-from module_base import Module
 
-from numba import types, typed
-from numba.experimental import jitclass
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
 
-DRAM_BASE = reg_type(0x80000000)
+REG_MASK = (1 << (reg_type(0).itemsize * 8)) - 1
 
+# Page element views, unsigned then signed, by log2(width)
+# Memoryview casts index to Python ints, without numpy scalars
+# Formats are native byte order, little-endian hosts only
+view_formats = ["B", "H", "I", "Q", "b", "h", "i", "q"]
 
-@jitclass([("mem", types.ListType(types.uint64))])
+
+def new_views(page):
+    buffer = memoryview(page)
+    return [buffer.cast(view_format) for view_format in view_formats]
+
+
+# Page-granular sparse memory
+# Pages are allocated on first write, untouched addresses
+# read from a shared zero page
 class Memory:
-    def __init__(self, mem) -> None:
-        # self.mem = mem
-        self.mem = typed.List.empty_list(types.uint64)
-        [self.mem.append(x) for x in mem]
+    zero_page = np.zeros(PAGE_SIZE, dtype=byte_type)
+    zero_page.flags.writeable = False
+    zero_views = new_views(zero_page)
 
-    def write_bytes(self, address, width, value):
-        address -= DRAM_BASE
-        for i in range(width):
-            self.write_byte(
-                address + reg_type(i), (value >> reg_type(i * 8)) & reg_type(0xFF)
+    # `pages`: iterable of (base_address, bytearray) pairs, as
+    # exported by `ElfContext.memory.pages()`
+    # Pages are mapped as writable views, without copying
+    def __init__(self, pages=()) -> None:
+        self.pages = {}
+        # page number -> (page, element views), see `page_views`
+        self.views = {}
+        # [(start, end, callback)], see `add_watchpoint`
+        self.watchpoints = []
+        self.watched_pages = set()
+        self.loads = {1: self.load8, 2: self.load16, 4: self.load32, 8: self.load64}
+        self.stores = {
+            1: self.store8,
+            2: self.store16,
+            4: self.store32,
+            8: self.store64,
+        }
+        for base_address, page in pages:
+            self.pages[base_address >> PAGE_SHIFT] = np.frombuffer(
+                page, dtype=byte_type
             )
 
-    def write_byte(self, address, value):
-        index = address >> reg_type(3)
-        pos = reg_type((address % 8) * 8)
-        self.mem[index] = (
-            reg_type(self.mem[index]) & double_type(np.invert(reg_type(0xFF) << pos))
-        ) | (value << pos)
+    def get_page(self, page_number):
+        return self.pages.get(page_number, self.zero_page)
 
-    # Handle read requesets from IF stage
-    def read_bytes(self, address, width, sign_extend):
-        address -= DRAM_BASE
-        data = double_type(0)
-        for i in range(width):
-            # TODO: replace with `|` operator?
-            data = np.bitwise_or(
-                data,
-                double_type(self.read_byte(address + reg_type(i)) << reg_type(i * 8)),
+    def allocate_page(self, page_number):
+        page = self.pages.get(page_number)
+        if page is None:
+            page = np.zeros(PAGE_SIZE, dtype=byte_type)
+            self.pages[page_number] = page
+        return page
+
+    # -------------------
+    # Width-specialized accesses
+    #
+    # Naturally aligned accesses are a single index into a cached
+    # element view of the page, misaligned ones take the split path.
+    # Loads return ints in [0, 2**64), sign-extended through the
+    # signed views if `sign_extend`.
+    # -------------------
+    def load8(self, address, sign_extend=False):
+        address = int(address)
+        view = self.page_views(address >> PAGE_SHIFT)[4 if sign_extend else 0]
+        return view[address & PAGE_MASK] & REG_MASK
+
+    def load16(self, address, sign_extend=False):
+        address = int(address)
+        if address & 0x1 == 0:
+            view = self.page_views(address >> PAGE_SHIFT)[5 if sign_extend else 1]
+            return view[(address & PAGE_MASK) >> 1] & REG_MASK
+        return self.load_split(address, 2, sign_extend)
+
+    def load32(self, address, sign_extend=False):
+        address = int(address)
+        if address & 0x3 == 0:
+            view = self.page_views(address >> PAGE_SHIFT)[6 if sign_extend else 2]
+            return view[(address & PAGE_MASK) >> 2] & REG_MASK
+        return self.load_split(address, 4, sign_extend)
+
+    # 64-bit loads need no extension
+    def load64(self, address, sign_extend=False):
+        address = int(address)
+        if address & 0x7 == 0:
+            view = self.page_views(address >> PAGE_SHIFT)[3]
+            return view[(address & PAGE_MASK) >> 3]
+        return self.load_split(address, 8, sign_extend)
+
+    def store8(self, address, value):
+        address = int(address)
+        page = self.allocate_page(address >> PAGE_SHIFT)
+        page[address & PAGE_MASK] = int(value) & 0xFF
+        if (address >> PAGE_SHIFT) in self.watched_pages:
+            self.notify_store(address, 1)
+
+    def store16(self, address, value):
+        address = int(address)
+        if address & 0x1 == 0:
+            view = self.allocated_views(address >> PAGE_SHIFT)[1]
+            view[(address & PAGE_MASK) >> 1] = int(value) & 0xFFFF
+            if (address >> PAGE_SHIFT) in self.watched_pages:
+                self.notify_store(address, 2)
+        else:
+            self.store_split(address, 2, value)
+
+    def store32(self, address, value):
+        address = int(address)
+        if address & 0x3 == 0:
+            view = self.allocated_views(address >> PAGE_SHIFT)[2]
+            view[(address & PAGE_MASK) >> 2] = int(value) & 0xFFFF_FFFF
+            if (address >> PAGE_SHIFT) in self.watched_pages:
+                self.notify_store(address, 4)
+        else:
+            self.store_split(address, 4, value)
+
+    def store64(self, address, value):
+        address = int(address)
+        if address & 0x7 == 0:
+            view = self.allocated_views(address >> PAGE_SHIFT)[3]
+            view[(address & PAGE_MASK) >> 3] = int(value) & REG_MASK
+            if (address >> PAGE_SHIFT) in self.watched_pages:
+                self.notify_store(address, 8)
+        else:
+            self.store_split(address, 8, value)
+
+    # Aligned block of `size` bytes as 16-bit parcels
+    # Blocks up to a page never cross a page boundary
+    def load_parcels(self, address, size):
+        offset = (int(address) & PAGE_MASK) >> 1
+        view = self.page_views(int(address) >> PAGE_SHIFT)[1]
+        return view[offset : offset + (size >> 1)].tolist()
+
+    # Any width, dispatched to the specialized accesses
+    def load(self, address, width, sign_extend=False):
+        load = self.loads.get(width)
+        if load is None:
+            return self.load_split(int(address), width, sign_extend)
+        return load(address, sign_extend)
+
+    def store(self, address, width, value):
+        store = self.stores.get(width)
+        if store is None:
+            self.store_split(int(address), width, value)
+        else:
+            store(address, value)
+
+    # Element views of a page, indexed by log2(width) (+4 if signed)
+    # Rebuilt when the page array is replaced, e.g. by `jit_core`
+    def page_views(self, page_number):
+        page = self.pages.get(page_number)
+        if page is None:
+            return self.zero_views
+        cached = self.views.get(page_number)
+        if (cached is None) or (cached[0] is not page):
+            cached = (page, new_views(page))
+            self.views[page_number] = cached
+        return cached[1]
+
+    def allocated_views(self, page_number):
+        self.allocate_page(page_number)
+        return self.page_views(page_number)
+
+    # Misaligned access, possibly crossing page boundary
+    def load_split(self, address, width, sign_extend):
+        offset = address & PAGE_MASK
+        if offset + width <= PAGE_SIZE:
+            data = int.from_bytes(
+                self.get_page(address >> PAGE_SHIFT)[offset : offset + width].tobytes(),
+                "little",
             )
+        else:
+            # Crossing page boundary
+            data = 0
+            for i in range(width):
+                data |= int(self.read_byte(address + i)) << (i * 8)
         if sign_extend is True:
-            sign = reg_type(data >> reg_type(width * 8 - 1)) & reg_type(0x1)
-            if sign != 0:
-                data = reg_type(data) | reg_type(
-                    reg_type(np.invert(reg_type(0))) << reg_type(width * 8)
-                )
-        return reg_type(data)
+            if (data >> (width * 8 - 1)) & 0x1:
+                data |= REG_MASK ^ ((1 << (width * 8)) - 1)
+        return data
+
+    def store_split(self, address, width, value):
+        value = int(value)
+        offset = address & PAGE_MASK
+        if offset + width <= PAGE_SIZE:
+            page = self.allocate_page(address >> PAGE_SHIFT)
+            page[offset : offset + width] = np.frombuffer(
+                (value & ((1 << (width * 8)) - 1)).to_bytes(width, "little"),
+                dtype=byte_type,
+            )
+        else:
+            # Crossing page boundary
+            for i in range(width):
+                byte_address = address + i
+                self.allocate_page(byte_address >> PAGE_SHIFT)[
+                    byte_address & PAGE_MASK
+                ] = (value >> (i * 8)) & 0xFF
+        if (address >> PAGE_SHIFT) in self.watched_pages or (
+            (address + width - 1) >> PAGE_SHIFT
+        ) in self.watched_pages:
+            self.notify_store(address, width)
+
+    # -------------------
+    # Watchpoints
+    #
+    # `callback(address, width)` is called after each store touching
+    # [start, end). Stores only look up watchpoints on watched pages.
+    # -------------------
+    def add_watchpoint(self, start, end, callback):
+        start, end = int(start), int(end)
+        self.watchpoints.append((start, end, callback))
+        for page_number in range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1):
+            self.watched_pages.add(page_number)
+
+    # Also called for stores made outside `Memory`, e.g. by `jit_core`
+    def notify_store(self, address, width):
+        for start, end, callback in self.watchpoints:
+            if (address < end) and (address + width > start):
+                callback(address, width)
+
+    def write_bytes(self, address, width, value):
+        self.store(address, width, value)
+
+    def write_byte(self, address, value):
+        self.store8(address, value)
+
+    # Handle read requesets from IF stage
+    def read_bytes(self, address, width, sign_extend=False):
+        return reg_type(self.load(address, width, sign_extend))
+
+    # Copy of [start, end) as a byte array
+    def read_range(self, start, end):
+        start, end = int(start), int(end)
+        data = np.empty(end - start, dtype=byte_type)
+        address = start
+        while address < end:
+            length = min(end - address, PAGE_SIZE - (address & PAGE_MASK))
+            offset = address & PAGE_MASK
+            data[address - start : address - start + length] = self.get_page(
+                address >> PAGE_SHIFT
+            )[offset : offset + length]
+            address += length
+        return data
+
+    # Copy bytes of `data` to [start, start + len(data))
+    def write_range(self, start, data):
+        start = int(start)
+        data = np.frombuffer(bytes(data), dtype=byte_type)
+        end = start + len(data)
+        address = start
+        while address < end:
+            length = min(end - address, PAGE_SIZE - (address & PAGE_MASK))
+            offset = address & PAGE_MASK
+            self.allocate_page(address >> PAGE_SHIFT)[offset : offset + length] = data[
+                address - start : address - start + length
+            ]
+            address += length
+        if any(
+            page_number in self.watched_pages
+            for page_number in range(start >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1)
+        ):
+            self.notify_store(start, len(data))
 
     def read_byte(self, address):
-        index = reg_type(address) >> reg_type(3)
-        pos = reg_type((address % 8) * 8)
-        data = reg_type(self.mem[index]) >> reg_type(pos)
-        return reg_type(data & reg_type(0xFF))
+        address = int(address)
+        return reg_type(self.get_page(address >> PAGE_SHIFT)[address & PAGE_MASK])
@@ -6,25 +6,46 @@ from config.data_types import *
 from config.register_name import register_name
 from module_base import Module
 
-
 # Unified phisical register file
 # Components:
 # 1) renaming table
 # 2) free list
+#    with rename table checkpoints
 # 3) valid table, aka. 'p' bit
 # 4) register file
 # 5) non-renaming CSR file
 
 
+# Rename table value of unmapped registers
+UNMAPPED = 0xFFFF
+
+
 class PhysicalRegisterFile(Module):
-    def __init__(self, size) -> None:
-        self.rename_table = {reg: None for reg in register_name}
+    def __init__(self, size, check=False, checkpoint_num=8) -> None:
+        self.size = size
+        # arch register -> physical register
+        self.rename_table = np.full(len(register_name), UNMAPPED, dtype=np.uint16)
         # registers holding data
         self.physical_register = np.zeros(size, dtype=reg_type)
         # valid tag of registers
-        self.p = [False] * size
-        # freelist
-        self.freelist = deque(range(size), size)
+        self.p = np.zeros(size, dtype=bool)
+        # freelist, circular buffer in allocation order
+        # Free registers are [freelist_head, freelist_head + freelist_count)
+        # modulo size, registers allocated since stay in place until
+        # overwritten, so that rolling back the head frees them again
+        self.freelist = np.arange(size, dtype=np.int32)
+        self.freelist_head = 0
+        self.freelist_count = size
+        # membership of freelist
+        self.free = np.ones(size, dtype=bool)
+
+        # Checkpoints of (rename table, freelist head), oldest first
+        self.checkpoint_num = checkpoint_num
+        self.checkpoints = deque()
+
+        # Invariant checks on deallocation, off by default
+        self.check = check
+        self.debug = os.environ.get("DEBUG_PRINT") is not None
 
         # CSR
         self.csr = np.zeros(4096, dtype=reg_type)
@@ -33,7 +54,7 @@ class PhysicalRegisterFile(Module):
         # self.gpr[0xB] = 0x1020
         index = self.rename()
         self.write_physical_register(index, 0x1020)
-        self.rename_table[register_name[0xB]] = index
+        self.set_physical_index(0xB, index)
         self.p[index] = True
 
         self.csr[0x301] = 0x800000008014312F
@@ -41,11 +62,34 @@ class PhysicalRegisterFile(Module):
         # mhartid
         self.csr[0xF14] = 0x0
 
+    # Reset to architectural state, e.g. of a functional model
+    # Each of x1-x31 is mapped to a fresh register holding its value
+    def load_architectural_state(self, gpr, csr):
+        self.rename_table[:] = UNMAPPED
+        self.p[:] = False
+        self.freelist[:] = np.arange(self.size, dtype=np.int32)
+        self.freelist_head = 0
+        self.freelist_count = self.size
+        self.free[:] = True
+        self.checkpoints.clear()
+
+        for arch_index in range(1, 32):
+            index = self.rename()
+            self.write_physical_register(index, gpr[arch_index])
+            self.set_physical_index(arch_index, index)
+
+        self.csr[:] = csr
+
     def has_free_register(self, number=1):
-        return (len(self.freelist) + number) <= self.freelist.maxlen
+        return self.freelist_count >= number
 
     def rename(self):
-        index = self.freelist.popleft()
+        if self.freelist_count == 0:
+            raise UserWarning("Renaming with empty freelist")
+        index = int(self.freelist[self.freelist_head])
+        self.freelist_head = (self.freelist_head + 1) % self.size
+        self.freelist_count -= 1
+        self.free[index] = False
         self.p[index] = False
         # Note: Need to update rename table outside
         return index
@@ -54,40 +98,81 @@ class PhysicalRegisterFile(Module):
         if index is None:
             return
 
-        assert (
-            index not in self.freelist
-        ), "Deallocating register in freelist p[{}]".format(index)
-        assert self.p[index] is True, "Deallocating invalid register p[{}]".format(
-            index
-        )
-        self.p[index] = False
-        self.freelist.append(index)
+        if self.check:
+            assert not self.free[
+                index
+            ], "Deallocating register in freelist p[{}]".format(index)
+            assert self.p[index], "Deallocating invalid register p[{}]".format(index)
+        self.free_register(index)
 
     def rollback_register(self, index):
         assert index is not None, "Rolling back None"
-        assert (
-            index not in self.freelist
-        ), "Rolling back register in freelist p[{}]".format(index)
+        if self.check:
+            assert not self.free[
+                index
+            ], "Rolling back register in freelist p[{}]".format(index)
+        self.free_register(index)
+
+    # Append to freelist tail
+    def free_register(self, index):
         self.p[index] = False
-        self.freelist.append(index)
+        self.free[index] = True
+        self.freelist[(self.freelist_head + self.freelist_count) % self.size] = index
+        self.freelist_count += 1
+
+    # Checkpoint methods
+    #
+    # Checkpoints are taken in program order and released oldest first.
+    # Restoring the oldest one undoes all renaming after it in O(1).
+
+    # Returns False if all checkpoints are in use
+    def save_checkpoint(self):
+        if len(self.checkpoints) >= self.checkpoint_num:
+            return False
+        self.checkpoints.append((self.rename_table.copy(), self.freelist_head))
+        return True
+
+    def release_checkpoint(self):
+        self.checkpoints.popleft()
+
+    def clear_checkpoints(self):
+        self.checkpoints.clear()
+
+    # Restore oldest checkpoint and drop the others
+    # Returns registers freed by rolling back
+    def restore_checkpoint(self):
+        rename_table, freelist_head = self.checkpoints.popleft()
+        self.checkpoints.clear()
+
+        self.rename_table[:] = rename_table
+        number = (self.freelist_head - freelist_head) % self.size
+        indexes = self.freelist[(freelist_head + np.arange(number)) % self.size]
+        if self.check:
+            assert not self.free[
+                indexes
+            ].any(), "Rolling back registers in freelist p[{}]".format(indexes)
+        self.p[indexes] = False
+        self.free[indexes] = True
+        self.freelist_head = freelist_head
+        self.freelist_count += number
+        return indexes
 
     def get_physical_index(self, index):
-        return self.rename_table[register_name[index]]
+        phy_index = self.rename_table[index]
+        return None if phy_index == UNMAPPED else int(phy_index)
 
     def set_physical_index(self, arch_index, phy_index):
-        self.rename_table[register_name[arch_index]] = phy_index
+        self.rename_table[arch_index] = UNMAPPED if phy_index is None else phy_index
 
     def read_physical_register(self, index):
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.debug:
             print("reading phy_reg[{}]".format(str(index)))
         if index is None:
             return None
-        return (
-            reg_type(self.physical_register[index]) if (self.p[index] is True) else None
-        )
+        return reg_type(self.physical_register[index]) if self.p[index] else None
 
     def write_physical_register(self, index, value):
-        if self.p[index] is False:
+        if not self.p[index]:
             self.physical_register[index] = reg_type(value)
             self.p[index] = True
         else:
@@ -98,19 +183,19 @@ class PhysicalRegisterFile(Module):
             )
 
     def read_csr(self, index):
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.debug:
             print("[CSR] read [{}] -> {}".format(index, hex(self.csr[index])))
         return self.csr[index]
 
     def write_csr(self, index, value):
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.debug:
             print("[CSR] write [{}] <- {}".format(index, hex(value)))
         self.csr[index] = reg_type(value)
 
     def read_register(self, register_type, arch_index):
         return (
             self.read_physical_register(self.get_physical_index(arch_index))
-            if register_type is "int"
+            if register_type == "int"
             else self.read_csr(arch_index)
         )
 
@@ -125,7 +210,7 @@ class PhysicalRegisterFile(Module):
             )
             if i % 4 == 3:
                 print("", end="\n")
-        print("Freelist capacity:", len(self.freelist))
+        print("Freelist capacity:", self.freelist_count)
 
 
 class ArchitecturalRegisterFile:
@@ -159,19 +244,18 @@ class ArchitecturalRegisterFile:
 
     def op(self, data):
         # read register file
-        if "read_regs" in data:
-            for register_type in data["read_regs"].keys():
-                for i in data["read_regs"][register_type]:
-                    i["value"] = self.read_register(register_type, i["index"])
+        if data.rs1 is not None:
+            data.rs1_value = self.read_register("int", data.rs1)
+        if data.rs2 is not None:
+            data.rs2_value = self.read_register("int", data.rs2)
+        if data.rcsr is not None:
+            data.csr_value = self.read_register("csr", data.rcsr)
 
         # write back
-        if "write_regs" in data:
-            for register_type in data["write_regs"].keys():
-                for write_reg in data["write_regs"][register_type]:
-                    if "value" in write_reg.keys():
-                        self.write_register(
-                            register_type, write_reg["index"], write_reg["value"]
-                        )
+        if (data.rd is not None) and (data.rd_value is not None):
+            self.write_register("int", data.rd, data.rd_value)
+        if (data.wcsr is not None) and (data.csr_result is not None):
+            self.write_register("csr", data.wcsr, data.csr_result)
 
         return data
 
@@ -1,6 +1,5 @@
 #!/usr/bin/python3
 
-from collections import deque
 import numpy as np
 import sys
 import os
@@ -10,114 +9,27 @@ sys.path.append("../..")
 
 from config.data_types import *
 from config.register_name import register_name
-from config.function_unit_types import function_unit_types
+from config.opcodes import *
 from module_base import Module, Port
-from . import FU
+from . import FU, IQ
 
+# Index field value of absent registers/opcodes
+NONE = -1
 
-class reorder_buffer(Module):
 
-    # Subclass ROBEntry
-    class ROBEntry:
-        def __init__(self) -> None:
-            self.use = False
-            self.inflight = False
-            self.ex = False
-
-            self.opcode = None
-            self.PRS1 = None
-            self.PRS2 = None
-            self.p1 = False
-            self.p2 = False
-
-            self.Rd = None
-            self.PRd = None
-            self.LPRd = None
-
-            self.data = None
-
-        def __str__(self) -> str:
-            return str(self.__dict__)
-
-        def is_ready(self):
-            return (
-                ((self.PRS1 is not None) and (self.p1 is True)) or (self.PRS1 is None)
-            ) and (
-                ((self.PRS2 is not None) and (self.p2 is True)) or (self.PRS2 is None)
-            )
+def to_index(value):
+    return NONE if value is None else value
 
-        def is_complete(self):
-            return (self.use is True) and (self.ex is True)
-
-        def fill_with(self, data):
-            self.use = True
-            self.inflight = False
-            self.ex = False
-            self.opcode = data["name"]
-
-            self.PRS1 = None
-            self.p1 = None
-            self.PRS2 = None
-            self.p2 = None
-
-            if "read_regs" in data:
-                if "int" in data["read_regs"]:
-                    if len(data["read_regs"]["int"]) >= 1:
-                        # x0
-                        if data["read_regs"]["int"][0]["index"] == None:
-                            self.PRS1 = None
-                            self.p1 = None
-                        else:
-                            self.PRS1 = data["read_regs"]["int"][0]["index"]
-                            self.p1 = data["read_regs"]["int"][0]["p"]
-
-                        self.PRS2 = None
-                        self.p2 = None
-
-                    if len(data["read_regs"]["int"]) > 1:
-                        # x0
-                        if data["read_regs"]["int"][1]["index"] == None:
-                            self.PRS2 = None
-                            self.p2 = None
-                        else:
-                            self.PRS2 = data["read_regs"]["int"][1]["index"]
-                            self.p2 = data["read_regs"]["int"][1]["p"]
-
-            if "write_regs" in data:
-                if "int" in data["write_regs"]:
-                    for reg_data in data["write_regs"]["int"]:
-                        # x0
-                        if reg_data["arch_index"] == 0:
-                            self.Rd = None
-                            self.PRd = None
-                            self.LPRd = None
-                        else:
-                            self.Rd = reg_data["arch_index"]
-                            self.PRd = reg_data["index"]
-                            self.LPRd = reg_data["LPRd"]
-            else:
-                self.Rd = None
-                self.PRd = None
-                self.LPRd = None
 
-            self.data = data
+def from_index(value):
+    return None if value < 0 else int(value)
 
-        def invalid(self):
-            self.use = False
-            self.inflight = False
-            self.ex = False
 
-            self.opcode = None
-            self.PRS1 = None
-            self.PRS2 = None
-            self.p1 = False
-            self.p2 = False
+# Instructions which may flush on commit, taking a rename checkpoint
+RECOVERY = BRANCH | JUMP | TRAP_RETURN | TRAP
 
-            self.Rd = None
-            self.PRd = None
-            self.LPRd = None
 
-            self.data = None
+class reorder_buffer(Module):
 
     # Member methods of class ROB
     def __init__(
@@ -129,13 +41,34 @@ class reorder_buffer(Module):
         issue_number,
         issue_queue_num=4,
         issue_queue_size=8,
+        issue_window=8,
+        max_issue_number=2,
     ) -> None:
         super().__init__()
         self.size = size
-        self.entries = [self.ROBEntry() for i in range(self.size)]
-        self.free_entry_index = deque(range(size), size)
-        self.busy_entry_index = deque([], size)
-        self.inflight_entry_index = deque([], size)
+
+        # Circular buffer of entries, one array per field
+        # Busy entries are [head, head + count) modulo size
+        self.head = 0
+        self.count = 0
+        self.use = np.zeros(size, dtype=bool)
+        self.inflight = np.zeros(size, dtype=bool)
+        self.ex = np.zeros(size, dtype=bool)
+        self.opcode = np.full(size, NONE, dtype=np.int16)
+        # Absent sources have PRSx = NONE and are always ready
+        self.PRS1 = np.full(size, NONE, dtype=np.int32)
+        self.PRS2 = np.full(size, NONE, dtype=np.int32)
+        self.p1 = np.zeros(size, dtype=bool)
+        self.p2 = np.zeros(size, dtype=bool)
+        self.Rd = np.full(size, NONE, dtype=np.int32)
+        self.PRd = np.full(size, NONE, dtype=np.int32)
+        self.LPRd = np.full(size, NONE, dtype=np.int32)
+        # Entry holds a rename checkpoint
+        self.checkpoint = np.zeros(size, dtype=bool)
+        # MicroOp of each entry
+        self.data = [None] * size
+        # Issue queue index of each entry
+        self.entry_queues = [None] * size
 
         self.ports = {
             "input": {"ID": Port("ID->[ROB]"), "EX": Port("EX->[ROB]")},
@@ -145,15 +78,34 @@ class reorder_buffer(Module):
         # Issue Queue
         self.issue_queue_num = issue_queue_num
         self.issue_queue_size = issue_queue_size
-        self.issue_queues = [
-            deque(maxlen=self.issue_queue_size) for i in range(self.issue_queue_num)
-        ]
-
-        self.function_unit_status = FU.new_function_units()
+        # Max issue number and issue window size per queue
+        self.issue_window = issue_window
+        self.max_issue_number = max_issue_number
+        self.issue_queues = self.new_issue_queues()
+
+        # Note: CSR status should be updated on committing
+        # last inflight CSR instruction
+        self.function_unit_status = FU.Scoreboard(held_types=["CSR"])
+        # function unit type -> indexes of issue queues having it
+        self.function_unit_queues = {
+            function_unit_type: [
+                issue_queue_index
+                for issue_queue_index in range(self.issue_queue_num)
+                if function_unit_type
+                in self.function_unit_status.units[issue_queue_index]
+            ]
+            for function_unit_type in set(opcode_function_unit_types)
+        }
 
         # Unified physical register file
         self.physical_register_file = physical_register_file
 
+        # physical register -> entries waiting for it
+        # Filled on allocation, drained when the register is written
+        self.consumers = [
+            [] for i in range(len(self.physical_register_file.physical_register))
+        ]
+
         # LSU
         self.lsu = lsu
 
@@ -162,64 +114,134 @@ class reorder_buffer(Module):
 
         self.branch = 0
 
+        # Read once, checked on every cycle
+        self.debug = os.environ.get("DEBUG_PRINT") is not None
+
     # Entry updating methods
     def has_free_entry(self):
-        assert len(self.free_entry_index) + len(self.busy_entry_index) == self.size
-        return len(self.free_entry_index) > 0
+        return self.count < self.size
+
+    # Indexes of busy entries, oldest first
+    def busy_entry_index(self):
+        return (self.head + np.arange(self.count)) % self.size
+
+    def is_ready(self, index):
+        return ((self.PRS1[index] < 0) or self.p1[index]) and (
+            (self.PRS2[index] < 0) or self.p2[index]
+        )
 
+    def is_complete(self, index):
+        return self.use[index] and self.ex[index]
+
+    # Allocate at tail
     def allocate_entry(self):
-        index = self.free_entry_index.popleft()
-        self.busy_entry_index.append(index)
-        self.entries[index].use = True
+        index = (self.head + self.count) % self.size
+        self.count += 1
+        self.use[index] = True
         return index
 
-    def deallocate_entry(self, index):
-        self.busy_entry_index.remove(index)
-        self.entries[index].use = False
-        self.free_entry_index.append(index)
+    # Retire head
+    def retire_entry(self):
+        index = self.head
+        self.invalid_entries(index)
+        self.head = (self.head + 1) % self.size
+        self.count -= 1
+
+    # Squash all busy entries
+    #
+    # Args:
+    #   `restore`: restore the oldest rename checkpoint, taken by the
+    #       just retired entry. Otherwise roll back entries one by one,
+    #       youngest first
+    def squash_entries(self, restore=False):
+        indexes = self.busy_entry_index()
+        if restore:
+            for phy_index in self.physical_register_file.restore_checkpoint():
+                self.consumers[phy_index].clear()
+        else:
+            for index in indexes[::-1]:
+                if self.Rd[index] >= 0:
+                    self.physical_register_file.set_physical_index(
+                        int(self.Rd[index]), from_index(self.LPRd[index])
+                    )
+                    self.physical_register_file.rollback_register(int(self.PRd[index]))
+                    self.consumers[self.PRd[index]].clear()
+            self.physical_register_file.clear_checkpoints()
+        self.invalid_entries(indexes)
+        self.count = 0
+
+    def invalid_entries(self, indexes):
+        self.use[indexes] = False
+        self.inflight[indexes] = False
+        self.ex[indexes] = False
+        self.opcode[indexes] = NONE
+        self.PRS1[indexes] = NONE
+        self.PRS2[indexes] = NONE
+        self.p1[indexes] = False
+        self.p2[indexes] = False
+        self.Rd[indexes] = NONE
+        self.PRd[indexes] = NONE
+        self.LPRd[indexes] = NONE
+        self.checkpoint[indexes] = False
+        for index in np.atleast_1d(indexes):
+            self.data[index] = None
 
     def fill_entry(self, data, index):
-        self.entries[index].fill_with(data)
+        self.use[index] = True
+        self.inflight[index] = False
+        self.ex[index] = False
+        self.opcode[index] = to_index(data.opcode)
+
+        # x0 and absent sources are left as NONE
+        self.PRS1[index] = to_index(data.prs1)
+        self.p1[index] = data.prs1 is not None and data.p1 is True
+        self.PRS2[index] = to_index(data.prs2)
+        self.p2[index] = data.prs2 is not None and data.p2 is True
+
+        # Subscribe to producers of pending sources
+        if data.prs1 is not None and not self.p1[index]:
+            self.consumers[data.prs1].append(index)
+        if data.prs2 is not None and not self.p2[index] and data.prs2 != data.prs1:
+            self.consumers[data.prs2].append(index)
+
+        # x0 destination is left as NONE
+        if data.prd is not None:
+            self.Rd[index] = data.rd
+            self.PRd[index] = data.prd
+            self.LPRd[index] = to_index(data.lprd)
+        else:
+            self.Rd[index] = NONE
+            self.PRd[index] = NONE
+            self.LPRd[index] = NONE
+
+        self.data[index] = data
+
+    def entry_str(self, index):
+        return str(
+            {
+                "use": self.use[index],
+                "inflight": self.inflight[index],
+                "ex": self.ex[index],
+                "opcode": from_index(self.opcode[index]),
+                "PRS1": from_index(self.PRS1[index]),
+                "PRS2": from_index(self.PRS2[index]),
+                "p1": self.p1[index],
+                "p2": self.p2[index],
+                "Rd": from_index(self.Rd[index]),
+                "PRd": from_index(self.PRd[index]),
+                "LPRd": from_index(self.LPRd[index]),
+            }
+        )
 
     # Function unit status methods
-    def function_unit_ready(
-        self, opcode, issue_queue_index, entry_in_queue_index, latency=1
-    ):
-        # TODO: add opcode >> FU_type mapping
-        if (opcode is not None) and (opcode != "ILLEGAL"):
-            function_unit_type = function_unit_types[opcode]
-            # CSR should be issued in-order
-            if function_unit_type in ["CSR", "AGU"]:
-                # Halt if any preceding CSR instructions havn't been issued yet
-                for i in range(entry_in_queue_index):
-                    if (
-                        function_unit_types[
-                            self.entries[self.issue_queues[issue_queue_index][i]].opcode
-                        ]
-                        == function_unit_type
-                    ):
-                        return None, None
-
-            for function_unit_index, function_unit in enumerate(
-                self.function_unit_status[issue_queue_index][function_unit_type]
-            ):
-                if function_unit["latency"] == 0:
-                    # Meaning-less placeholder
-                    function_unit["latency"] = latency
-
-                    # Special masking strategy for MUL/DIV
-                    if function_unit_type in ["MUL", "DIV"]:
-                        function_unit["latency"] = 4
-                        # Mask other MUL/DIV by setting 1 to latency field,
-                        # Release these masked units at the end of this cycle by -1
-                        for following_function_unit in self.function_unit_status[
-                            issue_queue_index
-                        ][function_unit_type][function_unit_index:-1]:
-                            following_function_unit["latency"] = max(
-                                1, following_function_unit["latency"]
-                            )
-
-                    return function_unit_index, function_unit_type
+    def function_unit_ready(self, opcode, issue_queue_index):
+        if (opcode != NONE) and (opcode != ILLEGAL):
+            function_unit_type = opcode_function_unit_types[opcode]
+            function_unit_index = self.function_unit_status.allocate(
+                issue_queue_index, function_unit_type, opcode_issue_intervals[opcode]
+            )
+            if function_unit_index is not None:
+                return function_unit_index, function_unit_type
         return None, None
 
     # Processing internal ROB status
@@ -233,21 +255,19 @@ class reorder_buffer(Module):
 
         self.allocate()
 
-        if os.environ.get("DEBUG_PRINT") is not None:
-            print("Busy:{}".format(len(self.busy_entry_index)), self.busy_entry_index)
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.debug:
+            print("Busy:{}".format(self.count), list(self.busy_entry_index()))
+        if self.debug:
             print(
-                "Inflight:{}".format(len(self.inflight_entry_index)),
-                self.inflight_entry_index,
+                "Inflight:{}".format(np.count_nonzero(self.inflight)),
+                list(np.flatnonzero(self.inflight)),
             )
 
-        self.wake_up()
-
         self.issue()
-        if os.environ.get("DEBUG_PRINT") is not None:
+        if self.debug:
             print(
-                "Inflight:{}".format(len(self.inflight_entry_index)),
-                self.inflight_entry_index,
+                "Inflight:{}".format(np.count_nonzero(self.inflight)),
+                list(np.flatnonzero(self.inflight)),
             )
 
         self.tick_function_unit_status()
@@ -283,49 +303,31 @@ class reorder_buffer(Module):
             self.ports["input"]["EX"].data = None
             self.ports["input"]["EX"].update_status()
 
-    def wake_up(self):
-        # Update register mapping
-        for entry_index in self.busy_entry_index:
-            if (
-                (self.entries[entry_index].use is True)
-                and (self.entries[entry_index].ex is False)
-                and (self.entries[entry_index].inflight is False)
-            ):
-                # If PRSx is None, then px is None instead of False
-                # So only existing PRSx enters either of following 2 branches
-                if (self.entries[entry_index].PRS1 is not None) and (
-                    self.entries[entry_index].p1 is False
-                ):
-                    self.entries[entry_index].p1 = self.physical_register_file.p[
-                        self.entries[entry_index].PRS1
-                    ]
-                    # Get register value if valid
-                    if self.entries[entry_index].p1 is True:
-                        self.entries[entry_index].data["read_regs"]["int"][0][
-                            "p"
-                        ] = True
-                        self.entries[entry_index].data["read_regs"]["int"][0][
-                            "value"
-                        ] = self.physical_register_file.read_physical_register(
-                            self.entries[entry_index].PRS1
-                        )
-
-                if (self.entries[entry_index].PRS2 is not None) and (
-                    self.entries[entry_index].p2 is False
-                ):
-                    self.entries[entry_index].p2 = self.physical_register_file.p[
-                        self.entries[entry_index].PRS2
-                    ]
-                    # Get register value if valid
-                    if self.entries[entry_index].p2 is True:
-                        self.entries[entry_index].data["read_regs"]["int"][1][
-                            "p"
-                        ] = True
-                        self.entries[entry_index].data["read_regs"]["int"][1][
-                            "value"
-                        ] = self.physical_register_file.read_physical_register(
-                            self.entries[entry_index].PRS2
-                        )
+    # Write physical register and broadcast its tag
+    # Only entries subscribed to `phy_index` are woken up
+    def write_register(self, phy_index, value):
+        self.physical_register_file.write_physical_register(phy_index, value)
+
+        consumers = self.consumers[phy_index]
+        if len(consumers) == 0:
+            return
+        for entry_index in consumers:
+            data = self.data[entry_index]
+            if self.PRS1[entry_index] == phy_index:
+                self.p1[entry_index] = True
+                data.p1 = True
+                data.rs1_value = self.physical_register_file.read_physical_register(
+                    phy_index
+                )
+            if self.PRS2[entry_index] == phy_index:
+                self.p2[entry_index] = True
+                data.p2 = True
+                data.rs2_value = self.physical_register_file.read_physical_register(
+                    phy_index
+                )
+            if self.is_ready(entry_index):
+                self.issue_queues[self.entry_queues[entry_index]].set_ready(entry_index)
+        consumers.clear()
 
     def issue(self):
         # Feed port ROB->EX
@@ -335,22 +337,19 @@ class reorder_buffer(Module):
 
             # Issue from issue queues
             for issue_queue_index, issue_queue in enumerate(self.issue_queues):
-                # Max issue number per queue
-                issue_number = 0
-                max_issue_number = 2
-                # Add issue window size limit
-                issue_window = 8
-                if os.environ.get("DEBUG_PRINT") is not None:
+                if self.debug:
                     print(
                         "Issue from queue[{}]: {}".format(
-                            issue_queue_index, list(issue_queue)[0:issue_window]
+                            issue_queue_index,
+                            issue_queue.entries[0 : issue_queue.issue_window],
                         )
                     )
-                for entry_in_queue_index, entry_index in enumerate(
-                    list(issue_queue)[0:issue_window]
-                ):
-                    if issue_number >= max_issue_number:
-                        if os.environ.get("DEBUG_PRINT") is not None:
+                    self.print_not_issuable(issue_queue_index)
+
+                issued_slots = []
+                for slot in issue_queue.select():
+                    if len(issued_slots) >= issue_queue.max_issue_number:
+                        if self.debug:
                             print(
                                 "Issue queue[{}] met max issue number".format(
                                     issue_queue_index
@@ -358,109 +357,66 @@ class reorder_buffer(Module):
                             )
                         break
 
-                    # Check entries ready for issue
-                    # ex == False
-                    # regster ready
-                    # inflight == False
-                    if (
-                        (self.entries[entry_index].ex is False)
-                        and (self.entries[entry_index].is_ready())
-                        and (self.entries[entry_index].inflight is False)
-                    ):
-                        # Try to allocate function unit
-                        (
-                            function_unit_index,
-                            function_unit_type,
-                        ) = self.function_unit_ready(
-                            self.entries[entry_index].opcode,
-                            issue_queue_index,
-                            entry_in_queue_index,
-                        )
-                        if function_unit_index is not None:
-                            if os.environ.get("DEBUG_PRINT") is not None:
-                                print(
-                                    "issueing:[{}] from queue[{}]".format(
-                                        entry_index, issue_queue_index
-                                    ),
-                                    hex(self.entries[entry_index].data["pc"]),
-                                    self.entries[entry_index].data["name"],
-                                    self.entries[entry_index],
-                                )
-                            # Add FU info
-                            self.entries[entry_index].data[
-                                "function_unit_index"
-                            ] = function_unit_index
-                            self.entries[entry_index].data[
-                                "function_unit_type"
-                            ] = function_unit_type
-
-                            # Read CSR
-                            if "read_regs" in self.entries[entry_index].data:
-                                if "csr" in self.entries[entry_index].data["read_regs"]:
-                                    for reg_data in self.entries[entry_index].data[
-                                        "read_regs"
-                                    ]["csr"]:
-                                        reg_data[
-                                            "value"
-                                        ] = self.physical_register_file.read_csr(
-                                            reg_data["index"]
-                                        )
-
-                            # Perpare output data
-                            if self.ports["output"]["EX"].data is None:
-                                self.ports["output"]["EX"].data = [
-                                    [] for i in range(self.issue_queue_num)
-                                ]
-
-                            # issue the entry
-                            self.ports["output"]["EX"].data[issue_queue_index].append(
-                                self.entries[entry_index].data
-                            )
-
-                            # Dequeue
-                            # Note: mustn't use popleft because of out-of-order issueing
-                            issue_queue.remove(entry_index)
-
-                            self.entries[entry_index].inflight = True
-
-                            # Mark as inflight
-                            self.inflight_entry_index.append(entry_index)
-
-                            issue_number += 1
-                            total_issue_number += 1
-                        else:
-                            if os.environ.get("DEBUG_PRINT") is not None:
-                                print(
-                                    "Cant issue[{}] from queue[{}] because FU not ready".format(
-                                        entry_index, issue_queue_index
-                                    ),
-                                    hex(self.entries[entry_index].data["pc"]),
-                                    self.entries[entry_index].data["name"],
-                                )
-                    else:
-                        if os.environ.get("DEBUG_PRINT") is not None:
+                    entry_index = issue_queue.entries[slot]
+                    # Try to allocate function unit
+                    (
+                        function_unit_index,
+                        function_unit_type,
+                    ) = self.function_unit_ready(
+                        self.opcode[entry_index], issue_queue_index
+                    )
+                    if function_unit_index is not None:
+                        if self.debug:
                             print(
-                                "Cant issue[{}] from queue[{}] because".format(
+                                "issueing:[{}] from queue[{}]".format(
                                     entry_index, issue_queue_index
                                 ),
-                                end=" ",
+                                hex(self.data[entry_index].pc),
+                                self.data[entry_index].name,
+                                self.entry_str(entry_index),
                             )
-                        if not (self.entries[entry_index].ex is False):
-                            if os.environ.get("DEBUG_PRINT") is not None:
-                                print("executed", end=" ")
-                        elif not (self.entries[entry_index].is_ready()):
-                            if os.environ.get("DEBUG_PRINT") is not None:
-                                print("register not ready", end=" ")
-                        elif not (self.entries[entry_index].inflight is False):
-                            if os.environ.get("DEBUG_PRINT") is not None:
-                                print("inflight", end=" ")
-                        if os.environ.get("DEBUG_PRINT") is not None:
-                            print(
-                                hex(self.entries[entry_index].data["pc"]),
-                                self.entries[entry_index].data["name"],
+                        # Add FU info
+                        self.data[entry_index].function_unit_index = function_unit_index
+                        self.data[entry_index].function_unit_type = function_unit_type
+
+                        # Read CSR
+                        if self.data[entry_index].rcsr is not None:
+                            self.data[entry_index].csr_value = (
+                                self.physical_register_file.read_csr(
+                                    self.data[entry_index].rcsr
+                                )
                             )
 
-            if os.environ.get("DEBUG_PRINT") is not None:
+                        # Perpare output data
+                        if self.ports["output"]["EX"].data is None:
+                            self.ports["output"]["EX"].data = [
+                                [] for i in range(self.issue_queue_num)
+                            ]
+
+                        # issue the entry
+                        self.ports["output"]["EX"].data[issue_queue_index].append(
+                            self.data[entry_index]
+                        )
+
+                        # Mark as inflight
+                        self.inflight[entry_index] = True
+
+                        issued_slots.append(slot)
+                        total_issue_number += 1
+                    elif self.debug:
+                        print(
+                            "Cant issue[{}] from queue[{}] because FU not ready".format(
+                                entry_index, issue_queue_index
+                            ),
+                            hex(self.data[entry_index].pc),
+                            self.data[entry_index].name,
+                        )
+
+                # Dequeue
+                if len(issued_slots) > 0:
+                    issue_queue.remove(issued_slots)
+
+            if self.debug:
                 print("total_issue_number", total_issue_number)
             if total_issue_number > 0:
                 self.ports["output"]["EX"].update_status()
@@ -469,150 +425,158 @@ class reorder_buffer(Module):
         # Feed port ROB->IF
         # Note: If a branch is committed with flush signal, directly
         # return from this function
-        if (self.ports["output"]["IF"].ready is True) and (
-            len(self.busy_entry_index) > 0
-        ):
+        if (self.ports["output"]["IF"].ready is True) and (self.count > 0):
             for i in range(self.issue_number):
-                entry = self.entries[self.busy_entry_index[0]]
-                if entry.is_complete():
-                    if os.environ.get("DEBUG_PRINT") is not None:
+                if self.count > 0 and self.is_complete(self.head):
+                    data = self.data[self.head]
+                    if self.debug:
                         print(
-                            "committing:[{}]".format(self.busy_entry_index[0]),
-                            hex(entry.data["pc"]),
-                            entry.data["name"],
+                            "committing:[{}]".format(self.head),
+                            hex(data.pc),
+                            data.name,
                         )
-                    data = entry.data
 
                     # Update CSR
-                    if "write_regs" in data:
-                        if "csr" in data["write_regs"]:
-                            for write_reg in data["write_regs"]["csr"]:
-                                if "value" in write_reg:
-                                    self.physical_register_file.write_csr(
-                                        write_reg["index"],
-                                        reg_type(write_reg["value"]),
-                                    )
+                    if (data.wcsr is not None) and (data.csr_result is not None):
+                        self.physical_register_file.write_csr(
+                            data.wcsr,
+                            reg_type(data.csr_result),
+                        )
 
                     # Load/Store controlling logic
-                    if data["name"] in ["LB", "LH", "LW", "LBU", "LHU", "LWU", "LD"]:
+                    if data.flags & LOAD:
                         data = self.lsu.tick(data).step()
                         # GPR
-                        if "int" in data["write_regs"]:
-                            for write_reg in data["write_regs"]["int"]:
-                                if ("value" in write_reg) and (
-                                    write_reg["index"] is not None
-                                ):
-                                    self.physical_register_file.write_physical_register(
-                                        self.entries[data["ROB_entry"]].PRd,
-                                        reg_type(write_reg["value"]),
-                                    )
-                    elif data["name"] in ["SB", "SH", "SW", "SD"]:
+                        if (data.rd_value is not None) and (data.prd is not None):
+                            self.write_register(
+                                int(self.PRd[data.rob_index]),
+                                reg_type(data.rd_value),
+                            )
+                    elif data.flags & (STORE | FENCE_I):
                         data = self.lsu.tick(data).step()
 
                     # deallocate LPRD
-                    self.physical_register_file.deallocate_register(entry.LPRd)
+                    self.physical_register_file.deallocate_register(
+                        from_index(self.LPRd[self.head])
+                    )
 
                     # deallocate ROB entry
-                    entry.invalid()
-                    self.free_entry_index.append(self.busy_entry_index.popleft())
+                    checkpoint = self.checkpoint[self.head]
+                    self.retire_entry()
 
                     # deallocate CSR function unit
                     # CSR only in issue_queue[0]
-                    self.function_unit_status[0]["CSR"][0]["latency"] = 0
+                    self.function_unit_status.release(0, "CSR", 0)
 
                     # Branch controlling logic
                     # TODO: Exception handling
 
-                    if data["name"] in [
-                        "BNE",
-                        "BEQ",
-                        "BLT",
-                        "BGE",
-                        "BLTU",
-                        "BGEU",
-                        "JAL",
-                        "JALR",
-                    ]:
+                    if data.flags & (BRANCH | JUMP):
                         self.branch += 1
 
-                    if (
-                        (
-                            data["name"]
-                            in [
-                                "BNE",
-                                "BEQ",
-                                "BLT",
-                                "BGE",
-                                "BLTU",
-                                "BGEU",
-                            ]
-                        )
-                        and (data["taken"] is True)
-                    ) or (
-                        data["name"]
-                        in [
-                            "JAL",
-                            "JALR",
-                            "URET",
-                            "SRET",
-                            "MRET",
-                            "ECALL",
-                            # "EBREAK"
-                        ]
+                    if ((data.flags & BRANCH) and (data.taken is True)) or (
+                        data.flags & (JUMP | TRAP_RETURN | TRAP)
                     ):
                         self.ports["output"]["IF"].data = data
                         self.ports["output"]["IF"].update_status()
 
                         # Flush ROB & reg_file
-                        # TODO: snapshot
                         # TODO: Add branch prediction
 
                         # Roll_back
-                        for i in range(len(self.busy_entry_index)):
-
-                            entry_index = self.busy_entry_index.pop()
-                            self.free_entry_index.insert(0, entry_index)
-
-                            if self.entries[entry_index].Rd is not None:
-                                self.physical_register_file.set_physical_index(
-                                    self.entries[entry_index].Rd,
-                                    self.entries[entry_index].LPRd,
-                                )
-                                self.physical_register_file.rollback_register(
-                                    self.entries[entry_index].PRd
-                                )
-
-                            self.entries[entry_index].invalid()
+                        self.squash_entries(restore=checkpoint)
                         return True
+
+                    if checkpoint:
+                        self.physical_register_file.release_checkpoint()
                 else:
                     return False
 
     def tick_function_unit_status(self):
         # FU status of ROB should be 1 cycle ahead of that of EX
-        for issue_queue_function_unit_status in self.function_unit_status:
-            for function_unit_type in issue_queue_function_unit_status:
-                # Note: CSR status should be updated on committing
-                # last inflight CSR instruction
-                if function_unit_type != "CSR":
-                    for function_unit in issue_queue_function_unit_status[
-                        function_unit_type
-                    ]:
-                        # Decrement
-                        function_unit["latency"] = max(function_unit["latency"] - 1, 0)
+        self.function_unit_status.tick()
+
+    # Idle-cycle skipping
+
+    # Whether step() would change nothing
+    def idle(self):
+        # Write back
+        if self.ports["input"]["EX"].valid:
+            return False
+        # Commit
+        if (self.count > 0) and self.is_complete(self.head):
+            return False
+        # Allocate
+        if self.ports["input"]["ID"].valid and (
+            self.allocatable_queue(self.ports["input"]["ID"].data[0]) is not None
+        ):
+            return False
+        # Issue
+        if self.ports["output"]["EX"].ready:
+            for issue_queue_index, issue_queue in enumerate(self.issue_queues):
+                for slot in issue_queue.select():
+                    opcode = self.opcode[issue_queue.entries[slot]]
+                    if (
+                        (opcode != NONE)
+                        and (opcode != ILLEGAL)
+                        and self.function_unit_status.is_free(
+                            issue_queue_index, opcode_function_unit_types[opcode]
+                        )
+                    ):
+                        return False
+        return True
+
+    # Cycles until issuing to a busy function unit, None if none is busy
+    def cycles_to_event(self):
+        cycles = self.function_unit_status.cycles_to_release()
+        # Freed by the tick at the end of step
+        return None if cycles is None else cycles + 1
+
+    def skip(self, cycles):
+        self.function_unit_status.tick(cycles)
 
     # Supplement methods
 
+    def new_issue_queues(self):
+        return [
+            IQ.IssueQueue(
+                self.issue_queue_size, self.issue_window, self.max_issue_number
+            )
+            for i in range(self.issue_queue_num)
+        ]
+
+    # Debug: reasons of entries in issue window not being issuable
+    def print_not_issuable(self, issue_queue_index):
+        issue_queue = self.issue_queues[issue_queue_index]
+        for slot, entry_index in enumerate(
+            issue_queue.entries[0 : issue_queue.issue_window]
+        ):
+            if issue_queue.ready & (1 << slot):
+                continue
+            print(
+                "Cant issue[{}] from queue[{}] because".format(
+                    entry_index, issue_queue_index
+                ),
+                end=" ",
+            )
+            if self.ex[entry_index]:
+                print("executed", end=" ")
+            elif not self.is_ready(entry_index):
+                print("register not ready", end=" ")
+            elif self.inflight[entry_index]:
+                print("inflight", end=" ")
+            print(
+                hex(self.data[entry_index].pc),
+                self.data[entry_index].name,
+            )
+
     def get_issue_queue_id(self, data):
-        function_unit_type = function_unit_types[data["name"]]
+        function_unit_type = opcode_function_unit_types[data.opcode]
 
         candidate_queue = [
             issue_queue_index
-            for issue_queue_index in range(self.issue_queue_num)
-            if (function_unit_type in self.function_unit_status[issue_queue_index])
-            and (
-                len(self.issue_queues[issue_queue_index])
-                < self.issue_queues[issue_queue_index].maxlen
-            )
+            for issue_queue_index in self.function_unit_queues[function_unit_type]
+            if self.issue_queues[issue_queue_index].has_free_slot()
         ]
 
         if len(candidate_queue) == 0:
@@ -630,117 +594,110 @@ class reorder_buffer(Module):
             )
         return chosen_queue_id
 
+    # Issue queue to allocate `data` into, None if it has to wait
+    def allocatable_queue(self, data):
+        # check ROB and register file,
+        # wait if either was full
+        if not (
+            self.has_free_entry()
+            and self.physical_register_file.has_free_register(
+                1 if data.rd is not None else 0
+            )
+        ):
+            return None
+        # check issue queue
+        return self.get_issue_queue_id(data)
+
+    # Physical index, valid bit and value of a source register
+    def read_source(self, index):
+        # x0
+        if index == 0:
+            return None, True, reg_type(0)
+
+        # Other architectural registers
+        phy_index = self.physical_register_file.get_physical_index(index)
+
+        # Panic if non-mapped register is to be read
+        if phy_index is None:
+            raise UserWarning("Invalid mapping of RS reg[{}]".format(index))
+
+        # In-order entering ROB guarantees consistency
+        p = bool(self.physical_register_file.p[phy_index])
+        value = (
+            self.physical_register_file.read_physical_register(phy_index) if p else None
+        )
+        return phy_index, p, value
+
     def handle_ID_input(self, port_data):
         # instructions from ID stage
         processed_item = []
         for i, data in enumerate(port_data):
-            # check ROB and register file,
-            # break if either was full
-            #
-            # check issue queue
-            if (
-                self.has_free_entry()
-                and self.physical_register_file.has_free_register(
-                    len(data["write_regs"]["int"])
-                    if (("write_regs" in data) and ("int" in data["write_regs"]))
-                    else 0
-                )
-                and (self.get_issue_queue_id(data) is not None)
-            ):
+            issue_queue_id = self.allocatable_queue(data)
+            if issue_queue_id is not None:
                 # get register mapping
-                if "read_regs" in data:
-                    # CSR no renaming
-
-                    # Note: CSR should be read on issueing
+                # CSR no renaming
 
-                    # GPR
-                    if "int" in data["read_regs"]:
-                        for reg_data in data["read_regs"]["int"]:
-                            # x0
-                            if reg_data["index"] == 0:
-                                reg_data["index"] = None
-                                reg_data["p"] = True
-                                reg_data["value"] = reg_type(0)
-                            # Other architectural registers
-                            else:
-                                phy_index = (
-                                    self.physical_register_file.get_physical_index(
-                                        reg_data["index"]
-                                    )
-                                )
+                # Note: CSR should be read on issueing
 
-                                # Panic if non-mapped register is to be read
-                                if phy_index is None:
-                                    raise UserWarning(
-                                        "Invalid mapping of RS reg[{}]".format(
-                                            reg_data["index"]
-                                        )
-                                    )
-
-                                # In-order entering ROB guarantees consistency
-                                reg_data["index"] = phy_index
-                                reg_data["p"] = self.physical_register_file.p[phy_index]
-                                if reg_data["p"] is True:
-                                    reg_data[
-                                        "value"
-                                    ] = self.physical_register_file.read_physical_register(
-                                        phy_index
-                                    )
+                # GPR
+                if data.rs1 is not None:
+                    data.prs1, data.p1, data.rs1_value = self.read_source(data.rs1)
+                if data.rs2 is not None:
+                    data.prs2, data.p2, data.rs2_value = self.read_source(data.rs2)
 
                 # rename
-                if "write_regs" in data:
-                    # CSR no renaming
-
-                    # GPR
-                    if "int" in data["write_regs"]:
-                        for reg_data in data["write_regs"]["int"]:
-                            # x0
-                            if reg_data["index"] == 0:
-                                reg_data["arch_index"] = 0
-                                reg_data["index"] = None
-                                reg_data["LPRd"] = None
-                            # Other architectural registers
-                            elif self.physical_register_file.has_free_register():
-                                # Get newly-renamed physical register
-                                # with renaming table not changed yet
-                                phy_index = self.physical_register_file.rename()
-
-                                # Update data fields
-                                reg_data["arch_index"] = reg_data["index"]
-                                reg_data["index"] = phy_index
-                                # Get old physical register index
-                                reg_data[
-                                    "LPRd"
-                                ] = self.physical_register_file.get_physical_index(
-                                    reg_data["arch_index"]
-                                )
+                # CSR no renaming
+
+                # GPR
+                if data.rd is not None:
+                    # x0
+                    if data.rd == 0:
+                        data.prd = None
+                        data.lprd = None
+                    # Other architectural registers
+                    elif self.physical_register_file.has_free_register():
+                        # Get newly-renamed physical register
+                        # with renaming table not changed yet
+                        data.prd = self.physical_register_file.rename()
+                        # Get old physical register index
+                        data.lprd = self.physical_register_file.get_physical_index(
+                            data.rd
+                        )
 
-                                # Update renaming table with new physical index
-                                self.physical_register_file.set_physical_index(
-                                    reg_data["arch_index"], phy_index
-                                )
+                        # Update renaming table with new physical index
+                        self.physical_register_file.set_physical_index(
+                            data.rd, data.prd
+                        )
 
                 # allocate ROB entry
                 entry_index = self.allocate_entry()
 
                 # taint
-                data["ROB_entry"] = entry_index
+                data.rob_index = entry_index
+                data.epoch = self.epoch
 
                 # fill ROB entry
                 self.fill_entry(data, entry_index)
 
-                if os.environ.get("DEBUG_PRINT") is not None:
+                # Snapshot renaming for recovery, if any checkpoint left
+                if data.flags & RECOVERY:
+                    self.checkpoint[entry_index] = (
+                        self.physical_register_file.save_checkpoint()
+                    )
+
+                if self.debug:
                     print(
-                        "ROB[{}] Q[{}]".format(
-                            entry_index, self.get_issue_queue_id(data)
-                        ),
-                        hex(self.entries[entry_index].data["pc"]),
-                        self.entries[entry_index].data["name"],
-                        self.entries[entry_index],
+                        "ROB[{}] Q[{}]".format(entry_index, issue_queue_id),
+                        hex(self.data[entry_index].pc),
+                        self.data[entry_index].name,
+                        self.entry_str(entry_index),
                     )
 
                 # enqueue this entry
-                self.issue_queues[self.get_issue_queue_id(data)].append(entry_index)
+                self.issue_queues[issue_queue_id].push(
+                    entry_index, data.opcode, self.is_ready(entry_index)
+                )
+                self.entry_queues[entry_index] = issue_queue_id
 
                 processed_item.append(i)
             else:
@@ -756,16 +713,15 @@ class reorder_buffer(Module):
         # instruction results
         for issue_queue_index, queue_data in enumerate(port_data["results"]):
             for i, data in enumerate(queue_data):
-                entry_index = data["ROB_entry"]
-                self.entries[entry_index].data = data
-                if os.environ.get("DEBUG_PRINT") is not None:
+                entry_index = data.rob_index
+                self.data[entry_index] = data
+                if self.debug:
                     print(
                         "writing back:[{}]".format(entry_index),
-                        hex(self.entries[entry_index].data["pc"]),
-                        self.entries[entry_index].data["name"],
-                        self.entries[entry_index],
+                        hex(self.data[entry_index].pc),
+                        self.data[entry_index].name,
+                        self.entry_str(entry_index),
                     )
-                self.inflight_entry_index.remove(entry_index)
                 # # FU_status
                 # self.function_unit_status[data['function_unit_type']][data['function_unit_index']]['latency'] = None
                 # if os.environ.get('DEBUG_PRINT') is not None:
@@ -775,29 +731,25 @@ class reorder_buffer(Module):
                 # Note: freelist are not updated yet (on committing)
 
                 # Special strategy for ld instructions
-                if function_unit_types[data["name"]] == "AGU":
+                if opcode_function_unit_types[data.opcode] == "AGU":
                     pass
-                elif "write_regs" in data:
+                else:
                     # write PRD register
                     # CSR
 
                     # Note: CSR should be written on commiting
 
                     # GPR
-                    if "int" in data["write_regs"]:
-                        for write_reg in data["write_regs"]["int"]:
-                            if ("value" in write_reg) and (
-                                write_reg["index"] is not None
-                            ):
-                                self.physical_register_file.write_physical_register(
-                                    self.entries[entry_index].PRd,
-                                    reg_type(write_reg["value"]),
-                                )
+                    if (data.rd_value is not None) and (data.prd is not None):
+                        self.write_register(
+                            int(self.PRd[entry_index]),
+                            reg_type(data.rd_value),
+                        )
 
                 # Mark entry as post-EX
-                self.entries[entry_index].ex = True
-                self.entries[entry_index].inflight = False
-                self.entries[entry_index].data = data
+                self.ex[entry_index] = True
+                self.inflight[entry_index] = False
+                self.data[entry_index] = data
 
         return
 
@@ -807,11 +759,9 @@ class reorder_buffer(Module):
                 port.print()
 
     def flush(self):
-        self.function_unit_status = FU.new_function_units()
-        self.issue_queues = [
-            deque(maxlen=self.issue_queue_size) for i in range(self.issue_queue_num)
-        ]
-        self.inflight_entry_index = deque([], maxlen=self.size)
+        self.function_unit_status.reset()
+        for issue_queue in self.issue_queues:
+            issue_queue.clear()
         return super().flush()
 
 
@@ -819,25 +769,29 @@ class reorder_buffer(Module):
 if __name__ == "__main__":
     import REG
 
+    from func.micro_op import MicroOp
+
     decode_result = [
-        {
-            "name": "ADDI",
-            "imm": [0],
-            "read_regs": {"int": [{"index": 0}]},
-            "write_regs": {"int": [{"index": 1}]},
-            "pc": 2147483720,
-            "insn_code": "0x93",
-            "insn_len": 4,
-        },
-        {
-            "name": "ADDI",
-            "imm": [0],
-            "read_regs": {"int": [{"index": 0}]},
-            "write_regs": {"int": [{"index": 2}]},
-            "pc": 2147483724,
-            "insn_code": "0x113",
-            "insn_len": 4,
-        },
+        MicroOp.from_decoded(
+            {
+                "name": "ADDI",
+                "imm": [0],
+                "read_regs": {"int": [{"index": 0}]},
+                "write_regs": {"int": [{"index": 1}]},
+            },
+            2147483720,
+            0x93,
+        ),
+        MicroOp.from_decoded(
+            {
+                "name": "ADDI",
+                "imm": [0],
+                "read_regs": {"int": [{"index": 0}]},
+                "write_regs": {"int": [{"index": 2}]},
+            },
+            2147483724,
+            0x113,
+        ),
     ]
 
     rob = reorder_buffer(32, REG.PhysicalRegisterFile(100), 2)
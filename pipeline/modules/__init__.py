@@ -5,4 +5,4 @@ import sys
 sys.path.append("..")
 sys.path.append("../..")
 
-__all__ = ["EX", "FU", "IDU", "IFU", "LSU", "MEM", "REG", "ROB"]
+__all__ = ["EX", "FU", "HTIF", "IDU", "IFU", "IQ", "LSU", "MEM", "REG", "ROB"]
@@ -4,11 +4,21 @@ import sys
 
 sys.path.append("..")
 
-from func.decode.decoder import decode_word
-import func.execution.rv64i as instructions
+from func.decode.decoder import DecodeCache
+from func.execution.translator import BlockTranslator
+from func.execution.jit_core import (
+    JitCore,
+    EXIT_BUDGET,
+    EXIT_TOHOST,
+    EXIT_PAGE_FAULT,
+)
+from func.execution.backends import execute_tables
+from config.opcodes import LOAD_SIGNED, FENCE_I
 from config.data_types import *
 from config.register_name import register_name
-from utils.elf_parser import load_elf
+from utils.elf_cache import load_program
+from modules.MEM import Memory, PAGE_SIZE
+from modules.HTIF import HTIF
 
 import os
 import numpy as np
@@ -16,11 +26,20 @@ import getopt
 
 
 class Simulator:
-    def __init__(self, data):
-        self.mem = data.memory.data
+    def __init__(self, data, backend="numpy"):
+        # opcode id -> execute function
+        self.execute = execute_tables[backend]
+        self.memory = Memory(data.memory.pages())
         self.fetch_pc = data.entry_pc
         self.pc = data.entry_pc
         self.tohost_addr = data.tohost_addr
+        self.htif = HTIF(self.memory, data.tohost_addr)
+        self.decode_cache = DecodeCache()
+        for start, table in data.text_tables:
+            self.decode_cache.add_table(start, table)
+        self.translator = BlockTranslator(self.memory, self.decode_cache)
+        # Created on first `run_jit`
+        self.jit_core = None
         self.cycle = 0
         self.gpr = np.zeros(32, dtype=reg_type)
         self.csr = np.zeros(4096, dtype=reg_type)
@@ -57,64 +76,184 @@ class Simulator:
             if i % 4 == 3:
                 print("", end="\n")
 
-    # Rust read_bytes() costs 1.09s
-    # Python read_bytes() costs 0.0003s
     def read_bytes(self, address, width, sign_extend=False):
-        data = double_type(0)
-        for i in range(width):
-            data = np.bitwise_or(
-                data,
-                double_type(self.read_byte(address + reg_type(i)) << reg_type(i * 8)),
-            )
-        if sign_extend is True:
-            sign = reg_type(data >> reg_type(width * 8 - 1)) & reg_type(0x1)
-            data = reg_type(data) | reg_type(
-                int(
-                    str(sign) * ((reg_type(0).itemsize - width) * 8) + "0" * width * 8,
-                    2,
-                )
-            )
-
-        return reg_type(data)
+        return self.memory.read_bytes(address, width, sign_extend)
 
     def read_byte(self, address):
-        index = reg_type(address) >> reg_type(3)
-        pos = reg_type((address % 8) * 8)
-        data = reg_type(self.mem[index]) >> reg_type(pos)
-        return reg_type(data & reg_type(0xFF))
+        return self.memory.read_byte(address)
 
     def write_bytes(self, address, width, value):
-        for i in range(width):
-            self.write_byte(
-                address + reg_type(i), (value >> reg_type(i * 8)) & reg_type(0xFF)
-            )
+        self.memory.write_bytes(address, width, value)
 
     def write_byte(self, address, value):
-        index = address >> reg_type(3)
-        pos = reg_type((address % 8) * 8)
-        self.mem[index] = (
-            reg_type(self.mem[index]) & double_type(np.invert(reg_type(0xFF) << pos))
-        ) | (value << pos)
+        self.memory.write_byte(address, value)
+
+    def load(self, address, width, sign_extend=False):
+        return int(self.memory.read_bytes(address, width, sign_extend))
+
+    # Store with code invalidation
+    # Returns True if translated code or tohost was written
+    def store(self, address, width, value):
+        self.write_bytes(address, width, value)
+        self.decode_cache.invalidate(address, width)
+        return self.translator.invalidate(address, width) or (
+            (address < self.tohost_addr + 8) and (address + width > self.tohost_addr)
+        )
+
+    # Functional fast-forward
+    # Interprets up to `instructions` instructions, stopping early
+    # at `roi_pc` or on exit. Returns the number interpreted.
+    def fast_forward(self, instructions, roi_pc=None):
+        start = self.cycle
+        while (self.cycle - start < instructions) and not self.htif.exit:
+            if int(self.fetch_pc) == roi_pc:
+                break
+            self.step()
+        return self.cycle - start
+
+    # Interpret one instruction
+    def step(self):
+        self.write_register("int", 0, 0)
+        self.pc = reg_type(self.fetch_pc)
+
+        # fetch
+        fetch_result = word_type(self.read_bytes(reg_type(self.fetch_pc), 4))
+        is_compressed = fetch_result & word_type(0x3) != word_type(0x3)
+        if is_compressed:
+            # TODO: C-ext
+            self.fetch_pc += reg_type(2)
+        else:
+            self.fetch_pc += reg_type(4)
+
+        # decode
+        decode_result = self.decode_cache.decode(self.pc, fetch_result)
+
+        # read register file
+        if decode_result.rs1 is not None:
+            decode_result.rs1_value = self.read_register("int", decode_result.rs1)
+        if decode_result.rs2 is not None:
+            decode_result.rs2_value = self.read_register("int", decode_result.rs2)
+        if decode_result.rcsr is not None:
+            decode_result.csr_value = self.read_register("csr", decode_result.rcsr)
+
+        # if DEBUG_PRINT:
+        # try:
+        #     print(
+        #     "{} {}".format(hex(decode_result.pc), decode_result.name),
+        #     )
+        # except:
+        #     print(
+        #     "{} ".format(hex(decode_result.pc)),
+        #     )
+
+        # execute
+        execute_result = self.execute[decode_result.opcode](decode_result)
+
+        # load store
+        # TODO: place this section in func/
+        if execute_result.is_load:
+            execute_result.rd_value = self.read_bytes(
+                execute_result.mem_addr,
+                execute_result.mem_len,
+                sign_extend=(execute_result.flags & LOAD_SIGNED) != 0,
+            )
+
+        if execute_result.is_store:
+            self.store(
+                execute_result.mem_addr,
+                execute_result.mem_len,
+                execute_result.rs2_value,
+            )
+
+        if execute_result.flags & FENCE_I:
+            self.decode_cache.flush()
+            self.translator.flush()
+
+        # write back
+        if (execute_result.rd is not None) and (execute_result.rd_value is not None):
+            self.write_register("int", execute_result.rd, execute_result.rd_value)
+        if (execute_result.wcsr is not None) and (
+            execute_result.csr_result is not None
+        ):
+            self.write_register("csr", execute_result.wcsr, execute_result.csr_result)
+
+        # branch
+        if execute_result.next_pc is not None:
+            self.fetch_pc = reg_type(execute_result.next_pc)
+
+        self.tick()
+
+    # Run one translated block, or interpret one instruction
+    # if no block can be translated at this pc
+    def run_block(self):
+        self.write_register("int", 0, 0)
+        self.pc = reg_type(self.fetch_pc)
+
+        block = self.translator.lookup(self.pc)
+        if block is None:
+            self.step()
+            return
+
+        next_pc, count = block(self.gpr, self.load, self.store)
+        self.fetch_pc = reg_type(next_pc)
+        self.cycle += count
+        self.csr[0xB00] = self.cycle
+
+    # Run up to `budget` instructions in the numba core
+    # ECALLs and anything the core can not execute are interpreted
+    def run_jit(self, budget):
+        if self.jit_core is None:
+            self.jit_core = JitCore(self.memory, self.gpr, self.csr)
+
+        self.write_register("int", 0, 0)
+        reason, self.fetch_pc, self.cycle, _, _ = self.jit_core.run(
+            self.fetch_pc, self.cycle, budget, self.tohost_addr
+        )
+        self.pc = self.fetch_pc
+
+        for address in self.jit_core.dirty_pages():
+            self.decode_cache.invalidate(address, PAGE_SIZE)
+            self.translator.invalidate(address, PAGE_SIZE)
+
+        # Stores of the core bypass `Memory`, it exits after a tohost store
+        if reason == EXIT_TOHOST:
+            self.memory.notify_store(self.tohost_addr, 8)
+
+        # Page faults are mapped by the core, the store is retried next run
+        if reason not in [EXIT_BUDGET, EXIT_TOHOST, EXIT_PAGE_FAULT]:
+            self.step()
 
 
 def main(argv):
 
     riscv_tests_index = 0
     DEBUG_PRINT = False
+    block_mode = False
+    jit_mode = False
+    jit_budget = 1000000
+    backend = "numpy"
 
     try:
-        opts, args = getopt.getopt(argv, "hdi:", ["index="])
+        opts, args = getopt.getopt(argv, "hdbja:i:", ["index=", "block", "jit", "alu="])
     except getopt.GetoptError:
-        print("prototype.py [-i <riscv_tests_index=0>] [-d]")
+        print("prototype.py [-i <riscv_tests_index=0>] [-d] [-b] [-j] [-a <numpy|int>]")
         sys.exit(2)
     for opt, arg in opts:
         if opt == "-h":
-            print("prototype.py [-i <riscv_tests_index=0>] [-d]")
+            print(
+                "prototype.py [-i <riscv_tests_index=0>] [-d] [-b] [-j] [-a <numpy|int>]"
+            )
             sys.exit()
         elif opt in ("-d", "--debug"):
             DEBUG_PRINT = True
         elif opt in ("-i", "--index"):
             riscv_tests_index = int(arg)
+        elif opt in ("-b", "--block"):
+            block_mode = True
+        elif opt in ("-j", "--jit"):
+            jit_mode = True
+        elif opt in ("-a", "--alu"):
+            backend = arg
 
     np.set_printoptions(formatter={"int": hex})
 
@@ -146,82 +285,19 @@ def main(argv):
     for test in [benchmarks_path + "dhrystone.riscv"]:
 
         # for test in rv64ui_p_tests[riscv_tests_index:]:
-        cpu = Simulator(load_elf(test, 2049 * 1024 * 1024))
-
-        while cpu.read_byte(cpu.tohost_addr) == 0:
-            cpu.write_register("int", 0, 0)
-            cpu.pc = reg_type(cpu.fetch_pc)
-
-            # fetch
-            fetch_result = word_type(cpu.read_bytes(reg_type(cpu.fetch_pc), 4))
-            is_compressed = fetch_result & word_type(0x3) != word_type(0x3)
-            if is_compressed:
-                # TODO: C-ext
-                cpu.fetch_pc += reg_type(2)
+        cpu = Simulator(load_program(test, 2049 * 1024 * 1024), backend)
+
+        # tohost commands are handled by `cpu.htif` on store
+        while not cpu.htif.exit:
+            if jit_mode:
+                cpu.run_jit(jit_budget)
+            elif block_mode:
+                cpu.run_block()
             else:
-                cpu.fetch_pc += reg_type(4)
-
-            # decode
-            decode_result = decode_word(fetch_result)
-
-            # decorate decoding result
-            decode_result["pc"] = cpu.pc
-            decode_result["insn_code"] = hex(fetch_result)
-            decode_result["insn_len"] = 2 if is_compressed else 4
-
-            # read register file
-            if "read_regs" in decode_result:
-                for register_type in decode_result["read_regs"].keys():
-                    for i in decode_result["read_regs"][register_type]:
-                        i["value"] = cpu.read_register(register_type, i["index"])
-
-            # if DEBUG_PRINT:
-            # try:
-            #     print(
-            #     "{} {}".format(hex(decode_result["pc"]), decode_result["name"]),
-            #     )
-            # except:
-            #     print(
-            #     "{} ".format(hex(decode_result["pc"])),
-            #     )
-
-            # execute
-            execute_result = getattr(instructions, decode_result["name"])(decode_result)
-
-            # load store
-            # TODO: place this section in func/
-            if "load_mem" in execute_result:
-                for load_request in execute_result["load_mem"]:
-                    execute_result["write_regs"]["int"][0]["value"] = cpu.read_bytes(
-                        load_request["addr"],
-                        load_request["len"],
-                        sign_extend=execute_result["name"] in ["LB", "LH", "LW"],
-                    )
-
-            if "store_mem" in execute_result:
-                for store_request in execute_result["store_mem"]:
-                    cpu.write_bytes(
-                        store_request["addr"],
-                        store_request["len"],
-                        store_request["value"],
-                    )
-
-            # write back
-            if "write_regs" in execute_result:
-                for register_type in execute_result["write_regs"].keys():
-                    for write_reg in execute_result["write_regs"][register_type]:
-                        cpu.write_register(
-                            register_type, write_reg["index"], write_reg["value"]
-                        )
+                cpu.step()
             if DEBUG_PRINT:
                 cpu.print_registers()
 
-            # branch
-            if "next_pc" in execute_result:
-                cpu.fetch_pc = reg_type(execute_result["next_pc"])
-
-            cpu.tick()
-
             # # TODO: for riscv-test isa test only
             # endcode = cpu.read_byte(cpu.tohost_addr)
             # if endcode != 0:
@@ -233,29 +309,7 @@ def main(argv):
             #             "Test {} Failed at test[{}]".format(test, endcode >> byte_type(1))
             #         )
 
-            tohost_data = cpu.read_bytes(cpu.tohost_addr, 4)
-            if tohost_data != 0:
-                if tohost_data & reg_type(0x1) == reg_type(0x1):
-                    print("cycles = {}".format(cpu.cycle))
-                    break
-                if tohost_data >= 0x80000000:
-                    # Address of tohost data
-                    flag1 = cpu.read_bytes(reg_type(24 + tohost_data), 4)
-                    flag2 = cpu.read_bytes(reg_type(28 + tohost_data), 4)
-
-                    if (flag1 != 0) or (flag2 != 0):
-                        base = cpu.read_bytes(reg_type(4 * 4 + tohost_data), 4)
-                        length = cpu.read_bytes(reg_type(6 * 4 + tohost_data), 4)
-                        for i in range(length):
-                            # TODO: decode
-                            char = cpu.read_bytes(reg_type(i + base), 1)
-                            print(chr(char), end="")
-
-                        cpu.write_bytes(
-                            reg_type(cpu.tohost_addr + 0x40), 4, reg_type(1)
-                        )
-                        cpu.write_bytes(reg_type(cpu.tohost_addr), 4, reg_type(0))
-                        # break
+        print("cycles = {}".format(cpu.cycle))
 
         # break
 
@@ -11,24 +11,32 @@ sys.path.append("..")
 
 from config.data_types import *
 from config.register_name import register_name
-from utils.elf_parser import load_elf
+from utils.elf_cache import load_program
+from func.decode.decoder import DecodeCache
 
 from modules import *
+from module_base import Channel, Scheduler
 
 
 class Simulator:
-    def __init__(self, data):
+    # `channel_latencies`: extra cycles per linkage, e.g. {"IF->ID": 1}
+    def __init__(self, data, backend="numpy", channel_latencies=None):
         self.tohost_addr = data.tohost_addr
         self.cycle = 1
 
-        self.reg = REG.PhysicalRegisterFile(100)
-        self.memory = MEM.Memory(np.array(data.memory.data, dtype=np.uint64))
+        # Register file invariants are checked in debug mode
+        self.reg = REG.PhysicalRegisterFile(100, check=DEBUG_PRINT)
+        self.memory = MEM.Memory(data.memory.pages())
+        self.htif = HTIF.HTIF(self.memory, data.tohost_addr)
+        self.decode_cache = DecodeCache()
+        for start, table in data.text_tables:
+            self.decode_cache.add_table(start, table)
 
         self.IF = IFU.IFU(self.memory, reg_type(data.entry_pc), 4)
-        self.ID = IDU.IDU()
-        self.lsu = LSU.LSU(self.memory)
+        self.ID = IDU.IDU(self.decode_cache)
+        self.lsu = LSU.LSU(self.memory, self.decode_cache)
         self.ROB = ROB.reorder_buffer(80, self.reg, self.lsu, 8)
-        self.EX = EX.EX()
+        self.EX = EX.EX(backend)
 
         self.linkages = [
             "IF->ID",
@@ -38,9 +46,35 @@ class Simulator:
             "EX->ROB",
             "ROB->IF",
         ]
+        channel_latencies = channel_latencies or {}
+        self.channels = [
+            Channel.link(self, linkage, latency=channel_latencies.get(linkage, 0))
+            for linkage in self.linkages
+        ]
+
+        # EX is stepped only on issue and completions
+        self.scheduler = Scheduler()
+        for module in [self.IF, self.ID, self.ROB]:
+            self.scheduler.add(module)
+        self.scheduler.add(self.EX, event_driven=True)
 
         self.exit = False
 
+    # Continue from the architectural state of a functional
+    # `prototype.Simulator`, e.g. after fast-forward
+    # Memory pages of the program are shared, pages allocated since
+    # are taken over. Cycles continue from the instruction count.
+    def load_state(self, functional):
+        self.memory.pages.update(functional.memory.pages)
+        self.reg.load_architectural_state(functional.gpr, functional.csr)
+        self.IF.redirect(functional.fetch_pc)
+        self.IF.pc = reg_type(functional.fetch_pc)
+        self.cycle = functional.cycle + 1
+
+        # Console output stays in order, open files stay open
+        functional.htif.flush()
+        self.htif.files = functional.htif.files
+
     # Transport data
     def tick(self):
         # debug logging
@@ -51,34 +85,52 @@ class Simulator:
         self.reg.write_csr(0xB00, reg_type(self.cycle))
 
         # Propagation
-        for linkage in self.linkages:
-            src, dst = linkage.split("->")
-            src, dst = (
-                getattr(self, src).ports["output"][dst],
-                getattr(self, dst).ports["input"][src],
-            )
-            if src.valid and dst.ready:
-                src.data, dst.data = None, src.data
-                src.update_status()
-                dst.update_status()
+        for channel in self.channels:
+            channel.propagate()
+
+    # Idle-cycle skipping
+    #
+    # Number of upcoming cycles in which no module or channel would
+    # change state, skipped at once until the next scheduled event:
+    # a completion in EX, a function unit turning free or a delivery
+    # from a channel. Nothing observable happens in skipped cycles,
+    # MCYCLE is written by the next tick.
+    def idle_cycles(self):
+        # Channels first, a flowing front end fails there
+        for channel in self.channels:
+            if not channel.idle():
+                return 0
+        if not (
+            self.IF.idle() and self.ID.idle() and self.EX.idle() and self.ROB.idle()
+        ):
+            return 0
+
+        events = [
+            cycles
+            for cycles in [self.ROB.cycles_to_event(), self.EX.cycles_to_event()]
+            + [channel.cycles_to_event() for channel in self.channels]
+            if cycles is not None
+        ]
+        # Nothing scheduled
+        if len(events) == 0:
+            return 0
+        return min(events) - 1
+
+    def skip(self, cycles):
+        self.cycle += cycles
+        self.ROB.skip(cycles)
+        self.EX.skip(cycles)
+        for channel in self.channels:
+            channel.skip(cycles)
 
     # Updata internal status
     def step(self):
         if DEBUG_PRINT:
             print("-" * 10, " step @ cycle:", self.cycle, "-" * 10)
 
-        # 1) Implictly access memory
-        self.IF.step()
-
-        self.ID.step()
-
-        if self.ROB.step() is True:
-            # Flush
-            return True
-
-        self.EX.step()
-
-        # self.reg.print_registers()
+        # IF, ID, ROB, then EX if woken
+        # True on flush
+        return self.scheduler.step(self.cycle)
 
     def flush(self):
         if DEBUG_PRINT:
@@ -89,6 +141,8 @@ class Simulator:
         self.ID.flush()
         self.ROB.flush()
         self.EX.flush()
+        for channel in self.channels:
+            channel.clear()
 
 
 DEBUG_PRINT = os.environ.get("DEBUG_PRINT") is not None
@@ -98,23 +152,46 @@ IS_RISCV_TEST = False
 def main(argv):
     global DEBUG_PRINT
     riscv_tests_index = 0
+    backend = "numpy"
+    skip_idle = True
+    # Functional fast-forward, instruction count and ROI marker symbol
+    fast_forward = None
+    roi = None
     warnings.filterwarnings("ignore")
 
     try:
-        opts, args = getopt.getopt(argv, "hdi:", ["index="])
+        opts, args = getopt.getopt(
+            argv,
+            "hdsa:i:f:r:",
+            ["index=", "alu=", "no-skip", "fast-forward=", "roi="],
+        )
     except getopt.GetoptError:
-        print("prototype.py [-i <riscv_tests_index=0>] [-d]")
+        print(
+            "prototype.py [-i <riscv_tests_index=0>] [-d] [-s] [-a <numpy|int>] [-f <instructions>] [-r <symbol>]"
+        )
         sys.exit(2)
     for opt, arg in opts:
         if opt == "-h":
-            print("prototype.py [-i <riscv_tests_index=0>] [-d]")
+            print(
+                "prototype.py [-i <riscv_tests_index=0>] [-d] [-s] [-a <numpy|int>] [-f <instructions>] [-r <symbol>]"
+            )
             sys.exit()
+        elif opt in ("-s", "--no-skip"):
+            # Step every cycle, even idle ones
+            skip_idle = False
         elif opt in ("-d", "--debug"):
             os.environ["DEBUG_PRINT"] = "True"
             DEBUG_PRINT = os.environ.get("DEBUG_PRINT") is not None
 
         elif opt in ("-i", "--index"):
             riscv_tests_index = int(arg)
+        elif opt in ("-a", "--alu"):
+            backend = arg
+        elif opt in ("-f", "--fast-forward"):
+            fast_forward = int(arg)
+        elif opt in ("-r", "--roi"):
+            # Fast-forward up to this symbol
+            roi = arg
 
     np.set_printoptions(formatter={"int": hex})
 
@@ -146,58 +223,58 @@ def main(argv):
     for test in [benchmarks_path + "dhrystone.riscv"]:
         # for test in ["/opt/riscv-tests/coremark/coremark.riscv"]:
         # for test in rv64ui_p_tests[riscv_tests_index:]:
-        cpu = Simulator(load_elf(test, 2049 * 1024 * 1024))
+        data = load_program(test, 2049 * 1024 * 1024)
+        cpu = Simulator(data, backend)
+
+        if (fast_forward is not None) or (roi is not None):
+            # Imported on demand, along with the JIT core
+            from prototype import Simulator as FunctionalSimulator
+
+            if (roi is not None) and (roi not in data.symbols):
+                print("Unknown symbol {}".format(roi))
+                sys.exit(2)
+            functional = FunctionalSimulator(data, backend)
+            instructions = functional.fast_forward(
+                float("inf") if fast_forward is None else fast_forward,
+                None if roi is None else data.symbols[roi],
+            )
+            print("fast-forward: {} instructions".format(instructions))
+            if functional.htif.exit:
+                print("Exited in fast-forward")
+                break
+            cpu.load_state(functional)
 
         st = time.time()
         while cpu.exit is not True:
+            # Per-cycle debug logging needs every cycle stepped
+            if skip_idle and not DEBUG_PRINT:
+                idle_cycles = cpu.idle_cycles()
+                if idle_cycles > 0:
+                    cpu.skip(idle_cycles)
+
             cpu.tick()
             if cpu.step() is True:
                 cpu.flush()
 
             cpu.cycle += 1
 
-            # TODO: for riscv-test isa test only
-            if IS_RISCV_TEST:
-                endcode = cpu.memory.read_byte(cpu.tohost_addr)
-                if endcode != 0:
+            # tohost commands are handled by `cpu.htif` on store
+            if cpu.htif.exit:
+                # TODO: for riscv-test isa test only
+                if IS_RISCV_TEST:
                     print("cycles = {}".format(cpu.cycle))
-                    if endcode == 1:
+                    if cpu.htif.exit_code == 0:
                         print("Test {} Passed".format(test))
                     else:
                         print(
                             "Test {} Failed at test[{}]".format(
-                                test, endcode >> byte_type(1)
+                                test, cpu.htif.exit_code
                             )
                         )
-
-                    break
-            else:
-                tohost_data = cpu.memory.read_bytes(cpu.tohost_addr, 4, False)
-                if tohost_data != 0:
-                    if reg_type(tohost_data) & reg_type(0x1) == reg_type(0x1):
-                        print("{}".format(hex(tohost_data)))
-                        print("cycles = {}".format(cpu.cycle))
-                        break
-                    if tohost_data >= 0x80000000:
-                        # Address of tohost data
-                        flag1 = cpu.memory.read_bytes(24 + tohost_data, 4, False)
-                        flag2 = cpu.memory.read_bytes(28 + tohost_data, 4, False)
-
-                        if (flag1 != 0) or (flag2 != 0):
-                            base = cpu.memory.read_bytes(4 * 4 + tohost_data, 4, False)
-                            length = cpu.memory.read_bytes(
-                                6 * 4 + tohost_data, 4, False
-                            )
-                            for i in range(length):
-                                # TODO: decode
-                                char = cpu.memory.read_bytes(i + base, 1, False)
-                                print(chr(char), end="")
-                            cpu.memory.write_bytes(
-                                reg_type(cpu.tohost_addr + 0x40), 4, reg_type(1)
-                            )
-                            cpu.memory.write_bytes(
-                                reg_type(cpu.tohost_addr), 4, reg_type(0)
-                            )
+                else:
+                    print("{}".format(hex(cpu.htif.exit_data)))
+                    print("cycles = {}".format(cpu.cycle))
+                break
 
         et = time.time()
 
@@ -0,0 +1,111 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+from module_base import Channel, Module, Port, Scheduler
+
+
+def send(port, data):
+    port.data = data
+    port.update_status()
+
+
+def test_direct():
+    src, dst = Port("[A]->B"), Port("A->[B]")
+    channel = Channel(src, dst)
+
+    send(src, 1)
+    channel.propagate()
+    assert (src.data, dst.data) == (None, 1)
+
+    # Held in source while destination is busy
+    send(src, 2)
+    channel.propagate()
+    assert (src.data, dst.data) == (2, 1)
+
+
+def test_latency():
+    src, dst = Port("[A]->B"), Port("A->[B]")
+    channel = Channel(src, dst, latency=2, handler=lambda data: data * 10)
+
+    received = []
+    for cycle in range(6):
+        if cycle < 3:
+            send(src, cycle)
+        channel.propagate()
+        received.append(dst.data)
+        dst.clear()
+
+    # Pipelined, one payload per tick
+    assert received == [None, None, 0, 10, 20, None]
+
+    send(src, 3)
+    channel.propagate()
+    channel.clear()
+    for cycle in range(3):
+        channel.propagate()
+        assert dst.data is None
+
+
+def test_idle():
+    src, dst = Port("[A]->B"), Port("A->[B]")
+    channel = Channel(src, dst, latency=3)
+    assert channel.idle() and channel.cycles_to_event() is None
+
+    send(src, 1)
+    assert not channel.idle()
+    channel.propagate()
+    assert channel.idle() and channel.cycles_to_event() == 3
+
+    # Skipping idle ticks delivers on time
+    channel.skip(2)
+    channel.propagate()
+    assert dst.data == 1
+
+    # Held by destination
+    send(src, 2)
+    channel.propagate()
+    channel.skip(2)
+    assert channel.idle() and channel.cycles_to_event() is None
+
+
+class Recorder(Module):
+    def __init__(self, steps, flush_cycle=None) -> None:
+        super().__init__()
+        self.ports = {"input": {"A": Port("A->[B]")}}
+        self.steps = steps
+        self.flush_cycle = flush_cycle
+
+    def attach(self, scheduler):
+        scheduler.subscribe(self.ports["input"]["A"], self)
+
+    def step(self):
+        self.steps.append((self, self.scheduler.cycle))
+        return self.scheduler.cycle == self.flush_cycle
+
+
+def test_scheduler():
+    steps = []
+    scheduler = Scheduler()
+    always, driven = Recorder(steps, flush_cycle=4), Recorder(steps)
+    scheduler.add(always)
+    scheduler.add(driven, event_driven=True)
+
+    assert scheduler.step(1) is False
+    assert steps == [(always, 1)]
+
+    # Woken by port arrival and timers, once per cycle
+    send(driven.ports["input"]["A"], 1)
+    scheduler.wake_at(2, driven)
+    scheduler.wake_at(3, driven)
+    assert scheduler.cycles_to_event() == 1
+    scheduler.step(2)
+    scheduler.step(3)
+    assert steps[1:] == [(always, 2), (driven, 2), (always, 3), (driven, 3)]
+
+    # Modules after a flushing one are not stepped
+    scheduler.wake(driven)
+    assert scheduler.step(4) is True
+    assert steps[-1] == (always, 4)
+    assert scheduler.cycles_to_event() is None
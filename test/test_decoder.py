@@ -9,3 +9,67 @@ def test_decoder():
         "read_regs": {"int": [{"index": 0}]},
         "write_regs": {"int": [{"index": 10}]},
     }
+
+
+def test_decode_cache():
+    from func.decode.decoder import DecodeCache
+    from config.opcodes import opcode_ids, LOAD, LOAD_SIGNED
+
+    cache = DecodeCache()
+    data = cache.decode(0x80000000, 0xBFF00513)
+    assert data.name == "ADDI"
+    assert (data.opcode, data.flags) == (opcode_ids["ADDI"], 0)
+    assert (data.rs1, data.rs2, data.rd) == (0, None, 10)
+    assert data.imm == -1025
+    assert data.insn_len == 4
+    assert cache.misses == 1
+
+    # Instances must not share dynamic state with the template
+    data.rs1_value = 1
+    assert cache.decode(0x80000000, 0xBFF00513).rs1_value is None
+    assert cache.hits == 1
+
+    # Store into the cached line
+    cache.invalidate(0x80000002, 1)
+    cache.decode(0x80000000, 0xBFF00513)
+    assert cache.misses == 2
+
+    # FENCE.I
+    cache.flush()
+    cache.decode(0x80000000, 0xBFF00513)
+    assert cache.misses == 3
+
+    # lw a0, 0(a0)
+    data = cache.decode(0x80000004, 0x00052503)
+    assert data.flags == LOAD | LOAD_SIGNED
+
+
+def test_decode_words():
+    from func.decode.decoder import DecodeCache, decode_words
+    from config.opcodes import opcode_ids, ILLEGAL
+    from pipeline.modules.MEM import Memory
+
+    # addi a0, x0, -1025; lw a0, 0(a0); addi a0, x0, -1025; invalid
+    words = [0xBFF00513, 0x00052503, 0xBFF00513, 0xFFFFFFFF]
+    table = decode_words(words)
+    assert list(table["opcode"][:3]) == [
+        opcode_ids["ADDI"],
+        opcode_ids["LW"],
+        opcode_ids["ADDI"],
+    ]
+    assert (table["rd"][0], table["rs1"][0], table["rs2"][0]) == (10, 0, -1)
+    assert (table["imm"][0], table["has_imm"][0]) == (-1025, True)
+    assert table["insn_len"][1] == 4
+    assert table["decode_error"][3] and table["opcode"][3] == ILLEGAL
+
+    memory = Memory()
+    for i, word in enumerate(words):
+        memory.write_bytes(0x80000000 + 4 * i, 4, word)
+    cache = DecodeCache()
+    cache.predecode(memory, 0x80000000, 0x80000010)
+    data = cache.decode(0x80000004, 0x00052503)
+    assert data.name == "LW"
+    assert (data.rs1, data.rs2, data.rd, data.imm) == (10, None, 10, 0)
+
+    # Code modified after predecoding
+    assert cache.lookup_table(0x80000000, 0x00052503) is None
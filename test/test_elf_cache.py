@@ -0,0 +1,42 @@
+import numpy as np
+from utils.elf_cache import *
+from func.decode.decoder import decode_words
+
+program = [
+    0x00000513,  # addi a0, x0, 0
+    0x00A00593,  # addi a1, x0, 10
+    0x00B50533,  # loop: add a0, a0, a1
+]
+
+
+def new_program():
+    page = bytearray(PAGE_SIZE)
+    page[: 4 * len(program)] = np.array(program, dtype="<u4").tobytes()
+    pages = [(0x80000000, page)]
+    text_ranges = [(0x80000000, 0x8000000C)]
+    return Program(
+        pages,
+        0x80000000,
+        0x80001000,
+        text_ranges,
+        {"_start": 0x80000000},
+        [(0x80000000, decode_words(read_words(pages, 0x80000000, 0x8000000C)))],
+    )
+
+
+def test_round_trip(tmp_path):
+    write_program(new_program(), str(tmp_path), "key")
+    data = read_program(str(tmp_path / "key"))
+
+    assert (data.entry_pc, data.tohost_addr) == (0x80000000, 0x80001000)
+    assert data.text_ranges == [(0x80000000, 0x8000000C)]
+    assert data.symbols == {"_start": 0x80000000}
+    ((start, table),) = data.text_tables
+    assert start == 0x80000000
+    assert list(table["word"]) == program
+
+    # Pages are copy-on-write
+    ((base, page),) = data.memory.pages()
+    assert base == 0x80000000
+    page[0] = 0xFF
+    assert read_program(str(tmp_path / "key")).memory.pages()[0][1][0] == 0x13
@@ -0,0 +1,110 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+import prototype
+import quad_issue_prototype
+from pipeline.modules.MEM import PAGE_SIZE
+
+ENTRY = 0x80000000
+TOHOST = 0x80001000
+# Written by the program, not part of the loaded pages
+DATA = 0x80002000
+
+program = [
+    0x00000513,  # addi a0, x0, 0
+    0x00A00593,  # addi a1, x0, 10
+    0x00B50533,  # loop: add a0, a0, a1
+    0xFFF58593,  # addi a1, a1, -1
+    0xFE059CE3,  # bne a1, x0, loop
+    0x00100293,  # addi t0, x0, 1
+    0x01F29293,  # slli t0, t0, 31
+    0x00002337,  # lui t1, 2
+    0x006282B3,  # add t0, t0, t1
+    0x00A2B023,  # sd a0, 0(t0)
+    0x00B2B423,  # sd a1, 8(t0)
+    0x00001337,  # lui t1, 1
+    0x406283B3,  # sub t2, t0, t1
+    0x00100E13,  # addi t3, x0, 1
+    0x01C3B023,  # sd t3, 0(t2)
+    0x0000006F,  # spin: jal x0, spin
+]
+# Instructions before the first sd
+FIRST_STORE = 2 + 3 * 10 + 4
+
+
+class Pages:
+    def __init__(self, pages) -> None:
+        self.page_list = pages
+
+    def pages(self):
+        return self.page_list
+
+
+# Stand-in for a loaded ELF, as `utils.elf_cache.Program`
+class Program:
+    def __init__(self) -> None:
+        text = bytearray(PAGE_SIZE)
+        for i, word in enumerate(program):
+            text[4 * i : 4 * i + 4] = word.to_bytes(4, "little")
+        self.memory = Pages([(ENTRY, text), (TOHOST, bytearray(PAGE_SIZE))])
+        self.entry_pc = ENTRY
+        self.tohost_addr = TOHOST
+        self.text_tables = []
+        self.symbols = {}
+
+
+def run_functional(cpu):
+    while not cpu.htif.exit:
+        cpu.step()
+    return cpu
+
+
+def run_pipelined(cpu):
+    for _ in range(2000):
+        cpu.tick()
+        if cpu.step() is True:
+            cpu.flush()
+        cpu.cycle += 1
+        if cpu.htif.exit:
+            return cpu
+    raise AssertionError("No exit")
+
+
+def state(cpu):
+    if isinstance(cpu, prototype.Simulator):
+        registers = [int(cpu.gpr[i]) for i in range(1, 32)]
+    else:
+        registers = [cpu.reg.read_register("int", i) for i in range(1, 32)]
+        registers = [None if value is None else int(value) for value in registers]
+    return registers, cpu.memory.load64(DATA), cpu.memory.load64(DATA + 8)
+
+
+@pytest.mark.parametrize("instructions", [0, 5, FIRST_STORE, FIRST_STORE + 1])
+def test_fast_forward(instructions):
+    expected = state(run_functional(prototype.Simulator(Program())))
+    assert expected[1:] == (55, 0)
+
+    data = Program()
+    functional = prototype.Simulator(data)
+    assert functional.fast_forward(instructions) == instructions
+    cpu = quad_issue_prototype.Simulator(data)
+    cpu.load_state(functional)
+    assert int(cpu.IF.fetch_pc) == int(functional.fetch_pc)
+    assert cpu.cycle == instructions + 1
+    # Pages allocated in fast-forward are taken over
+    assert cpu.memory.load64(DATA) == (55 if instructions > FIRST_STORE else 0)
+
+    assert state(run_pipelined(cpu)) == expected
+    assert cpu.htif.exit_code == 0
+
+
+def test_region_of_interest():
+    functional = prototype.Simulator(Program())
+    # First pc past the loop
+    assert functional.fast_forward(100, roi_pc=ENTRY + 4 * 5) == 2 + 3 * 10
+    assert int(functional.gpr[10]) == 55
+    assert functional.fast_forward(100, roi_pc=ENTRY + 4 * 5) == 0
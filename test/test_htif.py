@@ -0,0 +1,57 @@
+import errno
+import io
+import os
+import struct
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+from pipeline.modules.HTIF import *
+from pipeline.modules.MEM import Memory
+
+TOHOST = 0x80001000
+MAGIC = 0x80002000
+BUFFER = 0x80003000
+PATH = 0x80004000
+
+
+def syscall(htif, which, *args):
+    memory = htif.memory
+    memory.write_range(MAGIC, struct.pack("<8Q", which, *args, *[0] * (7 - len(args))))
+    memory.store64(TOHOST, MAGIC)
+    assert memory.load64(TOHOST) == 0
+    assert memory.load64(TOHOST + FROMHOST_OFFSET) == 1
+    result = memory.load64(MAGIC)
+    return result - (1 << 64) if result >> 63 else result
+
+
+def test_console():
+    console = io.StringIO()
+    htif = HTIF(Memory(), TOHOST, console)
+    htif.memory.write_range(BUFFER, b"hello\n")
+    assert syscall(htif, SYS_WRITE, 1, BUFFER, 6) == 6
+    # Buffered until exit
+    assert console.getvalue() == ""
+    assert syscall(htif, SYS_EXIT, 3) == 0
+    assert console.getvalue() == "hello\n"
+    assert (htif.exit, htif.exit_code) == (True, 3)
+
+
+def test_files(tmp_path):
+    path = str(tmp_path / "file")
+    with open(path, "wb") as file:
+        file.write(b"abc")
+    htif = HTIF(Memory(), TOHOST, io.StringIO())
+    htif.memory.write_range(PATH, path.encode() + b"\0")
+
+    fd = syscall(htif, SYS_OPEN, PATH, 0, 0)
+    assert fd == 3
+    assert syscall(htif, SYS_READ, fd, BUFFER, 8) == 3
+    assert htif.memory.read_range(BUFFER, BUFFER + 3).tobytes() == b"abc"
+    assert syscall(htif, SYS_FSTAT, fd, BUFFER) == 0
+    # st_size
+    assert htif.memory.load64(BUFFER + 48) == 3
+    assert syscall(htif, SYS_CLOSE, fd) == 0
+    assert syscall(htif, SYS_CLOSE, fd) == -EBADF
+    htif.memory.write_range(PATH, path.encode() + b"x\0")
+    assert syscall(htif, SYS_OPEN, PATH, 0, 0) == -errno.ENOENT
@@ -0,0 +1,84 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+import quad_issue_prototype
+from pipeline.modules.MEM import PAGE_SIZE
+
+ENTRY = 0x80000000
+TOHOST = 0x80001000
+
+NOP = 0x00000013
+program = (
+    [
+        0x3E800513,  # addi a0, x0, 1000
+        0x00300593,  # addi a1, x0, 3
+    ]
+    # Dependent long-latency operations, then nothing to issue
+    + [0x02B54533] * 3  # div a0, a0, a1
+    + [NOP] * 200
+    + [
+        0x00100293,  # addi t0, x0, 1
+        0x01F29293,  # slli t0, t0, 31
+        0x00001337,  # lui t1, 1
+        0x006282B3,  # add t0, t0, t1
+        0x00100E13,  # addi t3, x0, 1
+        0x01C2B023,  # sd t3, 0(t0)
+        0x0000006F,  # spin: jal x0, spin
+    ]
+)
+
+
+class Pages:
+    def __init__(self, pages) -> None:
+        self.page_list = pages
+
+    def pages(self):
+        return self.page_list
+
+
+# Stand-in for a loaded ELF, as `utils.elf_cache.Program`
+class Program:
+    def __init__(self) -> None:
+        text = bytearray(PAGE_SIZE)
+        for i, word in enumerate(program):
+            text[4 * i : 4 * i + 4] = word.to_bytes(4, "little")
+        self.memory = Pages([(ENTRY, text), (TOHOST, bytearray(PAGE_SIZE))])
+        self.entry_pc = ENTRY
+        self.tohost_addr = TOHOST
+        self.text_tables = []
+        self.symbols = {}
+
+
+# As `quad_issue_prototype.main`
+def run(channel_latencies, skip_idle):
+    cpu = quad_issue_prototype.Simulator(Program(), channel_latencies=channel_latencies)
+    skipped = 0
+    for _ in range(5000):
+        if skip_idle:
+            idle_cycles = cpu.idle_cycles()
+            if idle_cycles > 0:
+                cpu.skip(idle_cycles)
+                skipped += idle_cycles
+        cpu.tick()
+        if cpu.step() is True:
+            cpu.flush()
+        cpu.cycle += 1
+        if cpu.htif.exit:
+            assert cpu.htif.exit_code == 0
+            return cpu.cycle, int(cpu.reg.read_register("int", 10)), skipped
+    raise AssertionError("No exit")
+
+
+@pytest.mark.parametrize(
+    "channel_latencies", [None, {"ROB->EX": 2, "EX->ROB": 1}, {"IF->ID": 1}]
+)
+def test_idle_skip(channel_latencies):
+    cycle, a0, _ = run(channel_latencies, skip_idle=False)
+    assert a0 == 1000 // 27
+    skipped_cycle, skipped_a0, skipped = run(channel_latencies, skip_idle=True)
+    assert skipped > 0
+    assert (skipped_cycle, skipped_a0) == (cycle, a0)
@@ -0,0 +1,47 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+from pipeline.modules.IFU import IFU
+from pipeline.modules.MEM import Memory
+
+ADDI = 0x00000513
+C_NOP = 0x0001
+
+
+def fetch(ifu):
+    ifu.step()
+    data = ifu.ports["output"]["ID"].data
+    ifu.ports["output"]["ID"].data = None
+    ifu.ports["output"]["ID"].update_status()
+    return [(int(entry["pc"]), int(entry["word"])) for entry in data or []]
+
+
+def test_fetch_block():
+    memory = Memory()
+    # The third addi crosses the block boundary at 0x80000010
+    for address, word, width in [
+        (0x80000000, C_NOP, 2),
+        (0x80000002, ADDI, 4),
+        (0x80000006, ADDI, 4),
+        (0x8000000A, C_NOP, 2),
+        (0x8000000C, C_NOP, 2),
+        (0x8000000E, ADDI, 4),
+        (0x80000012, C_NOP, 2),
+    ]:
+        memory.store(address, width, word)
+    ifu = IFU(memory, 0x80000002, issue_number=4, fetch_block_size=16)
+
+    # Block from the fetch pc on, crossing addi waits for the next block
+    assert fetch(ifu) == [
+        (0x80000002, ADDI),
+        (0x80000006, ADDI),
+        (0x8000000A, C_NOP),
+        (0x8000000C, C_NOP),
+    ]
+    assert fetch(ifu) == [(0x8000000E, ADDI), (0x80000012, C_NOP)] + [
+        (0x80000014 + 2 * i, 0) for i in range(2)
+    ]
+    assert len(ifu.fetch_buffer) == 4
+    assert not ifu.idle()
@@ -0,0 +1,82 @@
+import numpy as np
+from config.data_types import *
+from pipeline.modules.MEM import Memory
+from func.execution.jit_core import *
+from func.execution.jit_core import _mulh, _mulhu, _div, _rem, _divu
+
+program = [
+    0x00000513,  # addi a0, x0, 0
+    0x00A00593,  # addi a1, x0, 10
+    0x00B50533,  # loop: add a0, a0, a1
+    0xFFF58593,  # addi a1, a1, -1
+    0xFE059CE3,  # bne a1, x0, loop
+    0x00A13023,  # sd a0, 0(sp)
+    0x00000073,  # ecall
+]
+
+
+def test_run():
+    memory = Memory()
+    for i, word in enumerate(program):
+        memory.write_bytes(0x80000000 + 4 * i, 4, word)
+    gpr = np.zeros(32, dtype=reg_type)
+    csr = np.zeros(4096, dtype=reg_type)
+    gpr[2] = 0x80002000
+    core = JitCore(memory, gpr, csr)
+
+    # Store to a page never written
+    reason, pc, cycle, retired, fault_address = core.run(0x80000000, 0, 100, 0)
+    assert (reason, pc, cycle) == (EXIT_PAGE_FAULT, 0x80000014, 32)
+    assert fault_address == 0x80002000
+    assert gpr[10] == 55
+
+    # Retried once the page is mapped, stops before ECALL
+    reason, pc, cycle, retired, _ = core.run(pc, cycle, 100, 0)
+    assert (reason, pc, cycle, retired) == (EXIT_ECALL, 0x80000018, 33, 1)
+    assert csr[0xB00] == 33
+    assert memory.read_bytes(0x80002000, 8) == 55
+    assert core.dirty_pages() == [0x80002000]
+
+    # Budget
+    reason, pc, _, retired, _ = core.run(0x80000000, 0, 3, 0)
+    assert (reason, pc, retired) == (EXIT_BUDGET, 0x8000000C, 3)
+
+    # tohost
+    reason, pc, _, _, _ = core.run(0x80000014, 0, 100, 0x80002000)
+    assert (reason, pc) == (EXIT_TOHOST, 0x80000018)
+
+
+def test_adopt_pages():
+    memory = Memory()
+    for i, word in enumerate(program):
+        memory.write_bytes(0x80000000 + 4 * i, 4, word)
+    core = JitCore(memory, np.zeros(32, dtype=reg_type), np.zeros(4096, dtype=reg_type))
+    adopted = []
+    adopt_pages = core.adopt_pages
+    core.adopt_pages = lambda: adopted.append(adopt_pages())
+
+    # Out of range pages are scanned once
+    memory.write_bytes(0x10000, 8, 1)
+    core.run(0x80000000, 0, 3, 0)
+    core.run(0x80000000, 0, 3, 0)
+    assert len(adopted) == 1
+
+    # New in-range pages are mapped on the next run
+    memory.write_bytes(0x80003000, 8, 2)
+    core.run(0x80000000, 0, 3, 0)
+    assert len(adopted) == 2
+    assert core.page_table[(0x80003000 >> PAGE_SHIFT) - core.base_page] >= 0
+    core.run(0x80000000, 0, 3, 0)
+    assert len(adopted) == 2
+
+
+def test_muldiv():
+    assert _mulhu(-1, -1) == -2
+    assert _mulh(-1, -1) == 0
+    assert _mulh(-(1 << 63), 2) == -1
+    assert _div(-7, 2) == -3
+    assert _rem(-7, 2) == -1
+    assert _div(-(1 << 63), -1) == -(1 << 63)
+    assert _div(5, 0) == -1
+    assert _rem(5, 0) == 5
+    assert _divu(-1, 2) == (1 << 63) - 1
@@ -0,0 +1,88 @@
+import numpy as np
+from pipeline.modules.MEM import *
+
+
+def test_untouched_memory():
+    memory = Memory()
+    assert memory.read_bytes(0x80000000, 8) == 0
+    assert memory.read_byte(0x80001000) == 0
+    assert len(memory.pages) == 0
+
+
+def test_read_write():
+    memory = Memory()
+    memory.write_bytes(0x80000000, 8, 0x0123456789ABCDEF)
+    assert memory.read_bytes(0x80000000, 8) == 0x0123456789ABCDEF
+    assert memory.read_bytes(0x80000000, 4) == 0x89ABCDEF
+    assert memory.read_bytes(0x80000004, 2) == 0x4567
+    assert memory.read_byte(0x80000007) == 0x01
+    assert len(memory.pages) == 1
+
+
+def test_sign_extend():
+    memory = Memory()
+    memory.write_bytes(0x80000000, 4, 0x80000000)
+    assert memory.read_bytes(0x80000000, 4, True) == 0xFFFFFFFF80000000
+    assert memory.read_bytes(0x80000000, 4, False) == 0x80000000
+    memory.write_byte(0x80000010, 0x7F)
+    assert memory.read_bytes(0x80000010, 1, True) == 0x7F
+
+
+def test_page_crossing():
+    memory = Memory()
+    address = 0x80000000 + PAGE_SIZE - 3
+    memory.write_bytes(address, 8, 0x1122334455667788)
+    assert memory.read_bytes(address, 8) == 0x1122334455667788
+    assert len(memory.pages) == 2
+
+
+def test_load_pages():
+    page = bytearray(PAGE_SIZE)
+    page[0:8] = (0x00000013_00000513).to_bytes(8, "little")
+    memory = Memory([(0x80000000, page)])
+    assert memory.read_bytes(0x80000000, 4) == 0x00000513
+    assert memory.read_bytes(0x80000004, 4) == 0x00000013
+    # Loaded pages are mapped, not copied
+    memory.write_bytes(0x80000000, 4, 0x00100513)
+    assert page[0:4] == (0x00100513).to_bytes(4, "little")
+    # Zero page stays untouched
+    assert not Memory.zero_page.any()
+
+
+def test_width_accesses():
+    memory = Memory()
+    memory.store64(0x80000000, 0x8877665544332211)
+    assert memory.load64(0x80000000) == 0x8877665544332211
+    assert memory.load32(0x80000004) == 0x88776655
+    assert memory.load32(0x80000004, True) == 0xFFFFFFFF88776655
+    assert memory.load16(0x80000006, True) == 0xFFFFFFFFFFFF8877
+    assert memory.load8(0x80000000, True) == 0x11
+    memory.store16(0x80000002, 0x1234_ABCD)
+    assert memory.load32(0x80000000) == 0xABCD2211
+    # Misaligned, within and across pages
+    assert memory.load32(0x80000003) == 0x776655AB
+    memory.store32(0x80000000 + PAGE_SIZE - 2, 0x80C0FFEE)
+    assert memory.load32(0x80000000 + PAGE_SIZE - 2, True) == 0xFFFFFFFF80C0FFEE
+    assert memory.load(0x80000000 + PAGE_SIZE, 2) == 0x80C0
+
+
+def test_replaced_page():
+    memory = Memory()
+    memory.store32(0x80000000, 1)
+    assert memory.load32(0x80000000) == 1
+    # Cached views follow the page array
+    memory.pages[0x80000000 >> PAGE_SHIFT] = np.full(PAGE_SIZE, 0xFF, dtype=np.uint8)
+    assert memory.load32(0x80000000) == 0xFFFFFFFF
+
+
+def test_watchpoint():
+    memory = Memory()
+    stores = []
+    memory.add_watchpoint(0x80001000, 0x80001008, lambda *store: stores.append(store))
+    memory.store64(0x80000FF8, 1)
+    memory.store32(0x80001008, 1)
+    assert stores == []
+    memory.store32(0x80001004, 1)
+    memory.write_bytes(0x80000FFE, 4, 1)
+    memory.write_byte(0x80001007, 1)
+    assert stores == [(0x80001004, 4), (0x80000FFE, 4), (0x80001007, 1)]
@@ -0,0 +1,223 @@
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../pipeline"))
+
+from config.data_types import *
+from func.micro_op import MicroOp
+from config.opcodes import opcode_ids, opcode_latencies
+from pipeline.modules import EX, FU, REG, ROB
+from pipeline.modules.IQ import IssueQueue
+
+
+def addi(rd, rs1):
+    return MicroOp.from_decoded(
+        {
+            "name": "ADDI",
+            "imm": [1],
+            "read_regs": {"int": [{"index": rs1}]},
+            "write_regs": {"int": [{"index": rd}]},
+        },
+        0x80000000,
+        0x13,
+    )
+
+
+def test_allocate_retire_squash():
+    reg = REG.PhysicalRegisterFile(40, check=True)
+    rob = ROB.reorder_buffer(4, reg, None, 2)
+
+    # x1 <- x0, x2 <- x1, x3 <- x2
+    uops = [addi(1, 0), addi(2, 1), addi(3, 2)]
+    assert rob.handle_ID_input(uops) == [0, 1, 2]
+    assert [uop.rob_index for uop in uops] == [0, 1, 2]
+    assert list(rob.busy_entry_index()) == [0, 1, 2]
+    assert (rob.PRS1[1], rob.p1[1]) == (uops[0].prd, False)
+    assert rob.PRS1[0] == ROB.NONE and rob.is_ready(0)
+
+    # Writing x1 wakes up its consumer only
+    assert rob.consumers[uops[0].prd] == [1]
+    assert rob.consumers[uops[1].prd] == [2]
+    rob.write_register(uops[0].prd, 1)
+    assert rob.p1[1] and uops[1].rs1_value == 1
+    assert not rob.p1[2]
+    assert rob.consumers[uops[0].prd] == []
+
+    # Retire head
+    rob.ex[0] = True
+    assert rob.is_complete(0)
+    rob.retire_entry()
+    assert (rob.head, rob.count) == (1, 2)
+
+    # Squash restores the mapping of squashed destinations
+    rob.squash_entries()
+    assert rob.count == 0 and not rob.use.any()
+    assert not any(rob.consumers)
+    assert reg.get_physical_index(1) == uops[0].prd
+    assert reg.get_physical_index(2) is None
+    assert reg.get_physical_index(3) is None
+
+    # Allocation continues from head, wrapping around
+    uops = [addi(4, 1) for i in range(4)]
+    assert rob.handle_ID_input(uops) == [0, 1, 2, 3]
+    assert [uop.rob_index for uop in uops] == [1, 2, 3, 0]
+    assert not rob.has_free_entry()
+
+
+def test_issue_queue_select():
+    queue = IssueQueue(8, issue_window=4, max_issue_number=2)
+    queue.push(10, opcode_ids["LD"], False)
+    queue.push(11, opcode_ids["ADD"], True)
+    queue.push(12, opcode_ids["SD"], True)
+    queue.push(13, opcode_ids["ADD"], False)
+    queue.push(14, opcode_ids["ADD"], True)
+
+    # SD waits for the older LD, slot 4 is out of window
+    assert queue.select() == [1]
+
+    queue.set_ready(10)
+    assert queue.select() == [0, 1]
+
+    queue.remove([0, 1])
+    assert queue.entries == [12, 13, 14]
+    assert queue.select() == [0, 2]
+    assert len(queue) == 3 and queue.has_free_slot()
+
+
+def test_register_file_full():
+    # x11 and 3 free registers
+    reg = REG.PhysicalRegisterFile(4, check=True)
+    rob = ROB.reorder_buffer(8, reg, None, 2)
+
+    # Stalls instead of reusing a live register
+    uops = [addi(1, 0), addi(2, 0), addi(3, 0), addi(4, 0)]
+    assert rob.handle_ID_input(uops) == [0, 1, 2]
+    assert reg.freelist_count == 0 and not reg.has_free_register()
+    assert rob.allocatable_queue(uops[3]) is None
+    assert reg.get_physical_index(0xB) not in [uop.prd for uop in uops[:3]]
+    with pytest.raises(UserWarning, match="empty freelist"):
+        reg.rename()
+
+
+def test_register_file():
+    reg = REG.PhysicalRegisterFile(8, check=True)
+    assert reg.get_physical_index(0xB) == 0 and reg.p[0]
+    assert reg.get_physical_index(1) is None
+
+    index = reg.rename()
+    reg.set_physical_index(1, index)
+    assert reg.get_physical_index(1) == index and not reg.free[index]
+
+    reg.rollback_register(index)
+    assert reg.free[index] and reg.freelist_count == 7
+    with pytest.raises(AssertionError, match="freelist"):
+        reg.rollback_register(index)
+
+    # Unchecked
+    reg.check = False
+    reg.rollback_register(index)
+
+
+def test_architectural_state():
+    reg = REG.PhysicalRegisterFile(40, check=True)
+    reg.save_checkpoint()
+    gpr = np.arange(32, dtype=reg_type) * 3
+    csr = np.zeros(4096, dtype=reg_type)
+    csr[0x300] = 8
+    reg.load_architectural_state(gpr, csr)
+
+    assert reg.get_physical_index(0) is None
+    assert [int(reg.read_register("int", i)) for i in range(1, 32)] == list(
+        range(3, 96, 3)
+    )
+    assert reg.read_csr(0x300) == 8 and reg.read_csr(0x301) == 0
+    assert reg.freelist_count == 40 - 31 and len(reg.checkpoints) == 0
+
+
+def test_register_checkpoint():
+    reg = REG.PhysicalRegisterFile(8, check=True, checkpoint_num=1)
+    first = reg.rename()
+    reg.set_physical_index(1, first)
+    assert reg.save_checkpoint()
+    assert not reg.save_checkpoint()
+
+    second = reg.rename()
+    reg.set_physical_index(1, second)
+    reg.set_physical_index(2, reg.rename())
+    assert reg.freelist_count == 4
+
+    assert sorted(reg.restore_checkpoint().tolist()) == [2, 3]
+    assert reg.get_physical_index(1) == first
+    assert reg.get_physical_index(2) is None
+    assert reg.freelist_count == 6 and reg.free[[2, 3]].all()
+    # Renaming resumes from the restored head
+    assert reg.rename() == second
+    assert len(reg.checkpoints) == 0
+
+
+def test_flush_epoch():
+    reg = REG.PhysicalRegisterFile(40, check=True)
+    rob = ROB.reorder_buffer(4, reg, None, 2)
+    execute = EX.EX()
+
+    uop = addi(1, 0)
+    rob.handle_ID_input([uop])
+    uop.function_unit_type, uop.function_unit_index = "ALU", 0
+    execute.handle_ROB_input([[uop], [], [], []])
+
+    issue_queues = rob.issue_queues
+    rob.squash_entries()
+    rob.flush()
+    execute.flush()
+    assert rob.issue_queues is issue_queues and len(issue_queues[0]) == 0
+    assert rob.epoch == execute.epoch == uop.epoch + 1
+
+    # Squashed occupant completes without result
+    execute.step()
+    assert execute.ports["output"]["ROB"].data is None
+    assert execute.completions == []
+
+
+def test_function_unit_timing():
+    scoreboard = FU.Scoreboard(held_types=["CSR"])
+    # Unpipelined
+    assert scoreboard.allocate(1, "DIV", 3) == 0
+    assert scoreboard.allocate(1, "DIV", 3) is None
+    assert scoreboard.allocate(0, "CSR", 1) == 0
+    for i in range(3):
+        scoreboard.tick()
+    assert scoreboard.allocate(1, "DIV", 3) == 0
+    # Held until released
+    assert scoreboard.allocate(0, "CSR", 1) is None
+    scoreboard.release(0, "CSR", 0)
+    assert scoreboard.allocate(0, "CSR", 1) == 0
+
+    # Skipping ticks
+    scoreboard.allocate(2, "DIV", 20)
+    assert scoreboard.cycles_to_release() == 3
+    scoreboard.tick(5)
+    assert scoreboard.cycles_to_release() == 15
+    assert not scoreboard.is_free(2, "DIV") and scoreboard.is_free(1, "DIV")
+    assert scoreboard.units[0]["CSR"][0] == 1
+
+    # Results complete by latency, in issue order
+    execute = EX.EX("int")
+    mul, add = addi(1, 0), addi(2, 0)
+    mul.opcode = opcode_ids["MUL"]
+    for uop in [mul, add]:
+        uop.epoch, uop.rs1_value, uop.rs2_value = 0, 3, 4
+    execute.ports["input"]["ROB"].data = [[mul, add], [], [], []]
+    execute.ports["input"]["ROB"].update_status()
+
+    completed = []
+    for cycle in range(opcode_latencies[opcode_ids["MUL"]]):
+        execute.step()
+        port = execute.ports["output"]["ROB"]
+        if port.valid:
+            completed.append([data.opcode for data in port.data["results"][0]])
+            port.clear()
+        else:
+            completed.append([])
+    assert completed[0] == [opcode_ids["ADDI"]]
+    assert completed[-1] == [opcode_ids["MUL"]] and mul.rd_value == 12
@@ -0,0 +1,141 @@
+import random
+import warnings
+
+import numpy as np
+from config.data_types import *
+from func.micro_op import MicroOp
+import func.execution.rv64i as rv64i
+import func.execution.rv64i_int as rv64i_int
+from func.execution.backends import execute_tables
+from config.opcodes import *
+
+MASK = (1 << 64) - 1
+
+edge_values = [
+    0,
+    1,
+    2,
+    0x7F,
+    0x80,
+    0xFFFF_FFFF,
+    0x8000_0000,
+    0x7FFF_FFFF,
+    (1 << 63) - 1,
+    1 << 63,
+    MASK - 1,
+    MASK,
+]
+
+# The numpy backend cannot shift the uint64 product for MULH*, they are
+# checked against the spec in test_muldiv only
+unsupported_insns = ["MULH", "MULHSU", "MULHU"]
+
+# The numpy backend divides through float, division is only compared on
+# small non-negative operands where it is exact
+small_operand_insns = [
+    "DIV",
+    "DIVU",
+    "REM",
+    "REMU",
+    "DIVW",
+    "DIVUW",
+    "REMW",
+    "REMUW",
+]
+
+result_fields = [
+    "rd_value",
+    "csr_result",
+    "next_pc",
+    "taken",
+    "is_load",
+    "is_store",
+    "mem_addr",
+    "mem_len",
+]
+
+
+def random_imm(name, rng):
+    if name in ["SLLI", "SRLI", "SRAI"]:
+        return rng.randrange(64)
+    if name in ["SLLIW", "SRLIW", "SRAIW", "CSRRWI", "CSRRSI", "CSRRCI"]:
+        return rng.randrange(32)
+    if name in ["LUI", "AUIPC"]:
+        return rng.randrange(-(1 << 19), 1 << 19) << 12
+    if name == "JAL":
+        return rng.randrange(-(1 << 19), 1 << 19) << 1
+    if name in ["BEQ", "BNE", "BLT", "BGE", "BLTU", "BGEU"]:
+        return rng.randrange(-(1 << 11), 1 << 11) << 1
+    return rng.randrange(-2048, 2048)
+
+
+def random_operand(name, rng):
+    if name in small_operand_insns:
+        return rng.randrange(1, 1 << 16)
+    if rng.random() < 0.3:
+        return rng.choice(edge_values)
+    return rng.randrange(1 << 64)
+
+
+def new_uop(name, rs1_value, rs2_value, imm, csr_value):
+    uop = MicroOp()
+    uop.name = name
+    uop.pc = reg_type(0x80000000)
+    uop.insn_len = 4
+    uop.imm = np.int64(imm)
+    uop.rs1_value = reg_type(rs1_value)
+    uop.rs2_value = reg_type(rs2_value)
+    uop.csr_value = reg_type(csr_value)
+    return uop
+
+
+def results(uop):
+    return [
+        None if getattr(uop, field) is None else int(getattr(uop, field))
+        for field in result_fields
+    ]
+
+
+def test_conformance():
+    rng = random.Random(0)
+    warnings.simplefilter("ignore")
+    for name in rv64i.insn_dict:
+        if name in unsupported_insns:
+            continue
+        for _ in range(200):
+            operands = (
+                random_operand(name, rng),
+                random_operand(name, rng),
+                random_imm(name, rng),
+                rng.randrange(1 << 64),
+            )
+            expected = rv64i.insn_dict[name](new_uop(name, *operands))
+            result = rv64i_int.insn_dict[name](new_uop(name, *operands))
+            assert results(result) == results(expected), (name, operands)
+
+
+def test_muldiv():
+    def execute(name, rs1_value, rs2_value):
+        return rv64i_int.insn_dict[name](
+            new_uop(name, rs1_value & MASK, rs2_value & MASK, 0, 0)
+        ).rd_value
+
+    assert execute("MULH", -1, -1) == 0
+    assert execute("MULHU", -1, -1) == MASK - 1
+    assert execute("MULHSU", -1, 2) == MASK
+    assert execute("DIV", -7, 2) == -3 & MASK
+    assert execute("REM", -7, 2) == -1 & MASK
+    assert execute("DIV", 1 << 63, -1) == 1 << 63
+    assert execute("DIV", 5, 0) == MASK
+    assert execute("REMU", 5, 0) == 5
+    assert execute("DIVW", -(1 << 31), -1) == -(1 << 31) & MASK
+    assert execute("REMUW", 7, (1 << 32) + 2) == 1
+
+
+def test_execute_tables():
+    for table in execute_tables.values():
+        for name, opcode in opcode_ids.items():
+            if opcode == ILLEGAL:
+                assert table[opcode] is None
+            else:
+                assert table[opcode].__name__ == name
@@ -0,0 +1,60 @@
+import numpy as np
+from config.data_types import *
+from pipeline.modules.MEM import Memory
+from func.decode.decoder import DecodeCache
+from func.execution.translator import BlockTranslator
+
+program = [
+    0x00000513,  # addi a0, x0, 0
+    0x00A00593,  # addi a1, x0, 10
+    0x00B50533,  # loop: add a0, a0, a1
+    0xFFF58593,  # addi a1, a1, -1
+    0xFE059CE3,  # bne a1, x0, loop
+    0x00A13023,  # sd a0, 0(sp)
+]
+
+
+def new_translator():
+    memory = Memory()
+    for i, word in enumerate(program):
+        memory.write_bytes(0x80000000 + 4 * i, 4, word)
+    return memory, BlockTranslator(memory, DecodeCache())
+
+
+def test_block():
+    memory, translator = new_translator()
+    gpr = np.zeros(32, dtype=reg_type)
+
+    def load(address, width, sign_extend=False):
+        return int(memory.read_bytes(address, width, sign_extend))
+
+    def store(address, width, value):
+        memory.write_bytes(address, width, value)
+        return translator.invalidate(address, width)
+
+    # Entry block ends at the branch
+    next_pc, count = translator.lookup(0x80000000)(gpr, load, store)
+    assert (next_pc, count) == (0x80000008, 5)
+    assert (gpr[10], gpr[11]) == (10, 9)
+
+    # Loop block runs until the branch falls through
+    next_pc, count = translator.lookup(0x80000008)(gpr, load, store)
+    assert (next_pc, count) == (0x80000014, 27)
+    assert (gpr[10], gpr[11]) == (55, 0)
+    assert translator.translations == 2
+
+
+def test_invalidate():
+    memory, translator = new_translator()
+    translator.lookup(0x80000000)
+    translator.lookup(0x80000014)
+
+    # Store into translated code
+    assert translator.invalidate(0x80000004, 4)
+    assert len(translator.blocks) == 0
+    assert not translator.invalidate(0x80001000, 8)
+
+    # FENCE.I
+    translator.lookup(0x80000000)
+    translator.flush()
+    assert len(translator.blocks) == 0
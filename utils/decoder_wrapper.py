@@ -29,7 +29,29 @@ import numpy as np
 
 
 def decode(word):
-    decoding_result = rustdecoder.decode_instruction(word)
+    return to_dict(rustdecoder.decode_instruction(word))
+
+
+# -------------------
+# Decode a batch of words in one call
+#
+# Args:
+#   `words`: iterable of 32-bit fetched raw data
+#
+# Return value:
+#   list of `decode` results, in order
+# -------------------
+def decode_many(words):
+    return [
+        to_dict(decoding_result)
+        for decoding_result in rustdecoder.decode_instructions(
+            [int(word) for word in words]
+        )
+    ]
+
+
+# Convert `DecodingResultPy` to dict
+def to_dict(decoding_result):
     if decoding_result.decode_error is not None:
         return {"decode_error": decoding_result.decode_error}
     else:
@@ -41,11 +41,11 @@ pub struct _ProgramHeader {
 pub struct SectionHeader {
 	sh_name: u32,
 	pub sh_type: u32,
-	_sh_flags: u64,
+	pub sh_flags: u64,
 	pub sh_addr: u64,
 	pub sh_offset: u64,
 	pub sh_size: u64,
-	_sh_link: u32,
+	pub sh_link: u32,
 	_sh_info: u32,
 	_sh_addralign: u64,
 	_sh_entsize: u64,
@@ -477,11 +477,11 @@ impl ElfAnalyzer {
 			headers.push(SectionHeader {
 				sh_name: sh_name,
 				sh_type: sh_type,
-				_sh_flags: sh_flags,
+				sh_flags: sh_flags,
 				sh_addr: sh_addr,
 				sh_offset: sh_offset,
 				sh_size: sh_size,
-				_sh_link: sh_link,
+				sh_link: sh_link,
 				_sh_info: sh_info,
 				_sh_addralign: sh_addralign,
 				_sh_entsize: sh_entsize,
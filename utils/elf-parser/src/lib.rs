@@ -1,3 +1,4 @@
+use fnv::FnvHashMap;
 use pyo3::prelude::*;
 use std::fs::File;
 use std::io::Read;
@@ -10,6 +11,9 @@ use memory::Memory;
 
 pub const DRAM_BASE: u64 = 0x80000000;
 
+/// Section header flag of executable sections
+const SHF_EXECINSTR: u64 = 0x4;
+
 
 #[pymodule]
 fn elfparser(_py: Python, m: &PyModule) -> PyResult<()> {
@@ -19,13 +23,21 @@ fn elfparser(_py: Python, m: &PyModule) -> PyResult<()> {
     // The `_py` argument represents that we're holding the GIL.
     #[pyfn(m)]
     #[pyo3(name = "load_elf")]
-    fn load_elf_py(_py: Python, elf_path: String, capacity: u64) -> PyResult<ElfContext> {
-        let out = load_elf(elf_path, capacity)?;
-        Ok(out)
+    fn load_elf_py(py: Python, elf_path: String, capacity: u64) -> PyResult<ElfContext> {
+        let (memory, entry_pc, tohost_addr, text_ranges, symbols) =
+            load_elf(elf_path, capacity)?;
+        Ok(ElfContext {
+            memory: Py::new(py, memory)?,
+            entry_pc,
+            tohost_addr,
+            text_ranges,
+            symbols,
+        })
     }
 
     // Add the class to module
     m.add_class::<ElfContext>()?;
+    m.add_class::<Memory>()?;
 
     Ok(())
 }
@@ -34,38 +46,51 @@ fn elfparser(_py: Python, m: &PyModule) -> PyResult<()> {
 struct ElfContext {
     // Currently set all member read-only in Python
     // #[pyo3(get)] requires both `IntoPy<PyObject>` and `Clone` traits.
+    // `Py<Memory>` is shared by reference, so reading it does not copy pages.
     #[pyo3(get)]
-    memory: Memory,
+    memory: Py<Memory>,
     #[pyo3(get)]
     entry_pc: u64,
     #[pyo3(get)]
     tohost_addr: u64,
+    // [start, end) address of each executable section
+    #[pyo3(get)]
+    text_ranges: Vec<(u64, u64)>,
+    // Function and notype symbols -> address
+    #[pyo3(get)]
+    symbols: FnvHashMap<String, u64>,
     // @TODO: add 32/64-bit indicator
-    // @TODO: add symbolmap for virtual address mapping (what for?)
 }
 
 #[pymethods]
 impl ElfContext {
     #[new]
-    pub fn new() -> Self {
-        ElfContext {
-            memory: Memory::new(),
+    pub fn new(py: Python) -> PyResult<Self> {
+        Ok(ElfContext {
+            memory: Py::new(py, Memory::new())?,
             entry_pc: 0,
             tohost_addr: 0,
-        }
+            text_ranges: vec![],
+            symbols: FnvHashMap::default(),
+        })
     }
 }
 
-fn load_elf(elf_path: String, capacity: u64) -> std::io::Result<ElfContext> {
+/// Returns loaded memory, entry pc, tohost address, executable section ranges
+/// and symbol map
+fn load_elf(
+    elf_path: String,
+    capacity: u64,
+) -> std::io::Result<(Memory, u64, u64, Vec<(u64, u64)>, FnvHashMap<String, u64>)> {
     // Get binary data from file system
     let mut elf_file = File::open(elf_path)?;
     let mut elf_contents = vec![];
     elf_file.read_to_end(&mut elf_contents)?;
 
-    // Initialize elf context
-    // Set given memory capacity
-    let mut elf_context = ElfContext::new();
-    elf_context.memory.init(capacity);
+    // Initialize memory
+    // Set given memory capacity, pages are allocated on first write
+    let mut memory = Memory::new();
+    memory.init(capacity);
 
     // Initialize elf analyzer
     let analyzer = ElfAnalyzer::new(elf_contents);
@@ -88,7 +113,7 @@ fn load_elf(elf_path: String, capacity: u64) -> std::io::Result<ElfContext> {
     }
 
     // Find program data section named `.tohost` to detect if the elf file is riscv-tests
-    elf_context.tohost_addr = match analyzer
+    let tohost_addr = match analyzer
         .find_tohost_addr(&program_data_section_headers, &string_table_section_headers)
     {
         Some(address) => address,
@@ -99,25 +124,38 @@ fn load_elf(elf_path: String, capacity: u64) -> std::io::Result<ElfContext> {
     };
 
     // Write binary data
+    let mut text_ranges = vec![];
     for i in 0..program_data_section_headers.len() {
         let sh_addr = program_data_section_headers[i].sh_addr;
         let sh_offset = program_data_section_headers[i].sh_offset as usize;
         let sh_size = program_data_section_headers[i].sh_size as usize;
         if sh_addr >= 0x80000000 && sh_offset > 0 && sh_size > 0 {
+            if program_data_section_headers[i].sh_flags & SHF_EXECINSTR != 0 {
+                text_ranges.push((sh_addr, sh_addr + sh_size as u64));
+            }
             for j in 0..sh_size {
-                elf_context.memory.write_byte(
+                memory.write_byte(
                     // @TODO: add different masks for different memory models
-                    ((sh_addr + j as u64) & 0x7f_ffff_ffff) - DRAM_BASE,
+                    (sh_addr + j as u64) & 0x7f_ffff_ffff,
                     analyzer.read_byte(sh_offset + j),
                 );
             }
         }
     }
 
+    // Symbol names are resolved in the string table linked to each symbol table
+    let mut symbols = FnvHashMap::default();
+    for symbol_table_section_header in &symbol_table_section_headers {
+        let entries = analyzer.read_symbol_entries(&header, &vec![*symbol_table_section_header]);
+        let string_table_section_header =
+            &section_headers[symbol_table_section_header.sh_link as usize];
+        symbols.extend(analyzer.create_symbol_map(&entries, string_table_section_header));
+    }
+
     // Set entry pc
-    elf_context.entry_pc = header.e_entry;
+    let entry_pc = header.e_entry;
 
-    Ok(elf_context)
+    Ok((memory, entry_pc, tohost_addr, text_ranges, symbols))
 }
 
 // fn main() {}
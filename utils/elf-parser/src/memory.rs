@@ -1,43 +1,68 @@
 /// Emulates main memory.
+use fnv::FnvHashMap;
 use pyo3::prelude::*;
+use pyo3::types::PyByteArray;
+
+use crate::DRAM_BASE;
+
+/// Page size in bytes
+pub const PAGE_SIZE: u64 = 4096;
+const PAGE_WORDS: usize = (PAGE_SIZE / 8) as usize;
 
 #[pyclass]
 #[derive(Clone)]
 pub struct Memory {
-	/// Memory content
-	#[pyo3(get)]
-	data: Vec<u64>,
+	/// Memory content, allocated page by page on first write.
+	/// Keyed by page number (address / PAGE_SIZE).
+	pages: FnvHashMap<u64, Vec<u64>>,
+	/// Memory capacity in bytes, starting from DRAM_BASE
+	capacity: u64,
 }
 
 impl Memory {
 	/// Creates a new `Memory`
 	pub fn new() -> Self {
-		Memory { data: vec![] }
+		Memory {
+			pages: FnvHashMap::default(),
+			capacity: 0,
+		}
 	}
 
-	/// Initializes memory content.
-	/// This method is expected to be called only once.
+	/// Initializes memory capacity.
+	/// No page is allocated until it is written.
 	///
 	/// # Arguments
 	/// * `capacity`
 	pub fn init(&mut self, capacity: u64) {
-		for _i in 0..((capacity + 7) / 8) {
-			self.data.push(0);
+		self.capacity = capacity;
+	}
+
+	/// Reads the aligned doubleword containing `address`.
+	/// Untouched pages read as zero.
+	fn read_aligned(&self, address: u64) -> u64 {
+		match self.pages.get(&(address / PAGE_SIZE)) {
+			Some(page) => page[((address % PAGE_SIZE) >> 3) as usize],
+			None => 0,
 		}
 	}
+
+	/// Returns the aligned doubleword containing `address`,
+	/// allocating its page if necessary.
+	fn aligned_mut(&mut self, address: u64) -> &mut u64 {
+		let page = self
+			.pages
+			.entry(address / PAGE_SIZE)
+			.or_insert_with(|| vec![0; PAGE_WORDS]);
+		&mut page[((address % PAGE_SIZE) >> 3) as usize]
+	}
+
 	/// Reads a byte from memory.
 	///
 	/// # Arguments
 	/// * `address`
 	pub fn read_byte(&self, address: u64) -> u8 {
-		let index = (address >> 3) as usize;
 		let pos = ((address % 8) as u64) * 8;
-		/*
-		if index > self.data.len() {
-			println!("big address error : {}",address);
-			return 0;
-		}*/
-		(self.data[index] >> pos) as u8
+		(self.read_aligned(address) >> pos) as u8
 	}
 
 	/// Reads two bytes from memory.
@@ -46,9 +71,8 @@ impl Memory {
 	/// * `address`
 	pub fn read_halfword(&self, address: u64) -> u16 {
 		if (address % 2) == 0 {
-			let index = (address >> 3) as usize;
 			let pos = ((address % 8) as u64) * 8;
-			(self.data[index] >> pos) as u16
+			(self.read_aligned(address) >> pos) as u16
 		} else {
 			self.read_bytes(address, 2) as u16
 		}
@@ -60,9 +84,8 @@ impl Memory {
 	/// * `address`
 	pub fn read_word(&self, address: u64) -> u32 {
 		if (address % 4) == 0 {
-			let index = (address >> 3) as usize;
 			let pos = ((address % 8) as u64) * 8;
-			(self.data[index] >> pos) as u32
+			(self.read_aligned(address) >> pos) as u32
 		} else {
 			self.read_bytes(address, 4) as u32
 		}
@@ -74,11 +97,10 @@ impl Memory {
 	/// * `address`
 	pub fn read_doubleword(&self, address: u64) -> u64 {
 		if (address % 8) == 0 {
-			let index = (address >> 3) as usize;
-			self.data[index]
+			self.read_aligned(address)
 		} else if (address % 4) == 0 {
 			(self.read_word(address) as u64)
-				| ((self.read_word(address.wrapping_add(4)) as u64) << 4)
+				| ((self.read_word(address.wrapping_add(4)) as u64) << 32)
 		} else {
 			self.read_bytes(address, 8)
 		}
@@ -103,9 +125,9 @@ impl Memory {
 	/// * `address`
 	/// * `value`
 	pub fn write_byte(&mut self, address: u64, value: u8) {
-		let index = (address >> 3) as usize;
 		let pos = ((address % 8) as u64) * 8;
-		self.data[index] = (self.data[index] & !(0xff << pos)) | ((value as u64) << pos);
+		let word = self.aligned_mut(address);
+		*word = (*word & !(0xff << pos)) | ((value as u64) << pos);
 	}
 
 	/// Writes two bytes to memory.
@@ -115,9 +137,9 @@ impl Memory {
 	/// * `value`
 	pub fn write_halfword(&mut self, address: u64, value: u16) {
 		if (address % 2) == 0 {
-			let index = (address >> 3) as usize;
 			let pos = ((address % 8) as u64) * 8;
-			self.data[index] = (self.data[index] & !(0xffff << pos)) | ((value as u64) << pos);
+			let word = self.aligned_mut(address);
+			*word = (*word & !(0xffff << pos)) | ((value as u64) << pos);
 		} else {
 			self.write_bytes(address, value as u64, 2);
 		}
@@ -130,9 +152,9 @@ impl Memory {
 	/// * `value`
 	pub fn write_word(&mut self, address: u64, value: u32) {
 		if (address % 4) == 0 {
-			let index = (address >> 3) as usize;
 			let pos = ((address % 8) as u64) * 8;
-			self.data[index] = (self.data[index] & !(0xffffffff << pos)) | ((value as u64) << pos);
+			let word = self.aligned_mut(address);
+			*word = (*word & !(0xffffffff << pos)) | ((value as u64) << pos);
 		} else {
 			self.write_bytes(address, value as u64, 4);
 		}
@@ -145,8 +167,7 @@ impl Memory {
 	/// * `value`
 	pub fn write_doubleword(&mut self, address: u64, value: u64) {
 		if (address % 8) == 0 {
-			let index = (address >> 3) as usize;
-			self.data[index] = value;
+			*self.aligned_mut(address) = value;
 		} else if (address % 4) == 0 {
 			self.write_word(address, (value & 0xffffffff) as u32);
 			self.write_word(address.wrapping_add(4), (value >> 32) as u32);
@@ -172,6 +193,33 @@ impl Memory {
 	/// # Arguments
 	/// * `address`
 	pub fn validate_address(&self, address: u64) -> bool {
-		return (address as usize) < self.data.len();
+		return address >= DRAM_BASE && (address - DRAM_BASE) < self.capacity;
+	}
+}
+
+#[pymethods]
+impl Memory {
+	/// Returns allocated pages as `(base_address, bytearray)` pairs,
+	/// sorted by address.
+	/// Each page is copied once into a little-endian `bytearray`,
+	/// which NumPy maps as a writable `uint8` view without copying again.
+	pub fn pages(&self, py: Python) -> Vec<(u64, PyObject)> {
+		let mut page_numbers: Vec<&u64> = self.pages.keys().collect();
+		page_numbers.sort();
+
+		let mut bytes = Vec::with_capacity(PAGE_SIZE as usize);
+		page_numbers
+			.into_iter()
+			.map(|page_number| {
+				bytes.clear();
+				for word in &self.pages[page_number] {
+					bytes.extend_from_slice(&word.to_le_bytes());
+				}
+				(
+					page_number * PAGE_SIZE,
+					PyByteArray::new(py, &bytes).to_object(py),
+				)
+			})
+			.collect()
 	}
 }
@@ -0,0 +1,170 @@
+# ====================================================
+# file:       elf_cache.py
+# notes:      on-disk cache of loaded ELF images
+# ====================================================
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .elf_parser import load_elf
+from func.decode.decoder import decode_words
+
+# Part of the cache key
+# Bump when the loader or `decoded_dtype` output changes
+LOADER_VERSION = 1
+
+PAGE_SIZE = 4096
+
+
+# -------------------
+# Loaded program
+#
+# Same fields as `ElfContext`, plus `text_tables`:
+# [(start, decoded_dtype table)] of each executable section
+# -------------------
+class Program:
+    def __init__(
+        self, pages, entry_pc, tohost_addr, text_ranges, symbols, text_tables
+    ) -> None:
+        self.memory = ProgramMemory(pages)
+        self.entry_pc = entry_pc
+        self.tohost_addr = tohost_addr
+        self.text_ranges = text_ranges
+        self.symbols = symbols
+        self.text_tables = text_tables
+
+
+class ProgramMemory:
+    def __init__(self, pages) -> None:
+        self.page_list = pages
+
+    # [(base_address, page)], as `ElfContext.memory.pages()`
+    def pages(self):
+        return self.page_list
+
+
+# -------------------
+# Load elf file, through the cache if `cache_dir` is given
+#
+# Args:
+#   `elf_path`: path to elf file
+#   `memory_capacity`: allocated capacity for program
+#   `cache_dir`: cache directory, defaults to $ELF_CACHE_DIR,
+#       no caching if neither is set
+#
+# Cache entries are directories named by the ELF file hash and
+# `LOADER_VERSION`. Pages and predecoded tables are `.npy` files
+# mapped on load, pages copy-on-write.
+# -------------------
+def load_program(elf_path, memory_capacity, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.environ.get("ELF_CACHE_DIR")
+    if cache_dir is None:
+        return build_program(load_elf(elf_path, memory_capacity))
+
+    key = cache_key(elf_path)
+    path = os.path.join(cache_dir, key)
+    if os.path.isdir(path):
+        return read_program(path)
+
+    program = build_program(load_elf(elf_path, memory_capacity))
+    write_program(program, cache_dir, key)
+    return program
+
+
+def cache_key(elf_path):
+    digest = hashlib.sha256()
+    with open(elf_path, "rb") as elf_file:
+        for chunk in iter(lambda: elf_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return "{}-v{}".format(digest.hexdigest(), LOADER_VERSION)
+
+
+def build_program(data):
+    pages = data.memory.pages()
+    text_ranges = [(int(start), int(end)) for start, end in data.text_ranges]
+    text_tables = [
+        (start, decode_words(read_words(pages, start, end)))
+        for start, end in text_ranges
+    ]
+    return Program(
+        pages,
+        int(data.entry_pc),
+        int(data.tohost_addr),
+        text_ranges,
+        dict(data.symbols),
+        text_tables,
+    )
+
+
+# 32-bit aligned words of [start, end) in `pages`
+def read_words(pages, start, end):
+    start, end = start & ~0x3, (end + 3) & ~0x3
+    pages = dict(pages)
+    data = np.zeros(end - start, dtype=np.uint8)
+    for base in range(start & ~(PAGE_SIZE - 1), end, PAGE_SIZE):
+        page = pages.get(base)
+        if page is not None:
+            low, high = max(start, base), min(end, base + PAGE_SIZE)
+            data[low - start : high - start] = np.frombuffer(page, dtype=np.uint8)[
+                low - base : high - base
+            ]
+    return data.view("<u4")
+
+
+def write_program(program, cache_dir, key):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written aside then renamed, concurrent runs never see partial entries
+    temp = tempfile.mkdtemp(dir=cache_dir)
+
+    pages = program.memory.pages()
+    np.save(
+        os.path.join(temp, "pages.npy"),
+        np.array(
+            [np.frombuffer(page, dtype=np.uint8) for _, page in pages],
+            dtype=np.uint8,
+        ).reshape(-1, PAGE_SIZE),
+    )
+    for index, (_, table) in enumerate(program.text_tables):
+        np.save(os.path.join(temp, "text{}.npy".format(index)), table)
+    np.savez(
+        os.path.join(temp, "meta.npz"),
+        page_bases=np.array([base for base, _ in pages], dtype=np.uint64),
+        entry_pc=np.uint64(program.entry_pc),
+        tohost_addr=np.uint64(program.tohost_addr),
+        text_ranges=np.array(program.text_ranges, dtype=np.uint64).reshape(-1, 2),
+        symbol_names=np.array(list(program.symbols.keys()), dtype=str),
+        symbol_addresses=np.array(list(program.symbols.values()), dtype=np.uint64),
+    )
+
+    try:
+        os.rename(temp, os.path.join(cache_dir, key))
+    except OSError:
+        # Stored by a concurrent run
+        shutil.rmtree(temp)
+
+
+def read_program(path):
+    meta = np.load(os.path.join(path, "meta.npz"))
+    page_data = np.load(os.path.join(path, "pages.npy"), mmap_mode="c")
+    text_ranges = [(int(start), int(end)) for start, end in meta["text_ranges"]]
+    return Program(
+        [
+            (int(base), page_data[index])
+            for index, base in enumerate(meta["page_bases"])
+        ],
+        int(meta["entry_pc"]),
+        int(meta["tohost_addr"]),
+        text_ranges,
+        dict(zip(meta["symbol_names"].tolist(), meta["symbol_addresses"].tolist())),
+        [
+            (
+                start,
+                np.load(os.path.join(path, "text{}.npy".format(index)), mmap_mode="r"),
+            )
+            for index, (start, _) in enumerate(text_ranges)
+        ],
+    )
@@ -15,11 +15,17 @@ from . import elfparser
 #
 # Return value:
 # struct ElfContext {
-#     memory: Memory{
-#         data: Vec<u64>,
+#     memory: Py<Memory>{
+#         // Sparse pages, exported by `pages() -> [(base_address, bytearray)]`
+#         pages: FnvHashMap<u64, Vec<u64>>,
+#         capacity: u64,
 #     },
 #     entry_pc: u64,
 #     tohost_addr: u64,
+#     // [start, end) address of each executable section
+#     text_ranges: [(u64, u64)],
+#     // Function and notype symbols
+#     symbols: {String: u64},
 # }
 # -------------------
 def load_elf(elf_path, memory_capacity):